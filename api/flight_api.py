@@ -162,6 +162,9 @@ async def log_api_access(request: Request, action: str, resource_type: str = Non
         ))
         db_manager.connection.commit()
     except Exception as e:
+        # Roll back so the request's own queries are not refused
+        if db_manager.connection:
+            db_manager.connection.rollback()
         logger.warning(f"Failed to log API access: {e}")
 
 @app.on_event("startup")
@@ -299,85 +302,84 @@ async def search_flights(search_params: FlightSearchParams, request: Request):
     try:
         cursor = db_manager.get_cursor()
         
-        # Build dynamic query
+        # Build dynamic query against the per-flight search documents
         where_conditions = []
         query_params = []
         
         # Base query
         query = """
-            SELECT DISTINCT
-                f.id,
-                f.flight_number,
-                f.flight_date,
-                f.passenger_count,
-                dl.airport_code as departure_code,
-                dl.airport_name as departure_name,
-                al.airport_code as arrival_code,
-                al.airport_name as arrival_name,
-                a.model as aircraft_model,
-                array_agg(DISTINCT p.full_name) as passengers
-            FROM investigation.flight_details f
-            LEFT JOIN flight_data.aircraft a ON a.tail_number = f.tail_number
-            LEFT JOIN flight_data.flight_passengers fp ON f.id = fp.flight_id
-            LEFT JOIN flight_data.passengers p ON fp.passenger_id = p.id
-            LEFT JOIN flight_data.locations dl ON dl.airport_code = f.departure_code
-            LEFT JOIN flight_data.locations al ON al.airport_code = f.arrival_code
+            SELECT
+                flight_id as id,
+                flight_number,
+                flight_date,
+                passenger_count,
+                departure_code,
+                departure_name,
+                arrival_code,
+                arrival_name,
+                aircraft_model,
+                passenger_names as passengers
+            FROM flight_data.flight_search_doc
         """
         
-        # Add filters
+        # Names and codes match anywhere in the value, through trigram GIN
+        # indexes. passenger_names_text narrows by index; the per-name check
+        # keeps a match from spanning two names
         if search_params.passenger_name:
-            where_conditions.append("p.full_name ILIKE %s")
-            query_params.append(f"%{search_params.passenger_name}%")
+            where_conditions.append("passenger_names_text ILIKE %s")
+            where_conditions.append("EXISTS (SELECT 1 FROM unnest(passenger_names) name WHERE name ILIKE %s)")
+            query_params.extend([f"%{search_params.passenger_name}%"] * 2)
         
         if search_params.airport_code:
-            where_conditions.append("(f.departure_code ILIKE %s OR f.arrival_code ILIKE %s)")
+            where_conditions.append("(departure_code ILIKE %s OR arrival_code ILIKE %s)")
             query_params.extend([f"%{search_params.airport_code}%", f"%{search_params.airport_code}%"])
         
         if search_params.date_from:
-            where_conditions.append("f.flight_date >= %s")
+            where_conditions.append("flight_date >= %s")
             query_params.append(search_params.date_from)
         
         if search_params.date_to:
-            where_conditions.append("f.flight_date <= %s")
+            where_conditions.append("flight_date <= %s")
             query_params.append(search_params.date_to)
         
         if search_params.departure_filter and search_params.departure_filter != 'all':
-            where_conditions.append("f.departure_code = %s")
+            where_conditions.append("departure_code = %s")
             query_params.append(search_params.departure_filter)
         
         if search_params.arrival_filter and search_params.arrival_filter != 'all':
-            where_conditions.append("f.arrival_code = %s")
+            where_conditions.append("arrival_code = %s")
             query_params.append(search_params.arrival_filter)
         
-        if search_params.year_filter:
-            where_conditions.append("EXTRACT(YEAR FROM f.flight_date) = %s")
-            query_params.append(search_params.year_filter)
-        
-        if search_params.month_filter:
-            where_conditions.append("EXTRACT(MONTH FROM f.flight_date) = %s")
-            query_params.append(search_params.month_filter)
+        # Year and month become a date range so the flight_date index applies
+        year, month = search_params.year_filter, search_params.month_filter
+        if year and 1 <= year < 9999:
+            if month and 1 <= month <= 12:
+                period_start, period_end = date(year, month, 1), date(year + month // 12, month % 12 + 1, 1)
+                month = None
+            else:
+                period_start, period_end = date(year, 1, 1), date(year + 1, 1, 1)
+            where_conditions.append("flight_date >= %s AND flight_date < %s")
+            query_params.extend([period_start, period_end])
+        elif year:
+            where_conditions.append("EXTRACT(YEAR FROM flight_date) = %s")
+            query_params.append(year)
+        
+        if month:
+            where_conditions.append("EXTRACT(MONTH FROM flight_date) = %s")
+            query_params.append(month)
         
         if search_params.selected_passengers:
-            passenger_conditions = []
-            for passenger in search_params.selected_passengers:
-                passenger_conditions.append("p.full_name ILIKE %s")
-                query_params.append(f"%{passenger}%")
-            if passenger_conditions:
-                where_conditions.append(f"({' OR '.join(passenger_conditions)})")
+            passenger_patterns = [f"%{passenger}%" for passenger in search_params.selected_passengers]
+            where_conditions.append("passenger_names_text ILIKE ANY(%s)")
+            where_conditions.append("EXISTS (SELECT 1 FROM unnest(passenger_names) name WHERE name ILIKE ANY(%s))")
+            query_params.extend([passenger_patterns] * 2)
         
         # Add WHERE clause if we have conditions
         if where_conditions:
             query += " WHERE " + " AND ".join(where_conditions)
         
-        # Group by and order
-        query += """
-            GROUP BY f.id, f.flight_number, f.flight_date, f.passenger_count,
-                     dl.airport_code, dl.airport_name, al.airport_code, al.airport_name, a.model
-            ORDER BY f.flight_date DESC
-        """
-        
-        # Add pagination
-        query += " LIMIT %s OFFSET %s"
+        # Order and pagination
+        query += " ORDER BY flight_date DESC LIMIT %s OFFSET %s"
         query_params.extend([search_params.limit, search_params.offset])
         
         cursor.execute(query, query_params)
@@ -394,7 +396,7 @@ async def search_flights(search_params: FlightSearchParams, request: Request):
                 "arrival_name": row['arrival_name'],
                 "aircraft_model": row['aircraft_model'],
                 "passenger_count": row['passenger_count'],
-                "passengers": row['passengers'] or []
+                "passengers": list(dict.fromkeys(row['passengers']))
             }
             flights.append(flight_data)
         
@@ -6,23 +6,39 @@ This system automatically researches new connections, verifies dates, and tracks
 SECURITY: This script uses anonymous research methods and can be run via VPN/Tor.
 """
 
+import os
+import sys
 import requests
 import json
-import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
 import re
-import time
 import hashlib
 import logging
 from urllib.parse import quote_plus
 import random
+from collections import Counter
 from bs4 import BeautifulSoup
-import wikipedia
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from article_store import ArticleStore
+from gazetteer import load_gazetteer
+from http_cache import HTTPCache
+from keyword_matcher import KeywordMatcher
+from near_duplicates import collapse_duplicates
+from request_scheduler import RequestScheduler
+from verification_state import VerificationState, iter_timeline_events
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def write_json_atomic(path, data):
+    """Write JSON so readers such as the web interface never see a partial file"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp_path, path)
+
 class AnonymousResearcher:
     def __init__(self):
         # Rotate through different user agents for anonymity
@@ -165,9 +181,57 @@ class AnonymousResearcher:
             'Epstein connections', 'victim testimony', 'black book', 'pedophile ring'
         ]
         
+        # Keyword groups for classifying search results and their sources
+        self.result_categories = {
+            'timing_indicators': ['immediate', 'urgent', 'emergency', 'breaking', 'developing', 'just announced'],
+            'major_stories': ['unsealed', 'charges', 'arrest', 'investigation'],
+            'investigation_updates': ['documents', 'testimony', 'evidence']
+        }
+        self.source_categories = {
+            'credibility_sources': ['reuters', 'ap', 'bbc', 'npr'],
+            'social_media_activity': ['twitter', 'truth social', 'facebook'],
+            'official_statements': ['white house', 'official', 'statement']
+        }
+        
+        # Every keyword set compiled into one automaton, so each text is
+        # scanned once for all patterns and categories
+        self.keyword_matcher = KeywordMatcher({
+            **{name: data['keywords'] for name, data in self.distraction_patterns.items()},
+            **self.result_categories,
+            **self.source_categories
+        })
+        
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': random.choice(self.user_agents)})
         
+        # Search and encyclopedia answers change slowly; cached copies are
+        # reused within these TTLs and revalidated with conditional GETs after
+        self.http_cache = HTTPCache(session=self.session, ttls={
+            'api.duckduckgo.com': 6 * 3600,
+            'en.wikipedia.org': 24 * 3600
+        })
+        
+        # Requests are paced per host instead of sleeping between them:
+        # (requests per second, burst, concurrent requests)
+        self.scheduler = RequestScheduler(self.http_cache, limits={
+            'api.duckduckgo.com': (1.0, 1, 2),
+            'en.wikipedia.org': (2.0, 2, 2)
+        })
+        
+        # Timeline events are verified incrementally: new and edited events
+        # first, then the rest in rotation, at most verification_budget per run
+        self.timeline_path = 'timeline-comprehensive.xml'
+        self.verification_state = VerificationState()
+        self.verification_budget = 25
+        self.recheck_days = 30
+        
+        # Search results and pages are kept for ranked lookups across runs
+        self.article_store = ArticleStore()
+        
+        # Known people from the passenger database and photo lists, loaded
+        # on first use by connection discovery
+        self.gazetteer = None
+        
         # Add proxy support for Tor
         self.tor_proxies = {
             'http': 'socks5h://127.0.0.1:9050',
@@ -191,83 +255,131 @@ class AnonymousResearcher:
         """Anonymous search using DuckDuckGo"""
         try:
             proxies = self.tor_proxies if use_tor else None
+            response = self.scheduler.get(self._duckduckgo_url(query), proxies=proxies, timeout=10)
+            return self._duckduckgo_results(query, response)
             
-            # DuckDuckGo Instant Answer API
-            url = f"https://api.duckduckgo.com/?q={quote_plus(query)}&format=json&no_html=1&skip_disambig=1"
-            
-            response = self.session.get(url, proxies=proxies, timeout=10)
-            data = response.json()
+        except Exception as e:
+            logger.error(f"❌ DuckDuckGo research failed: {e}")
+            return []
             
-            results = []
+    def research_duckduckgo_many(self, queries, use_tor=False):
+        """Anonymous DuckDuckGo searches run concurrently, one result list per query
+
+        A query whose request or response failed gets None instead of a list,
+        so callers can tell it apart from a search that found nothing.
+        """
+        proxies = self.tor_proxies if use_tor else None
+        responses = self.scheduler.get_many([self._duckduckgo_url(query) for query in queries], proxies=proxies)
+        
+        all_results = []
+        for query, response in zip(queries, responses):
+            try:
+                if isinstance(response, Exception):
+                    raise response
+                all_results.append(self._duckduckgo_results(query, response))
+            except Exception as e:
+                logger.error(f"❌ DuckDuckGo research failed: {e}")
+                all_results.append(None)
+        return all_results
+        
+    def _duckduckgo_url(self, query):
+        """DuckDuckGo Instant Answer API URL for a query"""
+        return f"https://api.duckduckgo.com/?q={quote_plus(query)}&format=json&no_html=1&skip_disambig=1"
+        
+    def _duckduckgo_results(self, query, response):
+        """Extract and store the results of a DuckDuckGo answer"""
+        data = response.json()
+        
+        results = []
+        
+        # Extract relevant results
+        if data.get('Abstract'):
+            results.append({
+                'type': 'abstract',
+                'text': data['Abstract'],
+                'source': data.get('AbstractSource', 'DuckDuckGo'),
+                'url': data.get('AbstractURL', '')
+            })
             
-            # Extract relevant results
-            if data.get('Abstract'):
+        # Related topics
+        for topic in data.get('RelatedTopics', [])[:5]:
+            if isinstance(topic, dict) and topic.get('Text'):
                 results.append({
-                    'type': 'abstract',
-                    'text': data['Abstract'],
-                    'source': data.get('AbstractSource', 'DuckDuckGo'),
-                    'url': data.get('AbstractURL', '')
+                    'type': 'related',
+                    'text': topic['Text'],
+                    'url': topic.get('FirstURL', '')
                 })
                 
-            # Related topics
-            for topic in data.get('RelatedTopics', [])[:5]:
-                if isinstance(topic, dict) and topic.get('Text'):
-                    results.append({
-                        'type': 'related',
-                        'text': topic['Text'],
-                        'url': topic.get('FirstURL', '')
-                    })
-                    
-            logger.info(f"🔍 DuckDuckGo research: {query} - {len(results)} results")
-            return results
-            
-        except Exception as e:
-            logger.error(f"❌ DuckDuckGo research failed: {e}")
-            return []
-            
+        # Snippets are stored by content, as topic URLs are shared with Wikipedia pages
+        self.article_store.add_many({'kind': 'duckduckgo', 'body': result['text'],
+                                    'source': result.get('url') or result.get('source')}
+                                   for result in results)
+                
+        logger.info(f"🔍 DuckDuckGo research: {query} - {len(results)} results")
+        return results
+        
     def research_wikipedia(self, person_name):
         """Research person on Wikipedia and extract key information"""
-        try:
-            # Search for the person
-            search_results = wikipedia.search(person_name, results=3)
-            
-            if not search_results:
-                return None
+        return self.research_wikipedia_many([person_name])[0]
+        
+    def research_wikipedia_many(self, names):
+        """Research people on Wikipedia concurrently, one info dict (or None) per name"""
+        # Search for each person through the MediaWiki API, so both
+        # requests go through the HTTP cache
+        api_url = 'https://en.wikipedia.org/w/api.php'
+        searches = self.scheduler.get_many([(api_url, {
+            'action': 'query', 'list': 'search', 'srsearch': name,
+            'srlimit': 3, 'format': 'json'
+        }) for name in names])
+        
+        titles = []
+        for name, response in zip(names, searches):
+            try:
+                if isinstance(response, Exception):
+                    raise response
+                search_results = [result['title'] for result in response.json().get('query', {}).get('search', [])]
+                titles.append(search_results[0] if search_results else None)
+            except Exception as e:
+                logger.error(f"❌ Wikipedia research failed for {name}: {e}")
+                titles.append(None)
                 
-            # Get the page
-            page = wikipedia.page(search_results[0])
+        # Get the page text, URL and lead image of each top result
+        found = list(dict.fromkeys(title for title in titles if title))
+        pages = dict(zip(found, self.scheduler.get_many([(api_url, {
+            'action': 'query', 'titles': title, 'redirects': 1,
+            'prop': 'extracts|info|pageimages', 'explaintext': 1, 'inprop': 'url',
+            'piprop': 'original', 'format': 'json'
+        }) for title in found])))
+        
+        return [self._wikipedia_info(name, title, pages[title]) if title else None
+                for name, title in zip(names, titles)]
+        
+    def _wikipedia_info(self, person_name, title, response):
+        """Extract key information and connections from a Wikipedia page"""
+        try:
+            if isinstance(response, Exception):
+                raise response
+            page = next(iter(response.json().get('query', {}).get('pages', {}).values()), {})
+            content = page.get('extract', '')
             
             # Extract key information
             info = {
-                'name': page.title,
-                'summary': wikipedia.summary(person_name, sentences=3),
-                'url': page.url,
-                'image_url': None,
+                'name': page.get('title', title),
+                'summary': ' '.join(re.split(r'(?<=[.!?])\s+', content.split('\n', 1)[0])[:3]),
+                'url': page.get('fullurl', f"https://en.wikipedia.org/wiki/{quote_plus(title.replace(' ', '_'))}"),
+                'image_url': page.get('original', {}).get('source'),
                 'birth_date': None,
                 'connections': []
             }
-            
-            # Try to get image
-            try:
-                if hasattr(page, 'images') and page.images:
-                    # Look for a main portrait image
-                    for img_url in page.images[:5]:
-                        if any(term in img_url.lower() for term in ['portrait', 'headshot', '.jpg', '.png']):
-                            info['image_url'] = img_url
-                            break
-                    if not info['image_url']:
-                        info['image_url'] = page.images[0]  # Fallback to first image
-            except:
-                pass
                 
             # Look for connections in content
-            content_lower = page.content.lower()
+            content_lower = content.lower()
             epstein_keywords = ['epstein', 'maxwell', 'trump', 'clinton', 'andrew']
             
             for keyword in epstein_keywords:
                 if keyword in content_lower:
                     # Extract sentences containing the keyword
-                    sentences = page.content.split('.')
+                    sentences = content.split('.')
                     for sentence in sentences:
                         if keyword in sentence.lower() and len(sentence.strip()) > 10:
                             info['connections'].append({
@@ -276,6 +388,9 @@ class AnonymousResearcher:
                             })
                             break
                             
+            self.article_store.add(kind='wikipedia', url=info['url'], title=info['name'], body=content,
+                                   source='Wikipedia')
+                            
             logger.info(f"📖 Wikipedia research: {person_name} - Found connections: {len(info['connections'])}")
             return info
             
@@ -286,23 +401,23 @@ class AnonymousResearcher:
     def verify_timeline_dates(self):
         """Verify dates in the timeline against external sources"""
         try:
-            # Load current timeline
-            tree = ET.parse('timeline-comprehensive.xml')
-            root = tree.getroot()
+            # Stream the current timeline into the verification state
+            changes = self.verification_state.sync(iter_timeline_events(self.timeline_path))
+            events = self.verification_state.due(self.verification_budget, self.recheck_days)
             
             verification_results = []
             
-            for event in root.findall('event')[:10]:  # Limit to first 10 for daily check
-                title = event.get('title', '')
-                date = event.get('start', '')
-                
-                if not title or not date:
+            # Research the events together; the scheduler paces the requests
+            all_results = self.research_duckduckgo_many(
+                [f"{event['title']} {event['start']} Epstein Trump" for event in events])
+            
+            searched = []
+            for event, results in zip(events, all_results):
+                # A failed search says nothing about the event, which stays due
+                if results is None:
                     continue
-                    
-                # Research the event
-                search_query = f"{title} {date} Epstein Trump"
-                results = self.research_duckduckgo(search_query)
-                
+                searched.append(event)
+                title, date = event['title'], event['start']
                 verification = {
                     'title': title,
                     'stated_date': date,
@@ -320,30 +435,48 @@ class AnonymousResearcher:
                             break
                             
                 verification_results.append(verification)
-                time.sleep(1)  # Rate limiting
                 
-            logger.info(f"✅ Verified {len(verification_results)} timeline events")
+            # Searched events rotate to the back of the queue
+            for event, verification in zip(searched, verification_results):
+                self.verification_state.record(event, verification['verification_status'],
+                                               verification['confidence'])
+                    
+            coverage = self.verification_state.coverage(self.recheck_days)
+            if len(searched) < len(events):
+                logger.warning(f"⚠️ {len(events) - len(searched)} timeline searches failed; those events stay due")
+            logger.info(f"✅ Verified {len(verification_results)} timeline events "
+                        f"({changes['new'] + changes['changed']} new or edited in the timeline); "
+                        f"{coverage['current']}/{coverage['events']} verified within {self.recheck_days} days")
             return verification_results
             
         except Exception as e:
             logger.error(f"❌ Timeline verification failed: {e}")
             return []
             
-    def monitor_trump_distractions(self):
+    def monitor_trump_distractions(self, time_period=None):
         """Enhanced monitoring for Trump distraction tactics with scoring and correlation analysis"""
         try:
             distraction_alerts = []
-            current_month = datetime.now().strftime('%Y %B')
+            current_month = time_period or datetime.now().strftime('%Y %B')
+            
+            # Fetch the baseline and every pattern's searches in one batch
+            pattern_queries = {pattern_name: self.pattern_queries(pattern_data, current_month)
+                               for pattern_name, pattern_data in self.distraction_patterns.items()}
+            queries = list(dict.fromkeys(self.baseline_queries(current_month) +
+                                         [query for batch in pattern_queries.values() for query in batch]))
+            search_results = dict(zip(queries, (results or []
+                                                for results in self.research_duckduckgo_many(queries))))
             
             # First, get baseline Epstein news for the period
-            epstein_baseline = self.get_epstein_news_baseline(current_month)
+            epstein_baseline = self.get_epstein_news_baseline(current_month, search_results)
             
             # Analyze each distraction pattern
             for pattern_name, pattern_data in self.distraction_patterns.items():
                 logger.info(f"🔍 Analyzing pattern: {pattern_name}")
                 
                 # Search for this specific pattern
-                pattern_results = self.analyze_distraction_pattern(pattern_name, pattern_data, current_month)
+                pattern_results = self.analyze_distraction_pattern(pattern_name, pattern_data, current_month,
+                                                                   search_results)
                 
                 if pattern_results:
                     # Calculate distraction probability score
@@ -367,8 +500,6 @@ class AnonymousResearcher:
                         }
                         distraction_alerts.append(alert)
                         
-                time.sleep(2)  # Rate limiting
-                
             # Perform temporal correlation analysis
             temporal_analysis = self.perform_temporal_correlation_analysis(distraction_alerts, epstein_baseline)
             
@@ -383,21 +514,33 @@ class AnonymousResearcher:
             logger.error(f"❌ Distraction monitoring failed: {e}")
             return {'alerts': [], 'temporal_analysis': {}, 'summary': {}}
             
-    def get_epstein_news_baseline(self, time_period):
-        """Get baseline Epstein news activity for correlation analysis"""
+    def baseline_queries(self, time_period):
+        """Searches for baseline Epstein news in a period"""
+        return [
+            f"Jeffrey Epstein news {time_period}",
+            f"Epstein investigation updates {time_period}",
+            f"Maxwell documents unsealed {time_period}",
+            f"Epstein associates charges {time_period}"
+        ]
+        
+    def pattern_queries(self, pattern_data, time_period):
+        """Searches for a distraction pattern in a period"""
+        queries = []
+        for keyword in pattern_data['keywords']:
+            queries.append(f"Trump {keyword} {time_period}")
+            queries.append(f"Trump administration {keyword} {time_period}")
+        return queries[:6]  # Limit queries to avoid rate limiting
+        
+    def get_epstein_news_baseline(self, time_period, search_results=None):
+        """Get baseline Epstein news activity for correlation analysis
+        
+        search_results maps queries to results fetched beforehand; missing
+        queries are searched here.
+        """
         try:
-            epstein_queries = [
-                f"Jeffrey Epstein news {time_period}",
-                f"Epstein investigation updates {time_period}",
-                f"Maxwell documents unsealed {time_period}",
-                f"Epstein associates charges {time_period}"
-            ]
-            
-            all_results = []
-            for query in epstein_queries:
-                results = self.research_duckduckgo(query)
-                all_results.extend(results)
-                time.sleep(1)
+            epstein_queries = self.baseline_queries(time_period)
+            all_results = self._distinct_results(
+                [result for results in self._search_all(epstein_queries, search_results) for result in results])
                 
             # Analyze temporal patterns in Epstein news
             news_activity = {
@@ -408,10 +551,10 @@ class AnonymousResearcher:
             }
             
             for result in all_results:
-                text = result.get('text', '').lower()
-                if any(keyword.lower() in text for keyword in ['unsealed', 'charges', 'arrest', 'investigation']):
+                hits = self.keyword_matcher.scan(result.get('text', ''))
+                if 'major_stories' in hits:
                     news_activity['major_stories'].append(result)
-                if any(keyword.lower() in text for keyword in ['documents', 'testimony', 'evidence']):
+                if 'investigation_updates' in hits:
                     news_activity['investigation_updates'].append(result)
                     
             return news_activity
@@ -420,20 +563,13 @@ class AnonymousResearcher:
             logger.error(f"❌ Failed to get Epstein baseline: {e}")
             return {'total_articles': 0, 'key_developments': [], 'major_stories': [], 'investigation_updates': []}
             
-    def analyze_distraction_pattern(self, pattern_name, pattern_data, time_period):
+    def analyze_distraction_pattern(self, pattern_name, pattern_data, time_period, search_results=None):
         """Analyze specific distraction pattern with enhanced detection"""
         try:
             # Build comprehensive search queries
-            queries = []
-            for keyword in pattern_data['keywords']:
-                queries.append(f"Trump {keyword} {time_period}")
-                queries.append(f"Trump administration {keyword} {time_period}")
-                
-            all_results = []
-            for query in queries[:6]:  # Limit queries to avoid rate limiting
-                results = self.research_duckduckgo(query)
-                all_results.extend(results)
-                time.sleep(1)
+            queries = self.pattern_queries(pattern_data, time_period)
+            all_results = self._distinct_results(
+                [result for results in self._search_all(queries, search_results) for result in results])
                 
             if not all_results:
                 return None
@@ -450,28 +586,24 @@ class AnonymousResearcher:
             
             # Analyze each result for pattern characteristics
             for result in all_results:
-                text = result.get('text', '').lower()
+                hits = self.keyword_matcher.scan(result.get('text', ''))
                 
-                # Count keyword matches
-                for keyword in pattern_data['keywords']:
-                    if keyword.lower() in text:
-                        if keyword not in pattern_analysis['keyword_matches']:
-                            pattern_analysis['keyword_matches'][keyword] = 0
-                        pattern_analysis['keyword_matches'][keyword] += 1
+                # Count results matching each keyword
+                for keyword in hits.get(pattern_name, {}):
+                    if keyword not in pattern_analysis['keyword_matches']:
+                        pattern_analysis['keyword_matches'][keyword] = 0
+                    pattern_analysis['keyword_matches'][keyword] += 1
                         
                 # Identify timing indicators
-                timing_words = ['immediate', 'urgent', 'emergency', 'breaking', 'developing', 'just announced']
-                if any(word in text for word in timing_words):
+                if 'timing_indicators' in hits:
                     pattern_analysis['timing_indicators'].append(result)
                     
                 # Categorize sources
-                source = result.get('source', '').lower()
-                if any(outlet in source for outlet in ['reuters', 'ap', 'bbc', 'npr']):
-                    pattern_analysis['credibility_sources'].append(result)
-                elif any(platform in source for platform in ['twitter', 'truth social', 'facebook']):
-                    pattern_analysis['social_media_activity'].append(result)
-                elif any(term in source for term in ['white house', 'official', 'statement']):
-                    pattern_analysis['official_statements'].append(result)
+                source_hits = self.keyword_matcher.scan(result.get('source', ''))
+                for category in self.source_categories:
+                    if category in source_hits:
+                        pattern_analysis[category].append(result)
+                        break
                     
             return pattern_analysis
             
@@ -479,6 +611,24 @@ class AnonymousResearcher:
             logger.error(f"❌ Pattern analysis failed for {pattern_name}: {e}")
             return None
             
+    def _search_all(self, queries, search_results=None):
+        """Result lists for queries, searching those not in search_results"""
+        search_results = dict(search_results or {})
+        missing = [query for query in queries if query not in search_results]
+        if missing:
+            search_results.update(zip(missing, (results or []
+                                                for results in self.research_duckduckgo_many(missing))))
+        return [search_results[query] for query in queries]
+        
+    def _distinct_results(self, results):
+        """One result per story
+        
+        Overlapping queries return the same results and outlets syndicate
+        the same story, which would otherwise inflate the counts scored.
+        """
+        return [{**cluster['story'], 'copies': cluster['copies']}
+                for cluster in collapse_duplicates(results, lambda result: result.get('text', ''))]
+        
     def calculate_distraction_score(self, pattern_results, epstein_baseline, pattern_data):
         """Calculate sophisticated distraction probability score"""
         try:
@@ -670,6 +820,12 @@ class AnonymousResearcher:
             for alert in sorted_alerts[:3]
         ]
             
+    def known_people(self):
+        """Gazetteer of known people, loaded once per researcher"""
+        if self.gazetteer is None:
+            self.gazetteer = load_gazetteer()
+        return self.gazetteer
+        
     def discover_new_connections(self):
         """Discover new connections and associates"""
         try:
@@ -685,28 +841,35 @@ class AnonymousResearcher:
                 "Pentagon officials Epstein investigation"
             ]
             
+            self.research_duckduckgo_many(research_queries)
+            
+            # Rank everything gathered so far, not just each query's results
+            documents = {}  # article id -> (query, source, text) it was first found through
             for query in research_queries:
-                results = self.research_duckduckgo(query)
-                
-                for result in results:
-                    # Extract potential names from results
-                    text = result.get('text', '')
-                    # Simple name extraction (could be enhanced with NLP)
-                    names = re.findall(r'\b[A-Z][a-z]+ [A-Z][a-z]+\b', text)
+                for article in self.article_store.search(query, limit=25, min_match=0.5):
+                    documents.setdefault(article['id'], (query, article['source'],
+                                                         f"{article['title']} {article['body']}"))
                     
-                    for name in names[:3]:  # Limit per result
-                        if name not in ['Jeffrey Epstein', 'Donald Trump']:  # Skip known names
-                            wiki_info = self.research_wikipedia(name)
-                            if wiki_info and wiki_info.get('connections'):
-                                new_connections.append({
-                                    'name': name,
-                                    'source_query': query,
-                                    'wikipedia_info': wiki_info,
-                                    'discovery_date': datetime.now().isoformat()
-                                })
-                                
-                time.sleep(3)  # Rate limiting
+            known = {'Jeffrey Epstein', 'Donald Trump'}  # Skip known names
+            gazetteer = self.known_people()
+            if gazetteer:
+                leads, co_mentions = self._gazetteer_leads(gazetteer, documents, known)
+            else:
+                leads, co_mentions = self._regex_leads(documents, known), {}
                 
+            # Look every lead up on Wikipedia in one batch
+            for (name, (query, source)), wiki_info in zip(leads.items(), self.research_wikipedia_many(list(leads))):
+                mentioned_with = co_mentions.get(name, Counter())
+                if mentioned_with or (wiki_info and wiki_info.get('connections')):
+                    new_connections.append({
+                        'name': name,
+                        'source_query': query,
+                        'source': source,
+                        'co_mentions': dict(mentioned_with.most_common()),
+                        'wikipedia_info': wiki_info,
+                        'discovery_date': datetime.now().isoformat()
+                    })
+                    
             logger.info(f"🔍 Discovered {len(new_connections)} potential new connections")
             return new_connections
             
@@ -714,6 +877,33 @@ class AnonymousResearcher:
             logger.error(f"❌ Connection discovery failed: {e}")
             return []
             
+    def _gazetteer_leads(self, gazetteer, documents, known):
+        """Known people in the documents, and who each was mentioned alongside in how many"""
+        leads = {}
+        found = {}  # article id -> people mentioned in it
+        for key, (query, source, text) in documents.items():
+            found[key] = gazetteer.find(text)
+            for name in found[key]:
+                if name not in known and name not in leads:
+                    leads[name] = (query, source)
+                    
+        co_mentions = {}  # name -> Counter of people mentioned in the same document
+        for batch in gazetteer.co_mentions(found.items()):
+            for first, second, _ in batch:
+                co_mentions.setdefault(first, Counter())[second] += 1
+                co_mentions.setdefault(second, Counter())[first] += 1
+        return leads, co_mentions
+        
+    def _regex_leads(self, documents, known):
+        """Capitalized name pairs in the documents, for when no gazetteer could be loaded"""
+        leads = {}
+        for query, source, text in documents.values():
+            names = re.findall(r'\b[A-Z][a-z]+ [A-Z][a-z]+\b', text)
+            for name in names[:3]:  # Limit per result
+                if name not in known and name not in leads:
+                    leads[name] = (query, source)
+        return leads
+            
     def generate_daily_report(self):
         """Generate comprehensive daily research report with enhanced distraction analysis"""
         logger.info("🕵️ Generating comprehensive daily report...")
@@ -790,10 +980,15 @@ class AnonymousResearcher:
                 
         return report
         
-    def export_distraction_data_for_web(self):
-        """Export distraction analysis data in format suitable for web interface"""
+    def export_distraction_data_for_web(self, distraction_data=None):
+        """Export distraction analysis data in format suitable for web interface
+        
+        distraction_data is an analysis from monitor_trump_distractions;
+        without it the patterns are monitored again.
+        """
         try:
-            distraction_data = self.monitor_trump_distractions()
+            if distraction_data is None:
+                distraction_data = self.monitor_trump_distractions()
             
             # Format for JavaScript consumption
             web_data = {
@@ -819,8 +1014,7 @@ class AnonymousResearcher:
                 web_data['alerts'].append(web_alert)
                 
             # Save to JSON file for web interface
-            with open('distraction-analysis.json', 'w') as f:
-                json.dump(web_data, f, indent=2)
+            write_json_atomic('distraction-analysis.json', web_data)
                 
             logger.info(f"💾 Distraction analysis exported for web interface")
             return web_data
@@ -833,8 +1027,7 @@ class AnonymousResearcher:
         """Save research report to file"""
         try:
             filename = f"research-report-{datetime.now().strftime('%Y%m%d')}.json"
-            with open(filename, 'w') as f:
-                json.dump(report, f, indent=2)
+            write_json_atomic(filename, report)
             logger.info(f"💾 Report saved: {filename}")
             return filename
         except Exception as e:
@@ -858,10 +1051,13 @@ def main():
     report = researcher.generate_daily_report()
     
     # Export distraction data for web interface
-    web_data = researcher.export_distraction_data_for_web()
+    web_data = researcher.export_distraction_data_for_web(report['distraction_analysis'])
     
     # Save report
     filename = researcher.save_report(report)
+    researcher.http_cache.log_summary()
+    researcher.scheduler.log_summary()
+    researcher.scheduler.close()
     
     # Print enhanced summary
     print(f"\n📊 Enhanced Research Summary ({datetime.now().strftime('%Y-%m-%d')})")
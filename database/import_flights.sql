@@ -98,10 +98,23 @@ $$ LANGUAGE plpgsql;
 CREATE OR REPLACE FUNCTION clean_passenger_name(name_raw VARCHAR) RETURNS VARCHAR AS $$
 DECLARE
     cleaned_name VARCHAR;
+    alias_name VARCHAR;
 BEGIN
     -- Remove quotes and trim whitespace
     cleaned_name := TRIM(REPLACE(name_raw, '"', ''));
     
+    -- Prefer recorded aliases (curated, or written by scripts/entity_resolution.py)
+    SELECT p.full_name INTO alias_name
+    FROM flight_data.passenger_aliases a
+    JOIN flight_data.passengers p ON a.passenger_id = p.id
+    WHERE LOWER(a.alias) = LOWER(cleaned_name)
+    ORDER BY a.confidence_level DESC NULLS LAST
+    LIMIT 1;
+    
+    IF alias_name IS NOT NULL THEN
+        RETURN alias_name;
+    END IF;
+    
     -- Handle common name variations
     cleaned_name := CASE
         WHEN cleaned_name ILIKE 'jeff epstein' THEN 'Jeffrey Epstein'
@@ -213,9 +226,9 @@ DECLARE
     location_uuid UUID;
 BEGIN
     -- Try to find existing location
-    SELECT id INTO location_uuid 
-    FROM flight_data.locations 
-    WHERE airport_code = UPPER(airport_code);
+    SELECT l.id INTO location_uuid 
+    FROM flight_data.locations l 
+    WHERE l.airport_code = UPPER(find_or_create_location.airport_code);
     
     IF location_uuid IS NOT NULL THEN
         RETURN location_uuid;
@@ -252,6 +265,8 @@ DECLARE
     passenger_uuid UUID;
     aircraft_uuid UUID;
     flight_date_parsed DATE;
+    flight_hash CHAR(32);
+    flight_inserted BOOLEAN;
 BEGIN
     -- Get the primary aircraft (N908JE) for flights without specific aircraft assignment
     SELECT id INTO aircraft_uuid FROM flight_data.aircraft WHERE tail_number = 'N908JE';
@@ -269,59 +284,86 @@ BEGIN
         departure_uuid := find_or_create_location(flight_record.departure_code);
         arrival_uuid := find_or_create_location(flight_record.arrival_code);
         
-        -- Create the flight record
+        -- Cleaned passenger names in manifest order, blanks dropped
+        passenger_list := ARRAY(
+            SELECT clean_passenger_name(name)
+            FROM unnest(string_to_array(COALESCE(flight_record.passengers_raw, ''), ',')) WITH ORDINALITY AS p(name, position)
+            WHERE clean_passenger_name(name) != ''
+            ORDER BY position
+        );
+        
+        -- Hashed like the Python importer's flight_content_hash
+        flight_hash := md5(concat_ws(E'\x1f',
+            COALESCE(flight_record.flight_no, ''),
+            to_char(flight_date_parsed, 'YYYY-MM-DD'),
+            UPPER(TRIM(flight_record.departure_code)),
+            UPPER(TRIM(flight_record.arrival_code)),
+            array_to_string(passenger_list, E'\x1e')
+        ));
+        
+        -- Upsert the flight on its natural key; an identical row is a no-op
         INSERT INTO flight_data.flights (
             flight_number,
             aircraft_id,
             departure_location_id,
             arrival_location_id,
             flight_date,
+            passenger_count,
             manifest_id,
             source_document,
-            data_quality
+            data_quality,
+            content_hash
         ) VALUES (
             flight_record.flight_no,
             aircraft_uuid,
             departure_uuid,
             arrival_uuid,
             flight_date_parsed,
+            cardinality(passenger_list),
             'CSV_IMPORT_' || flight_record.flight_no || '_' || flight_record.date_str,
             'flight_flights_table.csv',
-            'standard'
-        ) RETURNING id INTO flight_uuid;
+            'standard',
+            flight_hash
+        )
+        ON CONFLICT ON CONSTRAINT uq_flights_natural_key DO UPDATE SET
+            aircraft_id = EXCLUDED.aircraft_id,
+            passenger_count = EXCLUDED.passenger_count,
+            manifest_id = EXCLUDED.manifest_id,
+            source_document = EXCLUDED.source_document,
+            content_hash = EXCLUDED.content_hash,
+            updated_at = NOW()
+        WHERE flight_data.flights.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+        RETURNING id, (xmax = 0) INTO flight_uuid, flight_inserted;
         
-        -- Parse passengers
-        IF flight_record.passengers_raw IS NOT NULL AND TRIM(flight_record.passengers_raw) != '' THEN
-            -- Split passenger list by comma
-            passenger_list := string_to_array(flight_record.passengers_raw, ',');
-            
-            FOREACH passenger_name IN ARRAY passenger_list LOOP
-                passenger_name := TRIM(passenger_name);
-                IF passenger_name != '' THEN
-                    -- Find or create passenger
-                    passenger_uuid := find_or_create_passenger(passenger_name);
-                    
-                    -- Link passenger to flight
-                    INSERT INTO flight_data.flight_passengers (
-                        flight_id,
-                        passenger_id,
-                        passenger_role,
-                        name_in_manifest
-                    ) VALUES (
-                        flight_uuid,
-                        passenger_uuid,
-                        'passenger',
-                        passenger_name
-                    );
-                END IF;
-            END LOOP;
-            
-            -- Update flight passenger count
-            UPDATE flight_data.flights 
-            SET passenger_count = array_length(passenger_list, 1)
-            WHERE id = flight_uuid;
+        IF NOT FOUND THEN
+            RAISE NOTICE 'Unchanged flight: % on %', flight_record.flight_no, flight_date_parsed;
+            CONTINUE;
+        END IF;
+        
+        -- A changed flight's passenger links are replaced
+        IF NOT flight_inserted THEN
+            DELETE FROM flight_data.flight_passengers WHERE flight_id = flight_uuid;
         END IF;
         
+        -- Link passengers
+        FOREACH passenger_name IN ARRAY passenger_list LOOP
+            -- Find or create passenger
+            passenger_uuid := find_or_create_passenger(passenger_name);
+            
+            -- Link passenger to flight
+            INSERT INTO flight_data.flight_passengers (
+                flight_id,
+                passenger_id,
+                passenger_role,
+                name_in_manifest
+            ) VALUES (
+                flight_uuid,
+                passenger_uuid,
+                'passenger',
+                passenger_name
+            );
+        END LOOP;
+        
         RAISE NOTICE 'Imported flight: % on % from % to % with % passengers', 
             flight_record.flight_no, 
             flight_date_parsed, 
@@ -331,7 +373,10 @@ BEGIN
     END LOOP;
 END $$;
 
--- Update passenger connection counts based on imported flights
+-- Update passenger connection counts based on imported flights. This is a
+-- full rebuild, so link changes queued for incremental maintenance are done.
+DELETE FROM investigation.connection_changes;
+
 INSERT INTO investigation.passenger_connections (
     passenger1_id, 
     passenger2_id, 
@@ -342,9 +387,9 @@ INSERT INTO investigation.passenger_connections (
     last_documented_interaction,
     relationship_status
 )
-SELECT DISTINCT
-    p1.id,
-    p2.id,
+SELECT
+    passenger1_id,
+    passenger2_id,
     'co_traveler',
     LEAST(10, shared_flights * 2), -- Scale connection strength by shared flights
     shared_flights,
@@ -358,19 +403,24 @@ FROM (
         COUNT(*) as shared_flights,
         MIN(f.flight_date) as min_date,
         MAX(f.flight_date) as max_date
-    FROM flight_data.flight_passengers fp1
-    JOIN flight_data.flight_passengers fp2 ON fp1.flight_id = fp2.flight_id 
+    FROM (SELECT DISTINCT flight_id, passenger_id FROM flight_data.flight_passengers) fp1
+    JOIN (SELECT DISTINCT flight_id, passenger_id FROM flight_data.flight_passengers) fp2
+        ON fp1.flight_id = fp2.flight_id 
         AND fp1.passenger_id < fp2.passenger_id -- Avoid duplicates and self-references
     JOIN flight_data.flights f ON fp1.flight_id = f.id
     GROUP BY fp1.passenger_id, fp2.passenger_id
     HAVING COUNT(*) > 1 -- Only relationships with multiple shared flights
 ) shared_flight_data
-JOIN flight_data.passengers p1 ON shared_flight_data.passenger1_id = p1.id
-JOIN flight_data.passengers p2 ON shared_flight_data.passenger2_id = p2.id
-ON CONFLICT (passenger1_id, passenger2_id) DO UPDATE SET
+-- Matches stored pairs entered either way round (uq_passenger_connection_pair)
+ON CONFLICT ((LEAST(passenger1_id, passenger2_id)), (GREATEST(passenger1_id, passenger2_id))) DO UPDATE SET
     shared_flights_count = EXCLUDED.shared_flights_count,
-    connection_strength = EXCLUDED.connection_strength,
-    last_documented_interaction = EXCLUDED.last_documented_interaction;
+    first_documented_interaction = EXCLUDED.first_documented_interaction,
+    last_documented_interaction = EXCLUDED.last_documented_interaction,
+    connection_strength = CASE
+        WHEN passenger_connections.connection_type = 'co_traveler' THEN EXCLUDED.connection_strength
+        ELSE passenger_connections.connection_strength
+    END,
+    updated_at = NOW();
 
 -- Analyze flight patterns and create pattern records
 INSERT INTO investigation.flight_patterns (
@@ -387,7 +437,7 @@ SELECT
     dl.airport_code || ' to ' || al.airport_code || ' Route',
     'frequent_route',
     'Route flown ' || COUNT(*) || ' times between ' || MIN(f.flight_date) || ' and ' || MAX(f.flight_date),
-    array_agg(f.id),
+    array_agg(f.id ORDER BY f.flight_date, f.id),
     COUNT(*),
     MIN(f.flight_date),
     MAX(f.flight_date),
@@ -400,7 +450,15 @@ FROM flight_data.flights f
 JOIN flight_data.locations dl ON f.departure_location_id = dl.id
 JOIN flight_data.locations al ON f.arrival_location_id = al.id
 GROUP BY dl.airport_code, al.airport_code, dl.id, al.id
-HAVING COUNT(*) > 2;
+HAVING COUNT(*) > 2
+ON CONFLICT ON CONSTRAINT uq_flight_pattern DO UPDATE SET
+    description = EXCLUDED.description,
+    involved_flights = EXCLUDED.involved_flights,
+    frequency_count = EXCLUDED.frequency_count,
+    date_range_start = EXCLUDED.date_range_start,
+    date_range_end = EXCLUDED.date_range_end,
+    risk_assessment = EXCLUDED.risk_assessment,
+    updated_at = NOW();
 
 -- Update statistics for query optimization
 ANALYZE flight_data.flights;
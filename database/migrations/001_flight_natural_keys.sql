@@ -0,0 +1,57 @@
+-- Migration 001: natural keys for idempotent flight imports
+-- Removes duplicates left by repeated imports, then adds the unique
+-- constraints and content hash column that scripts/import_csv_data.py
+-- upserts against.
+
+\c creepstate_flights_db;
+
+BEGIN;
+
+-- Content hash of the normalized source row (filled on the next import)
+ALTER TABLE flight_data.flights ADD COLUMN IF NOT EXISTS content_hash CHAR(32);
+
+-- Keep the oldest copy of every flight; passenger links of the removed
+-- copies go with them (ON DELETE CASCADE)
+DELETE FROM flight_data.flights f
+USING flight_data.flights keep
+WHERE keep.flight_number IS NOT DISTINCT FROM f.flight_number
+  AND keep.flight_date = f.flight_date
+  AND keep.departure_location_id IS NOT DISTINCT FROM f.departure_location_id
+  AND keep.arrival_location_id IS NOT DISTINCT FROM f.arrival_location_id
+  AND (keep.created_at, keep.id) < (f.created_at, f.id);
+
+-- Keep the most recent pattern row per pattern
+DELETE FROM investigation.flight_patterns p
+USING investigation.flight_patterns keep
+WHERE keep.pattern_type IS NOT DISTINCT FROM p.pattern_type
+  AND keep.pattern_name = p.pattern_name
+  AND (keep.created_at, keep.id) > (p.created_at, p.id);
+
+-- Drop pattern flight references to the removed duplicate flights
+UPDATE investigation.flight_patterns p
+SET involved_flights = ARRAY(
+    SELECT flight_id FROM unnest(p.involved_flights) AS flight_id
+    WHERE EXISTS (SELECT 1 FROM flight_data.flights f WHERE f.id = flight_id)
+)
+WHERE p.involved_flights IS NOT NULL;
+
+-- Keep the oldest connection per passenger pair
+DELETE FROM investigation.passenger_connections c
+USING investigation.passenger_connections keep
+WHERE keep.passenger1_id = c.passenger1_id
+  AND keep.passenger2_id = c.passenger2_id
+  AND (keep.created_at, keep.id) < (c.created_at, c.id);
+
+ALTER TABLE flight_data.flights
+    ADD CONSTRAINT uq_flights_natural_key
+    UNIQUE (flight_number, flight_date, departure_location_id, arrival_location_id);
+
+ALTER TABLE investigation.passenger_connections
+    ADD CONSTRAINT uq_passenger_connection UNIQUE (passenger1_id, passenger2_id);
+
+ALTER TABLE investigation.flight_patterns
+    ADD CONSTRAINT uq_flight_pattern UNIQUE (pattern_type, pattern_name);
+
+COMMIT;
+
+\echo 'Migration 001 applied: flight natural keys and content hashes.'
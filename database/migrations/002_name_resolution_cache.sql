@@ -0,0 +1,26 @@
+-- Migration 002: entity resolution cache for passenger names
+-- Stores one decision per manifest spelling so scripts/entity_resolution.py
+-- only scores spellings it has not seen before.
+
+\c creepstate_flights_db;
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS flight_data.name_resolution_cache (
+    name_key VARCHAR(255) PRIMARY KEY, -- lowercased spelling
+    passenger_id UUID REFERENCES flight_data.passengers(id) ON DELETE CASCADE,
+    decision VARCHAR(20) NOT NULL CHECK (decision IN ('canonical', 'alias', 'distinct')),
+    similarity NUMERIC(4,3),
+    resolver_version INTEGER NOT NULL,
+    decided_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Case-insensitive alias lookups from the importers and clean_passenger_name()
+CREATE INDEX IF NOT EXISTS idx_aliases_lower ON flight_data.passenger_aliases(LOWER(alias));
+
+GRANT SELECT ON flight_data.name_resolution_cache TO flight_reader;
+GRANT ALL ON flight_data.name_resolution_cache TO flight_analyst;
+
+COMMIT;
+
+\echo 'Migration 002 applied: name resolution cache.'
@@ -0,0 +1,34 @@
+-- Migration 003: progress journal for resumable CSV imports
+-- scripts/import_csv_data.py records the byte offset and row count of each
+-- committed batch here so an interrupted import continues with --resume.
+
+\c creepstate_flights_db;
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS flight_data.import_journal (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    source_document VARCHAR(255) NOT NULL,
+    file_fingerprint CHAR(32) NOT NULL, -- MD5 of file size and leading bytes
+    file_size BIGINT NOT NULL,
+    byte_offset BIGINT NOT NULL, -- first byte after the last committed row
+    rows_processed BIGINT NOT NULL DEFAULT 0,
+    flights_inserted INTEGER DEFAULT 0,
+    flights_updated INTEGER DEFAULT 0,
+    flights_unchanged INTEGER DEFAULT 0,
+    errors INTEGER DEFAULT 0,
+    status VARCHAR(20) NOT NULL DEFAULT 'running' CHECK (status IN ('running', 'completed', 'failed', 'interrupted')),
+    started_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW(),
+    completed_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_import_journal_file
+    ON flight_data.import_journal(source_document, file_fingerprint, started_at);
+
+GRANT SELECT ON flight_data.import_journal TO flight_reader;
+GRANT ALL ON flight_data.import_journal TO flight_analyst;
+
+COMMIT;
+
+\echo 'Migration 003 applied: import journal.'
@@ -0,0 +1,157 @@
+-- Migration 004: statement-level audit triggers
+-- Replaces the FOR EACH ROW audit triggers with FOR EACH STATEMENT triggers
+-- that read transition tables, and adds the bulk-load audit mode used by the
+-- importers (one summary audit_log entry per import batch).
+
+\c creepstate_flights_db;
+
+BEGIN;
+
+DROP TRIGGER IF EXISTS audit_flights ON flight_data.flights;
+DROP TRIGGER IF EXISTS audit_passengers ON flight_data.passengers;
+DROP TRIGGER IF EXISTS audit_flight_passengers ON flight_data.flight_passengers;
+DROP TRIGGER IF EXISTS audit_connections ON investigation.passenger_connections;
+DROP FUNCTION IF EXISTS security_audit.log_data_changes();
+
+-- Function to log data changes, once per statement. The transition tables
+-- hold every affected row, so a bulk statement writes its audit rows in a
+-- single INSERT ... SELECT instead of one trigger call per row.
+-- In bulk-load audit mode (security_audit.begin_bulk_audit) only row counts
+-- are accumulated, and security_audit.end_bulk_audit writes one summary entry.
+CREATE OR REPLACE FUNCTION security_audit.log_statement_changes() RETURNS TRIGGER AS $$
+DECLARE
+    affected BIGINT;
+    counts JSONB;
+    count_key TEXT := TG_TABLE_NAME || '.' || TG_OP;
+BEGIN
+    IF current_setting('app.audit_mode', true) = 'bulk' THEN
+        IF TG_OP = 'DELETE' THEN
+            SELECT COUNT(*) INTO affected FROM old_rows;
+        ELSE
+            SELECT COUNT(*) INTO affected FROM new_rows;
+        END IF;
+        IF affected > 0 THEN
+            counts := COALESCE(NULLIF(current_setting('app.audit_counts', true), ''), '{}')::jsonb;
+            counts := counts || jsonb_build_object(count_key, COALESCE((counts ->> count_key)::bigint, 0) + affected);
+            PERFORM set_config('app.audit_counts', counts::text, true);
+        END IF;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO security_audit.audit_log (table_name, operation, record_id, old_values, user_id, session_id)
+        SELECT TG_TABLE_NAME, TG_OP, o.id, to_jsonb(o), current_setting('app.current_user_id', true), current_setting('app.session_id', true)
+        FROM old_rows o;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO security_audit.audit_log (table_name, operation, record_id, old_values, new_values, user_id, session_id)
+        SELECT TG_TABLE_NAME, TG_OP, n.id, to_jsonb(o), to_jsonb(n), current_setting('app.current_user_id', true), current_setting('app.session_id', true)
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id;
+    ELSIF TG_OP = 'INSERT' THEN
+        INSERT INTO security_audit.audit_log (table_name, operation, record_id, new_values, user_id, session_id)
+        SELECT TG_TABLE_NAME, TG_OP, n.id, to_jsonb(n), current_setting('app.current_user_id', true), current_setting('app.session_id', true)
+        FROM new_rows n;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Bulk-load audit mode for the rest of the current transaction
+CREATE OR REPLACE FUNCTION security_audit.begin_bulk_audit(p_batch_label TEXT) RETURNS VOID AS $$
+BEGIN
+    PERFORM set_config('app.audit_mode', 'bulk', true);
+    PERFORM set_config('app.audit_batch', p_batch_label, true);
+    PERFORM set_config('app.audit_counts', '{}', true);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Leave bulk mode, writing the summary entry for the current bulk-load batch
+CREATE OR REPLACE FUNCTION security_audit.end_bulk_audit() RETURNS UUID AS $$
+DECLARE
+    audit_id UUID;
+BEGIN
+    IF COALESCE(current_setting('app.audit_mode', true), '') <> 'bulk' THEN
+        RETURN NULL;
+    END IF;
+    PERFORM set_config('app.audit_mode', '', true);
+
+    -- A batch that changed nothing leaves no entry
+    IF COALESCE(NULLIF(current_setting('app.audit_counts', true), ''), '{}') = '{}' THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO security_audit.audit_log (table_name, operation, new_values, user_id, session_id)
+    VALUES (
+        'bulk_load',
+        'BULK_LOAD',
+        jsonb_build_object(
+            'batch', current_setting('app.audit_batch', true),
+            'row_counts', COALESCE(NULLIF(current_setting('app.audit_counts', true), ''), '{}')::jsonb
+        ),
+        current_setting('app.current_user_id', true),
+        current_setting('app.session_id', true)
+    )
+    RETURNING id INTO audit_id;
+
+    PERFORM set_config('app.audit_counts', '{}', true);
+    RETURN audit_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create audit triggers for all main tables. A trigger with transition
+-- tables can only fire on one event, hence three per table.
+DROP TRIGGER IF EXISTS audit_flights_insert ON flight_data.flights;
+CREATE TRIGGER audit_flights_insert AFTER INSERT ON flight_data.flights
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+DROP TRIGGER IF EXISTS audit_flights_update ON flight_data.flights;
+CREATE TRIGGER audit_flights_update AFTER UPDATE ON flight_data.flights
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+DROP TRIGGER IF EXISTS audit_flights_delete ON flight_data.flights;
+CREATE TRIGGER audit_flights_delete AFTER DELETE ON flight_data.flights
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+
+DROP TRIGGER IF EXISTS audit_passengers_insert ON flight_data.passengers;
+CREATE TRIGGER audit_passengers_insert AFTER INSERT ON flight_data.passengers
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+DROP TRIGGER IF EXISTS audit_passengers_update ON flight_data.passengers;
+CREATE TRIGGER audit_passengers_update AFTER UPDATE ON flight_data.passengers
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+DROP TRIGGER IF EXISTS audit_passengers_delete ON flight_data.passengers;
+CREATE TRIGGER audit_passengers_delete AFTER DELETE ON flight_data.passengers
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+
+DROP TRIGGER IF EXISTS audit_flight_passengers_insert ON flight_data.flight_passengers;
+CREATE TRIGGER audit_flight_passengers_insert AFTER INSERT ON flight_data.flight_passengers
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+DROP TRIGGER IF EXISTS audit_flight_passengers_update ON flight_data.flight_passengers;
+CREATE TRIGGER audit_flight_passengers_update AFTER UPDATE ON flight_data.flight_passengers
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+DROP TRIGGER IF EXISTS audit_flight_passengers_delete ON flight_data.flight_passengers;
+CREATE TRIGGER audit_flight_passengers_delete AFTER DELETE ON flight_data.flight_passengers
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+
+DROP TRIGGER IF EXISTS audit_connections_insert ON investigation.passenger_connections;
+CREATE TRIGGER audit_connections_insert AFTER INSERT ON investigation.passenger_connections
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+DROP TRIGGER IF EXISTS audit_connections_update ON investigation.passenger_connections;
+CREATE TRIGGER audit_connections_update AFTER UPDATE ON investigation.passenger_connections
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+DROP TRIGGER IF EXISTS audit_connections_delete ON investigation.passenger_connections;
+CREATE TRIGGER audit_connections_delete AFTER DELETE ON investigation.passenger_connections
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+
+COMMIT;
+
+\echo 'Migration 004 applied: statement-level audit triggers.'
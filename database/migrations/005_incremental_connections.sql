@@ -0,0 +1,80 @@
+-- Migration 005: incremental passenger connection maintenance
+-- Merges connections stored once each way round, enforces one row per
+-- unordered pair, and queues flight_passengers changes for the importers'
+-- incremental connection updates. Run
+--   python3 scripts/import_csv_data.py --rebuild-connections
+-- once afterwards so stored counts start from a full rebuild.
+
+\c creepstate_flights_db;
+
+BEGIN;
+
+-- Keep one row per unordered pair: curated rows over co_traveler rows,
+-- then the oldest
+DELETE FROM investigation.passenger_connections c
+USING (
+    SELECT id, ROW_NUMBER() OVER (
+        PARTITION BY LEAST(passenger1_id, passenger2_id), GREATEST(passenger1_id, passenger2_id)
+        ORDER BY connection_type = 'co_traveler', created_at, id
+    ) AS rank
+    FROM investigation.passenger_connections
+) ranked
+WHERE ranked.id = c.id AND ranked.rank > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_passenger_connection_pair ON investigation.passenger_connections
+    ((LEAST(passenger1_id, passenger2_id)), (GREATEST(passenger1_id, passenger2_id)));
+
+CREATE TABLE IF NOT EXISTS investigation.connection_changes (
+    id BIGSERIAL PRIMARY KEY,
+    flight_id UUID NOT NULL,
+    passenger_id UUID NOT NULL,
+    delta SMALLINT NOT NULL CHECK (delta IN (-1, 1)),
+    queued_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Queue passenger link changes for incremental connection maintenance
+CREATE OR REPLACE FUNCTION investigation.queue_connection_changes() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO investigation.connection_changes (flight_id, passenger_id, delta)
+        SELECT flight_id, passenger_id, 1 FROM new_rows
+        WHERE flight_id IS NOT NULL AND passenger_id IS NOT NULL;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO investigation.connection_changes (flight_id, passenger_id, delta)
+        SELECT flight_id, passenger_id, -1 FROM old_rows
+        WHERE flight_id IS NOT NULL AND passenger_id IS NOT NULL;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO investigation.connection_changes (flight_id, passenger_id, delta)
+        SELECT o.flight_id, o.passenger_id, -1
+        FROM old_rows o JOIN new_rows n ON n.id = o.id
+        WHERE (o.flight_id, o.passenger_id) IS DISTINCT FROM (n.flight_id, n.passenger_id)
+          AND o.flight_id IS NOT NULL AND o.passenger_id IS NOT NULL
+        UNION ALL
+        SELECT n.flight_id, n.passenger_id, 1
+        FROM old_rows o JOIN new_rows n ON n.id = o.id
+        WHERE (o.flight_id, o.passenger_id) IS DISTINCT FROM (n.flight_id, n.passenger_id)
+          AND n.flight_id IS NOT NULL AND n.passenger_id IS NOT NULL;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS queue_connections_insert ON flight_data.flight_passengers;
+CREATE TRIGGER queue_connections_insert AFTER INSERT ON flight_data.flight_passengers
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION investigation.queue_connection_changes();
+DROP TRIGGER IF EXISTS queue_connections_update ON flight_data.flight_passengers;
+CREATE TRIGGER queue_connections_update AFTER UPDATE ON flight_data.flight_passengers
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION investigation.queue_connection_changes();
+DROP TRIGGER IF EXISTS queue_connections_delete ON flight_data.flight_passengers;
+CREATE TRIGGER queue_connections_delete AFTER DELETE ON flight_data.flight_passengers
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION investigation.queue_connection_changes();
+
+GRANT ALL ON investigation.connection_changes TO flight_analyst;
+GRANT USAGE, SELECT ON SEQUENCE investigation.connection_changes_id_seq TO flight_analyst;
+
+COMMIT;
+
+\echo 'Migration 005 applied: incremental passenger connections.'
@@ -0,0 +1,48 @@
+-- Migration 006: precomputed route distances
+-- scripts/load_airports.py loads database/reference/airports.csv into
+-- flight_data.locations and stores the great-circle distance of every route
+-- in use here, so route analytics join a table instead of doing trigonometry.
+
+\c creepstate_flights_db;
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS flight_data.route_distances (
+    departure_location_id UUID NOT NULL REFERENCES flight_data.locations(id) ON DELETE CASCADE,
+    arrival_location_id UUID NOT NULL REFERENCES flight_data.locations(id) ON DELETE CASCADE,
+    distance_km NUMERIC(8,1) NOT NULL,
+    distance_nm NUMERIC(8,1) NOT NULL,
+    computed_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (departure_location_id, arrival_location_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_route_distances_arrival
+    ON flight_data.route_distances(arrival_location_id);
+
+CREATE OR REPLACE VIEW investigation.route_frequency AS
+SELECT 
+    dl.airport_code as departure_code,
+    al.airport_code as arrival_code,
+    dl.city || ', ' || dl.country as departure_location,
+    al.city || ', ' || al.country as arrival_location,
+    COUNT(*) as flight_count,
+    MIN(f.flight_date) as first_flight,
+    MAX(f.flight_date) as last_flight,
+    array_agg(DISTINCT a.tail_number) as aircraft_used,
+    rd.distance_km
+FROM flight_data.flights f
+JOIN flight_data.locations dl ON f.departure_location_id = dl.id
+JOIN flight_data.locations al ON f.arrival_location_id = al.id
+LEFT JOIN flight_data.aircraft a ON f.aircraft_id = a.id
+LEFT JOIN flight_data.route_distances rd
+    ON rd.departure_location_id = f.departure_location_id AND rd.arrival_location_id = f.arrival_location_id
+GROUP BY dl.airport_code, al.airport_code, dl.city, dl.country, al.city, al.country, rd.distance_km
+ORDER BY flight_count DESC;
+
+GRANT SELECT ON flight_data.route_distances TO flight_reader;
+GRANT ALL ON flight_data.route_distances TO flight_analyst;
+GRANT SELECT ON investigation.route_frequency TO flight_reader, flight_analyst;
+
+COMMIT;
+
+\echo 'Migration 006 applied: route distances.'
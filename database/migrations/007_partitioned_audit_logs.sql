@@ -0,0 +1,269 @@
+-- Migration 007: monthly partitioned security_audit logs
+-- Rebuilds audit_log, access_log and export_log as tables range partitioned
+-- by month on timestamp, with BRIN timestamp indexes, and adds
+-- security_audit.maintain_partitions() to create upcoming partitions and
+-- drop the ones past their retention (security_audit.partition_retention).
+-- Existing rows are copied into partitions covering their months; nothing
+-- is dropped here. The first maintain_partitions() run applies retention,
+-- so adjust partition_retention before it if older logs must be kept.
+-- Takes an exclusive lock on the three tables while rows are copied.
+
+\c creepstate_flights_db;
+
+BEGIN;
+
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'security_audit.audit_log'::regclass) = 'p' THEN
+        RAISE EXCEPTION 'security_audit.audit_log is already partitioned';
+    END IF;
+END;
+$$;
+
+LOCK TABLE security_audit.audit_log, security_audit.access_log, security_audit.export_log
+    IN ACCESS EXCLUSIVE MODE;
+
+-- Move the old tables aside, freeing their index and constraint names
+DROP INDEX IF EXISTS security_audit.idx_audit_table;
+DROP INDEX IF EXISTS security_audit.idx_audit_timestamp;
+DROP INDEX IF EXISTS security_audit.idx_access_user;
+DROP INDEX IF EXISTS security_audit.idx_access_timestamp;
+
+ALTER TABLE security_audit.audit_log RENAME TO audit_log_unpartitioned;
+ALTER TABLE security_audit.audit_log_unpartitioned RENAME CONSTRAINT audit_log_pkey TO audit_log_unpartitioned_pkey;
+ALTER TABLE security_audit.access_log RENAME TO access_log_unpartitioned;
+ALTER TABLE security_audit.access_log_unpartitioned RENAME CONSTRAINT access_log_pkey TO access_log_unpartitioned_pkey;
+ALTER TABLE security_audit.export_log RENAME TO export_log_unpartitioned;
+ALTER TABLE security_audit.export_log_unpartitioned RENAME CONSTRAINT export_log_pkey TO export_log_unpartitioned_pkey;
+
+-- Audit log for all data changes
+CREATE TABLE security_audit.audit_log (
+    id UUID DEFAULT uuid_generate_v4(),
+    table_name VARCHAR(100) NOT NULL,
+    operation VARCHAR(20) NOT NULL, -- 'INSERT', 'UPDATE', 'DELETE'
+    record_id UUID,
+    old_values JSONB,
+    new_values JSONB,
+    user_id VARCHAR(100),
+    session_id VARCHAR(255),
+    ip_address INET,
+    user_agent TEXT,
+    timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- Access control log
+CREATE TABLE security_audit.access_log (
+    id UUID DEFAULT uuid_generate_v4(),
+    user_id VARCHAR(100) NOT NULL,
+    action VARCHAR(100) NOT NULL,
+    resource_type VARCHAR(100),
+    resource_id UUID,
+    ip_address INET,
+    user_agent TEXT,
+    success BOOLEAN DEFAULT TRUE,
+    error_message TEXT,
+    timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- Data export log
+CREATE TABLE security_audit.export_log (
+    id UUID DEFAULT uuid_generate_v4(),
+    user_id VARCHAR(100) NOT NULL,
+    export_type VARCHAR(100), -- 'csv', 'json', 'pdf', 'excel'
+    exported_tables VARCHAR(100)[],
+    record_count INTEGER,
+    filter_criteria JSONB,
+    export_purpose TEXT,
+    ip_address INET,
+    timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE security_audit.audit_log_default PARTITION OF security_audit.audit_log DEFAULT;
+CREATE TABLE security_audit.access_log_default PARTITION OF security_audit.access_log DEFAULT;
+CREATE TABLE security_audit.export_log_default PARTITION OF security_audit.export_log DEFAULT;
+
+-- Retention and look-ahead per partitioned log table
+CREATE TABLE IF NOT EXISTS security_audit.partition_retention (
+    table_name VARCHAR(100) PRIMARY KEY,
+    retention_months INTEGER NOT NULL CHECK (retention_months > 0),
+    months_ahead INTEGER NOT NULL DEFAULT 3 CHECK (months_ahead >= 0),
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+INSERT INTO security_audit.partition_retention (table_name, retention_months, months_ahead) VALUES
+    ('audit_log', 24, 3),
+    ('access_log', 12, 3),
+    ('export_log', 24, 3)
+ON CONFLICT (table_name) DO NOTHING;
+
+CREATE INDEX idx_audit_table ON security_audit.audit_log(table_name);
+CREATE INDEX idx_access_user ON security_audit.access_log(user_id);
+CREATE INDEX idx_audit_timestamp ON security_audit.audit_log USING brin(timestamp);
+CREATE INDEX idx_access_timestamp ON security_audit.access_log USING brin(timestamp);
+CREATE INDEX idx_export_timestamp ON security_audit.export_log USING brin(timestamp);
+
+-- Create the monthly partition of a security_audit log table holding
+-- p_month, named <table>_yYYYYmMM. Rows already sitting in the DEFAULT
+-- partition for that month are moved into it. Returns false if it exists.
+CREATE OR REPLACE FUNCTION security_audit.create_month_partition(
+    p_table TEXT,
+    p_month DATE
+) RETURNS BOOLEAN AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_month)::date;
+    month_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::date;
+    partition_name TEXT := p_table || '_' || to_char(p_month, '"y"YYYY"m"MM');
+    has_strays BOOLEAN;
+BEGIN
+    IF to_regclass(format('security_audit.%I', partition_name)) IS NOT NULL THEN
+        RETURN FALSE;
+    END IF;
+
+    -- A new range may not overlap rows held by the DEFAULT partition
+    EXECUTE format('SELECT EXISTS (SELECT 1 FROM security_audit.%I WHERE timestamp >= $1 AND timestamp < $2)',
+                   p_table || '_default')
+        INTO has_strays USING month_start, month_end;
+
+    IF has_strays THEN
+        EXECUTE format('CREATE TEMP TABLE partition_strays ON COMMIT DROP AS
+                        SELECT * FROM security_audit.%I WHERE timestamp >= $1 AND timestamp < $2',
+                       p_table || '_default') USING month_start, month_end;
+        EXECUTE format('DELETE FROM security_audit.%I WHERE timestamp >= $1 AND timestamp < $2',
+                       p_table || '_default') USING month_start, month_end;
+    END IF;
+
+    EXECUTE format('CREATE TABLE security_audit.%I PARTITION OF security_audit.%I FOR VALUES FROM (%L) TO (%L)',
+                   partition_name, p_table, month_start, month_end);
+
+    IF has_strays THEN
+        EXECUTE format('INSERT INTO security_audit.%I SELECT * FROM partition_strays', p_table);
+        DROP TABLE partition_strays;
+    END IF;
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop the monthly partitions of a log table that ended more than
+-- p_retention_months ago, and purge the same range from its DEFAULT
+-- partition. Each drop is recorded in audit_log.
+CREATE OR REPLACE FUNCTION security_audit.drop_expired_partitions(
+    p_table TEXT,
+    p_retention_months INTEGER
+) RETURNS INTEGER AS $$
+DECLARE
+    cutoff DATE := (date_trunc('month', NOW()) - make_interval(months => p_retention_months))::date;
+    part RECORD;
+    dropped INTEGER := 0;
+    purged BIGINT;
+BEGIN
+    FOR part IN
+        SELECT c.relname, to_date(right(c.relname, 8), '"y"YYYY"m"MM') AS month_start
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = format('security_audit.%I', p_table)::regclass
+          AND c.relname ~ ('^' || p_table || '_y\d{4}m\d{2}$')
+          AND to_date(right(c.relname, 8), '"y"YYYY"m"MM') + INTERVAL '1 month' <= cutoff
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('DROP TABLE security_audit.%I', part.relname);
+        dropped := dropped + 1;
+
+        INSERT INTO security_audit.audit_log (table_name, operation, new_values, user_id)
+        VALUES (p_table, 'PARTITION_DROP',
+                jsonb_build_object('partition', part.relname, 'month', part.month_start,
+                                   'retention_months', p_retention_months),
+                current_setting('app.current_user_id', true));
+    END LOOP;
+
+    EXECUTE format('DELETE FROM security_audit.%I WHERE timestamp < $1', p_table || '_default')
+        USING cutoff;
+    GET DIAGNOSTICS purged = ROW_COUNT;
+    IF purged > 0 THEN
+        INSERT INTO security_audit.audit_log (table_name, operation, new_values, user_id)
+        VALUES (p_table, 'PARTITION_DROP',
+                jsonb_build_object('partition', p_table || '_default', 'before', cutoff,
+                                   'rows', purged, 'retention_months', p_retention_months),
+                current_setting('app.current_user_id', true));
+    END IF;
+
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create the current and upcoming monthly partitions and apply retention
+-- for every table in security_audit.partition_retention. Run daily.
+CREATE OR REPLACE FUNCTION security_audit.maintain_partitions()
+RETURNS TABLE(partitioned_table TEXT, partitions_created INTEGER, partitions_dropped INTEGER) AS $$
+DECLARE
+    retention RECORD;
+    month_offset INTEGER;
+BEGIN
+    FOR retention IN
+        SELECT r.table_name, r.retention_months, r.months_ahead
+        FROM security_audit.partition_retention r
+        ORDER BY r.table_name
+    LOOP
+        partitioned_table := retention.table_name;
+        partitions_created := 0;
+        FOR month_offset IN 0..retention.months_ahead LOOP
+            IF security_audit.create_month_partition(
+                retention.table_name,
+                (date_trunc('month', NOW()) + make_interval(months => month_offset))::date
+            ) THEN
+                partitions_created := partitions_created + 1;
+            END IF;
+        END LOOP;
+        partitions_dropped := security_audit.drop_expired_partitions(retention.table_name, retention.retention_months);
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partitions from the oldest stored month through the look-ahead window
+SELECT security_audit.create_month_partition(r.table_name, month::date)
+FROM security_audit.partition_retention r
+JOIN (
+    SELECT 'audit_log' AS table_name, MIN(timestamp) AS oldest FROM security_audit.audit_log_unpartitioned
+    UNION ALL
+    SELECT 'access_log', MIN(timestamp) FROM security_audit.access_log_unpartitioned
+    UNION ALL
+    SELECT 'export_log', MIN(timestamp) FROM security_audit.export_log_unpartitioned
+) stored ON stored.table_name = r.table_name
+CROSS JOIN LATERAL generate_series(
+    date_trunc('month', LEAST(COALESCE(stored.oldest, NOW()), NOW())),
+    date_trunc('month', NOW()) + make_interval(months => r.months_ahead),
+    INTERVAL '1 month'
+) month;
+
+INSERT INTO security_audit.audit_log (id, table_name, operation, record_id, old_values, new_values,
+                                      user_id, session_id, ip_address, user_agent, timestamp)
+SELECT id, table_name, operation, record_id, old_values, new_values,
+       user_id, session_id, ip_address, user_agent, COALESCE(timestamp, NOW())
+FROM security_audit.audit_log_unpartitioned;
+
+INSERT INTO security_audit.access_log (id, user_id, action, resource_type, resource_id, ip_address,
+                                       user_agent, success, error_message, timestamp)
+SELECT id, user_id, action, resource_type, resource_id, ip_address,
+       user_agent, success, error_message, COALESCE(timestamp, NOW())
+FROM security_audit.access_log_unpartitioned;
+
+INSERT INTO security_audit.export_log (id, user_id, export_type, exported_tables, record_count,
+                                       filter_criteria, export_purpose, ip_address, timestamp)
+SELECT id, user_id, export_type, exported_tables, record_count,
+       filter_criteria, export_purpose, ip_address, COALESCE(timestamp, NOW())
+FROM security_audit.export_log_unpartitioned;
+
+DROP TABLE security_audit.audit_log_unpartitioned;
+DROP TABLE security_audit.access_log_unpartitioned;
+DROP TABLE security_audit.export_log_unpartitioned;
+
+ALTER TABLE security_audit.audit_log ENABLE ROW LEVEL SECURITY;
+
+GRANT ALL ON ALL TABLES IN SCHEMA security_audit TO flight_admin;
+
+COMMIT;
+
+\echo 'Migration 007 applied: monthly partitioned security_audit logs.'
@@ -0,0 +1,61 @@
+-- Migration 008: time-ordered UUIDv7 keys
+-- New rows in every table get UUIDv7 ids (millisecond timestamp first), so
+-- primary key and foreign key index inserts append instead of landing on
+-- random pages. Existing flights, passengers and other referenced rows keep
+-- their ids. flight_passengers ids are referenced nowhere, so they are
+-- rewritten in created_at order and the table's indexes rebuilt compact;
+-- the redundant flight_id index (a prefix of the combined index) is dropped.
+-- Compare before and after with
+--   python3 scripts/benchmark_keys.py
+
+\c creepstate_flights_db;
+
+BEGIN;
+
+-- Time-ordered UUIDv7 keys (RFC 9562): a 48-bit millisecond timestamp and
+-- 12 bits of sub-millisecond clock fraction ahead of random bits. New keys
+-- land at the right edge of their B-tree indexes instead of on random
+-- pages, so inserts touch few pages and leaves stay full. p_at backdates a
+-- key, e.g. to a row's created_at.
+CREATE OR REPLACE FUNCTION public.uuid_generate_v7(p_at TIMESTAMPTZ DEFAULT clock_timestamp())
+RETURNS UUID AS $$
+    SELECT encode(
+        overlay(uuid_send(gen_random_uuid())
+                PLACING int8send((floor(ms)::bigint << 16) | (7 << 12) | floor((ms - floor(ms)) * 4096)::bigint)
+                FROM 1 FOR 8),
+        'hex')::uuid
+    FROM (SELECT extract(epoch FROM p_at) * 1000 AS ms) clock;
+$$ LANGUAGE sql VOLATILE PARALLEL SAFE;
+
+ALTER TABLE flight_data.aircraft ALTER COLUMN id SET DEFAULT uuid_generate_v7();
+ALTER TABLE flight_data.locations ALTER COLUMN id SET DEFAULT uuid_generate_v7();
+ALTER TABLE flight_data.passengers ALTER COLUMN id SET DEFAULT uuid_generate_v7();
+ALTER TABLE flight_data.passenger_aliases ALTER COLUMN id SET DEFAULT uuid_generate_v7();
+ALTER TABLE flight_data.flights ALTER COLUMN id SET DEFAULT uuid_generate_v7();
+ALTER TABLE flight_data.flight_passengers ALTER COLUMN id SET DEFAULT uuid_generate_v7();
+ALTER TABLE flight_data.import_journal ALTER COLUMN id SET DEFAULT uuid_generate_v7();
+ALTER TABLE investigation.passenger_connections ALTER COLUMN id SET DEFAULT uuid_generate_v7();
+ALTER TABLE investigation.timeline_events ALTER COLUMN id SET DEFAULT uuid_generate_v7();
+ALTER TABLE investigation.cases ALTER COLUMN id SET DEFAULT uuid_generate_v7();
+ALTER TABLE investigation.flight_patterns ALTER COLUMN id SET DEFAULT uuid_generate_v7();
+ALTER TABLE security_audit.audit_log ALTER COLUMN id SET DEFAULT uuid_generate_v7();
+ALTER TABLE security_audit.access_log ALTER COLUMN id SET DEFAULT uuid_generate_v7();
+ALTER TABLE security_audit.export_log ALTER COLUMN id SET DEFAULT uuid_generate_v7();
+
+-- One BULK_LOAD audit entry instead of an UPDATE entry per link
+SELECT security_audit.begin_bulk_audit('migration 008: flight_passengers UUIDv7 ids');
+
+UPDATE flight_data.flight_passengers fp
+SET id = uuid_generate_v7(COALESCE(fp.created_at, NOW()))
+WHERE substring(fp.id::text FROM 15 FOR 1) <> '7';
+
+SELECT security_audit.end_bulk_audit();
+
+DROP INDEX IF EXISTS flight_data.idx_flight_passengers_flight;
+
+COMMIT;
+
+REINDEX TABLE flight_data.flight_passengers;
+VACUUM ANALYZE flight_data.flight_passengers;
+
+\echo 'Migration 008 applied: UUIDv7 keys.'
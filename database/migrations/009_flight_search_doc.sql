@@ -0,0 +1,186 @@
+-- Migration 009: denormalized flight search documents
+-- flight_data.flight_search_doc holds one row per flight with its date,
+-- codes, airport names, aircraft and passenger names, so the API flight
+-- search reads one indexed table instead of flight_details joined to
+-- passengers and locations. Statement triggers keep it current; the bulk
+-- importers refresh their staged flights once.
+
+\c creepstate_flights_db;
+
+BEGIN;
+
+-- One denormalized row per flight for the search API: codes, names and the
+-- passenger list in place of the flight_details view and its joins. Kept
+-- current by the flight_search_doc triggers and the bulk importers
+CREATE TABLE IF NOT EXISTS flight_data.flight_search_doc (
+    flight_id UUID PRIMARY KEY REFERENCES flight_data.flights(id) ON DELETE CASCADE,
+    flight_number VARCHAR(20),
+    flight_date DATE NOT NULL,
+    departure_code VARCHAR(10),
+    departure_name VARCHAR(255),
+    arrival_code VARCHAR(10),
+    arrival_name VARCHAR(255),
+    tail_number VARCHAR(20),
+    aircraft_model VARCHAR(100),
+    passenger_count INTEGER,
+    passenger_names TEXT[] NOT NULL DEFAULT '{}',
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_search_doc_date ON flight_data.flight_search_doc(flight_date DESC);
+CREATE INDEX IF NOT EXISTS idx_search_doc_departure ON flight_data.flight_search_doc(departure_code, flight_date DESC);
+CREATE INDEX IF NOT EXISTS idx_search_doc_arrival ON flight_data.flight_search_doc(arrival_code, flight_date DESC);
+
+-- Rebuild the search documents of the given flights (all flights for NULL)
+-- in one statement; documents whose content is unchanged are not rewritten.
+-- Returns the number of documents written.
+CREATE OR REPLACE FUNCTION flight_data.refresh_flight_search_docs(p_flight_ids UUID[] DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    written INTEGER;
+BEGIN
+    INSERT INTO flight_data.flight_search_doc AS doc (
+        flight_id, flight_number, flight_date, departure_code, departure_name,
+        arrival_code, arrival_name, tail_number, aircraft_model, passenger_count,
+        passenger_names
+    )
+    SELECT
+        f.id, f.flight_number, f.flight_date, dl.airport_code, dl.airport_name,
+        al.airport_code, al.airport_name, a.tail_number, a.model, f.passenger_count,
+        COALESCE(manifest.passenger_names, '{}')
+    FROM flight_data.flights f
+    LEFT JOIN flight_data.aircraft a ON a.id = f.aircraft_id
+    LEFT JOIN flight_data.locations dl ON dl.id = f.departure_location_id
+    LEFT JOIN flight_data.locations al ON al.id = f.arrival_location_id
+    LEFT JOIN LATERAL (
+        SELECT array_agg(p.full_name::text ORDER BY p.full_name, p.id) AS passenger_names
+        FROM flight_data.passengers p
+        WHERE p.id IN (SELECT fp.passenger_id FROM flight_data.flight_passengers fp WHERE fp.flight_id = f.id)
+    ) manifest ON TRUE
+    WHERE p_flight_ids IS NULL OR f.id = ANY(p_flight_ids)
+    ON CONFLICT (flight_id) DO UPDATE SET
+        flight_number = EXCLUDED.flight_number,
+        flight_date = EXCLUDED.flight_date,
+        departure_code = EXCLUDED.departure_code,
+        departure_name = EXCLUDED.departure_name,
+        arrival_code = EXCLUDED.arrival_code,
+        arrival_name = EXCLUDED.arrival_name,
+        tail_number = EXCLUDED.tail_number,
+        aircraft_model = EXCLUDED.aircraft_model,
+        passenger_count = EXCLUDED.passenger_count,
+        passenger_names = EXCLUDED.passenger_names,
+        updated_at = NOW()
+    WHERE (doc.flight_number, doc.flight_date, doc.departure_code, doc.departure_name,
+           doc.arrival_code, doc.arrival_name, doc.tail_number, doc.aircraft_model,
+           doc.passenger_count, doc.passenger_names)
+          IS DISTINCT FROM
+          (EXCLUDED.flight_number, EXCLUDED.flight_date, EXCLUDED.departure_code, EXCLUDED.departure_name,
+           EXCLUDED.arrival_code, EXCLUDED.arrival_name, EXCLUDED.tail_number, EXCLUDED.aircraft_model,
+           EXCLUDED.passenger_count, EXCLUDED.passenger_names);
+    GET DIAGNOSTICS written = ROW_COUNT;
+    RETURN written;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Refresh the search documents of the flights a statement touched, directly
+-- or through their passengers, airports or aircraft. Bulk importers set
+-- app.defer_search_docs for the transaction and refresh their staged
+-- flights once at the end instead.
+CREATE OR REPLACE FUNCTION flight_data.sync_flight_search_docs() RETURNS TRIGGER AS $$
+DECLARE
+    flight_ids UUID[];
+BEGIN
+    IF current_setting('app.defer_search_docs', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_TABLE_NAME = 'flights' THEN
+        flight_ids := ARRAY(SELECT id FROM new_rows);
+    ELSIF TG_TABLE_NAME = 'flight_passengers' THEN
+        IF TG_OP = 'INSERT' THEN
+            flight_ids := ARRAY(SELECT DISTINCT flight_id FROM new_rows WHERE flight_id IS NOT NULL);
+        ELSIF TG_OP = 'DELETE' THEN
+            flight_ids := ARRAY(SELECT DISTINCT flight_id FROM old_rows WHERE flight_id IS NOT NULL);
+        ELSE
+            flight_ids := ARRAY(
+                SELECT flight_id FROM new_rows WHERE flight_id IS NOT NULL
+                UNION
+                SELECT flight_id FROM old_rows WHERE flight_id IS NOT NULL
+            );
+        END IF;
+    ELSIF TG_TABLE_NAME = 'passengers' THEN
+        flight_ids := ARRAY(
+            SELECT DISTINCT fp.flight_id
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            JOIN flight_data.flight_passengers fp ON fp.passenger_id = n.id
+            WHERE n.full_name IS DISTINCT FROM o.full_name
+        );
+    ELSIF TG_TABLE_NAME = 'locations' THEN
+        flight_ids := ARRAY(
+            SELECT f.id
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            JOIN flight_data.flights f ON n.id IN (f.departure_location_id, f.arrival_location_id)
+            WHERE (n.airport_code, n.airport_name) IS DISTINCT FROM (o.airport_code, o.airport_name)
+        );
+    ELSIF TG_TABLE_NAME = 'aircraft' THEN
+        flight_ids := ARRAY(
+            SELECT f.id
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            JOIN flight_data.flights f ON f.aircraft_id = n.id
+            WHERE (n.tail_number, n.model) IS DISTINCT FROM (o.tail_number, o.model)
+        );
+    END IF;
+
+    IF cardinality(flight_ids) > 0 THEN
+        PERFORM flight_data.refresh_flight_search_docs(flight_ids);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS search_doc_flights_insert ON flight_data.flights;
+DROP TRIGGER IF EXISTS search_doc_flights_update ON flight_data.flights;
+DROP TRIGGER IF EXISTS search_doc_flight_passengers_insert ON flight_data.flight_passengers;
+DROP TRIGGER IF EXISTS search_doc_flight_passengers_update ON flight_data.flight_passengers;
+DROP TRIGGER IF EXISTS search_doc_flight_passengers_delete ON flight_data.flight_passengers;
+DROP TRIGGER IF EXISTS search_doc_passengers_update ON flight_data.passengers;
+DROP TRIGGER IF EXISTS search_doc_locations_update ON flight_data.locations;
+DROP TRIGGER IF EXISTS search_doc_aircraft_update ON flight_data.aircraft;
+
+CREATE TRIGGER search_doc_flights_insert AFTER INSERT ON flight_data.flights
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION flight_data.sync_flight_search_docs();
+CREATE TRIGGER search_doc_flights_update AFTER UPDATE ON flight_data.flights
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION flight_data.sync_flight_search_docs();
+CREATE TRIGGER search_doc_flight_passengers_insert AFTER INSERT ON flight_data.flight_passengers
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION flight_data.sync_flight_search_docs();
+CREATE TRIGGER search_doc_flight_passengers_update AFTER UPDATE ON flight_data.flight_passengers
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION flight_data.sync_flight_search_docs();
+CREATE TRIGGER search_doc_flight_passengers_delete AFTER DELETE ON flight_data.flight_passengers
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION flight_data.sync_flight_search_docs();
+CREATE TRIGGER search_doc_passengers_update AFTER UPDATE ON flight_data.passengers
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION flight_data.sync_flight_search_docs();
+CREATE TRIGGER search_doc_locations_update AFTER UPDATE ON flight_data.locations
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION flight_data.sync_flight_search_docs();
+CREATE TRIGGER search_doc_aircraft_update AFTER UPDATE ON flight_data.aircraft
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION flight_data.sync_flight_search_docs();
+
+-- Documents for every stored flight
+SELECT flight_data.refresh_flight_search_docs();
+
+GRANT SELECT ON flight_data.flight_search_doc TO flight_reader;
+GRANT ALL ON flight_data.flight_search_doc TO flight_analyst;
+
+COMMIT;
+
+\echo 'Migration 009 applied: flight search documents.'
@@ -0,0 +1,92 @@
+-- Migration 010: trigram indexes for substring flight searches
+-- The API flight search matches passenger names and airport codes anywhere
+-- in the value with ILIKE ('stein' finds Jeffrey Epstein, 'EB' finds TEB).
+-- pg_trgm GIN indexes on the search documents' codes and on a new
+-- passenger_names_text column (the names one per line) let those filters
+-- use an index instead of scanning every document.
+
+\c creepstate_flights_db;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+BEGIN;
+
+-- Databases that applied migration 009 before it dropped them still have
+-- the tsvector and passenger id array, which no search reads
+DROP INDEX IF EXISTS flight_data.idx_search_doc_vector;
+DROP INDEX IF EXISTS flight_data.idx_search_doc_passengers;
+ALTER TABLE flight_data.flight_search_doc
+    DROP COLUMN IF EXISTS search_vector,
+    DROP COLUMN IF EXISTS passenger_ids,
+    ADD COLUMN IF NOT EXISTS passenger_names_text TEXT NOT NULL DEFAULT '';
+
+-- Rebuild the search documents of the given flights (all flights for NULL)
+-- in one statement; documents whose content is unchanged are not rewritten.
+-- Returns the number of documents written.
+CREATE OR REPLACE FUNCTION flight_data.refresh_flight_search_docs(p_flight_ids UUID[] DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    written INTEGER;
+BEGIN
+    INSERT INTO flight_data.flight_search_doc AS doc (
+        flight_id, flight_number, flight_date, departure_code, departure_name,
+        arrival_code, arrival_name, tail_number, aircraft_model, passenger_count,
+        passenger_names, passenger_names_text
+    )
+    SELECT
+        f.id, f.flight_number, f.flight_date, dl.airport_code, dl.airport_name,
+        al.airport_code, al.airport_name, a.tail_number, a.model, f.passenger_count,
+        COALESCE(manifest.passenger_names, '{}'),
+        COALESCE(array_to_string(manifest.passenger_names, E'\n'), '')
+    FROM flight_data.flights f
+    LEFT JOIN flight_data.aircraft a ON a.id = f.aircraft_id
+    LEFT JOIN flight_data.locations dl ON dl.id = f.departure_location_id
+    LEFT JOIN flight_data.locations al ON al.id = f.arrival_location_id
+    LEFT JOIN LATERAL (
+        SELECT array_agg(p.full_name::text ORDER BY p.full_name, p.id) AS passenger_names
+        FROM flight_data.passengers p
+        WHERE p.id IN (SELECT fp.passenger_id FROM flight_data.flight_passengers fp WHERE fp.flight_id = f.id)
+    ) manifest ON TRUE
+    WHERE p_flight_ids IS NULL OR f.id = ANY(p_flight_ids)
+    ON CONFLICT (flight_id) DO UPDATE SET
+        flight_number = EXCLUDED.flight_number,
+        flight_date = EXCLUDED.flight_date,
+        departure_code = EXCLUDED.departure_code,
+        departure_name = EXCLUDED.departure_name,
+        arrival_code = EXCLUDED.arrival_code,
+        arrival_name = EXCLUDED.arrival_name,
+        tail_number = EXCLUDED.tail_number,
+        aircraft_model = EXCLUDED.aircraft_model,
+        passenger_count = EXCLUDED.passenger_count,
+        passenger_names = EXCLUDED.passenger_names,
+        passenger_names_text = EXCLUDED.passenger_names_text,
+        updated_at = NOW()
+    WHERE (doc.flight_number, doc.flight_date, doc.departure_code, doc.departure_name,
+           doc.arrival_code, doc.arrival_name, doc.tail_number, doc.aircraft_model,
+           doc.passenger_count, doc.passenger_names)
+          IS DISTINCT FROM
+          (EXCLUDED.flight_number, EXCLUDED.flight_date, EXCLUDED.departure_code, EXCLUDED.departure_name,
+           EXCLUDED.arrival_code, EXCLUDED.arrival_name, EXCLUDED.tail_number, EXCLUDED.aircraft_model,
+           EXCLUDED.passenger_count, EXCLUDED.passenger_names);
+    GET DIAGNOSTICS written = ROW_COUNT;
+    RETURN written;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Existing documents are unchanged otherwise, so the refresh would skip them
+UPDATE flight_data.flight_search_doc
+SET passenger_names_text = array_to_string(passenger_names, E'\n')
+WHERE passenger_names_text IS DISTINCT FROM array_to_string(passenger_names, E'\n');
+
+CREATE INDEX IF NOT EXISTS idx_search_doc_names_trgm
+    ON flight_data.flight_search_doc USING gin(passenger_names_text gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_search_doc_departure_trgm
+    ON flight_data.flight_search_doc USING gin(departure_code gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_search_doc_arrival_trgm
+    ON flight_data.flight_search_doc USING gin(arrival_code gin_trgm_ops);
+
+ANALYZE flight_data.flight_search_doc;
+
+COMMIT;
+
+\echo 'Migration 010 applied: trigram search indexes.'
@@ -0,0 +1,143 @@
+-- Migration 011: bulk-load audit batches in a table
+-- Bulk-load audit mode was switched on by the app.audit_mode setting, which
+-- any role could SET LOCAL to change data with no audit entry at all. Open
+-- batches are now rows of security_audit.bulk_audit_batches, written only by
+-- begin_bulk_audit / end_bulk_audit (SECURITY DEFINER, executable by
+-- flight_admin only), and a deferred constraint trigger refuses to commit a
+-- transaction whose batch was never closed with its summary entry.
+
+\c creepstate_flights_db;
+
+BEGIN;
+
+-- Bulk-load audit batches open in running transactions, one per
+-- transaction. Rows are written only by security_audit.begin_bulk_audit and
+-- removed by end_bulk_audit; a transaction cannot commit with its batch
+-- still open, so no row here is ever visible to another session.
+CREATE TABLE IF NOT EXISTS security_audit.bulk_audit_batches (
+    transaction_id XID8 PRIMARY KEY,
+    batch_label TEXT,
+    opened_by NAME NOT NULL DEFAULT session_user,
+    row_counts JSONB NOT NULL DEFAULT '{}',
+    opened_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Function to log data changes, once per statement. The transition tables
+-- hold every affected row, so a bulk statement writes its audit rows in a
+-- single INSERT ... SELECT instead of one trigger call per row.
+-- While the transaction has an open bulk-load batch (opened by
+-- security_audit.begin_bulk_audit) only row counts are accumulated on the
+-- batch, and security_audit.end_bulk_audit writes one summary entry.
+-- Runs as its owner, so the audit trail does not depend on the writer's
+-- privileges on security_audit.
+CREATE OR REPLACE FUNCTION security_audit.log_statement_changes() RETURNS TRIGGER AS $$
+DECLARE
+    affected BIGINT;
+    count_key TEXT := TG_TABLE_NAME || '.' || TG_OP;
+BEGIN
+    IF EXISTS (SELECT 1 FROM security_audit.bulk_audit_batches
+               WHERE transaction_id = pg_current_xact_id()) THEN
+        IF TG_OP = 'DELETE' THEN
+            SELECT COUNT(*) INTO affected FROM old_rows;
+        ELSE
+            SELECT COUNT(*) INTO affected FROM new_rows;
+        END IF;
+        IF affected > 0 THEN
+            UPDATE security_audit.bulk_audit_batches
+            SET row_counts = row_counts || jsonb_build_object(
+                count_key, COALESCE((row_counts ->> count_key)::bigint, 0) + affected)
+            WHERE transaction_id = pg_current_xact_id();
+        END IF;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO security_audit.audit_log (table_name, operation, record_id, old_values, user_id, session_id)
+        SELECT TG_TABLE_NAME, TG_OP, o.id, to_jsonb(o), current_setting('app.current_user_id', true), current_setting('app.session_id', true)
+        FROM old_rows o;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO security_audit.audit_log (table_name, operation, record_id, old_values, new_values, user_id, session_id)
+        SELECT TG_TABLE_NAME, TG_OP, n.id, to_jsonb(o), to_jsonb(n), current_setting('app.current_user_id', true), current_setting('app.session_id', true)
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id;
+    ELSIF TG_OP = 'INSERT' THEN
+        INSERT INTO security_audit.audit_log (table_name, operation, record_id, new_values, user_id, session_id)
+        SELECT TG_TABLE_NAME, TG_OP, n.id, to_jsonb(n), current_setting('app.current_user_id', true), current_setting('app.session_id', true)
+        FROM new_rows n;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = pg_catalog, pg_temp;
+
+-- Open a bulk-load batch for the rest of the current transaction. Only
+-- flight_admin may call it (see the grants below); opening it again keeps
+-- the counts so far and takes the new label
+CREATE OR REPLACE FUNCTION security_audit.begin_bulk_audit(p_batch_label TEXT) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO security_audit.bulk_audit_batches (transaction_id, batch_label)
+    VALUES (pg_current_xact_id(), p_batch_label)
+    ON CONFLICT (transaction_id) DO UPDATE SET batch_label = EXCLUDED.batch_label;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = pg_catalog, pg_temp;
+
+-- Close the current transaction's bulk-load batch, writing its summary entry
+CREATE OR REPLACE FUNCTION security_audit.end_bulk_audit() RETURNS UUID AS $$
+DECLARE
+    batch security_audit.bulk_audit_batches%ROWTYPE;
+    audit_id UUID;
+BEGIN
+    DELETE FROM security_audit.bulk_audit_batches
+    WHERE transaction_id = pg_current_xact_id()
+    RETURNING * INTO batch;
+
+    -- No open batch, or a batch that changed nothing, leaves no entry
+    IF NOT FOUND OR batch.row_counts = '{}' THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO security_audit.audit_log (table_name, operation, new_values, user_id, session_id)
+    VALUES (
+        'bulk_load',
+        'BULK_LOAD',
+        jsonb_build_object(
+            'batch', batch.batch_label,
+            'opened_by', batch.opened_by,
+            'row_counts', batch.row_counts
+        ),
+        current_setting('app.current_user_id', true),
+        current_setting('app.session_id', true)
+    )
+    RETURNING id INTO audit_id;
+
+    RETURN audit_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = pg_catalog, pg_temp;
+
+-- Refuse to commit a transaction whose bulk-load batch is still open, as
+-- its changes would have no audit entry at all
+CREATE OR REPLACE FUNCTION security_audit.check_bulk_audit_closed() RETURNS TRIGGER AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM security_audit.bulk_audit_batches
+               WHERE transaction_id = NEW.transaction_id) THEN
+        RAISE EXCEPTION 'Bulk audit batch "%" is still open; call security_audit.end_bulk_audit() before committing',
+            NEW.batch_label;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS bulk_audit_batch_closed ON security_audit.bulk_audit_batches;
+CREATE CONSTRAINT TRIGGER bulk_audit_batch_closed
+    AFTER INSERT ON security_audit.bulk_audit_batches
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION security_audit.check_bulk_audit_closed();
+
+-- Bulk-load batches are opened and closed only through the audit functions
+REVOKE ALL ON security_audit.bulk_audit_batches FROM flight_admin;
+GRANT SELECT ON security_audit.bulk_audit_batches TO flight_admin;
+REVOKE EXECUTE ON FUNCTION security_audit.begin_bulk_audit(TEXT), security_audit.end_bulk_audit() FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION security_audit.begin_bulk_audit(TEXT), security_audit.end_bulk_audit() TO flight_admin;
+
+COMMIT;
+
+\echo 'Migration 011 applied: bulk audit batches.'
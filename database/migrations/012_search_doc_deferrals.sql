@@ -0,0 +1,131 @@
+-- Migration 012: search document deferrals in a table
+-- The bulk importers skipped the search document triggers by setting
+-- app.defer_search_docs, which any session could set to change flights and
+-- leave flight_search_doc stale. Deferring is now a row of
+-- flight_data.search_doc_deferrals, written only by SECURITY DEFINER
+-- functions; the triggers collect the touched flights there, and a deferred
+-- constraint trigger refreshes whatever is still pending before commit.
+
+\c creepstate_flights_db;
+
+BEGIN;
+
+-- Search document refreshes deferred to the end of running transactions, one
+-- row per transaction with the flights touched since. Written only by the
+-- search document functions; whatever is still pending when the transaction
+-- commits is refreshed first, so documents are never left stale.
+CREATE TABLE IF NOT EXISTS flight_data.search_doc_deferrals (
+    transaction_id XID8 PRIMARY KEY,
+    pending_flights UUID[] NOT NULL DEFAULT '{}',
+    deferred_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Refresh the search documents of the flights a statement touched, directly
+-- or through their passengers, airports or aircraft. In a transaction that
+-- called flight_data.defer_search_docs the flights are only collected, and
+-- refreshed once by refresh_deferred_search_docs or at commit.
+CREATE OR REPLACE FUNCTION flight_data.sync_flight_search_docs() RETURNS TRIGGER AS $$
+DECLARE
+    flight_ids UUID[];
+BEGIN
+    IF TG_TABLE_NAME = 'flights' THEN
+        flight_ids := ARRAY(SELECT id FROM new_rows);
+    ELSIF TG_TABLE_NAME = 'flight_passengers' THEN
+        IF TG_OP = 'INSERT' THEN
+            flight_ids := ARRAY(SELECT DISTINCT flight_id FROM new_rows WHERE flight_id IS NOT NULL);
+        ELSIF TG_OP = 'DELETE' THEN
+            flight_ids := ARRAY(SELECT DISTINCT flight_id FROM old_rows WHERE flight_id IS NOT NULL);
+        ELSE
+            flight_ids := ARRAY(
+                SELECT flight_id FROM new_rows WHERE flight_id IS NOT NULL
+                UNION
+                SELECT flight_id FROM old_rows WHERE flight_id IS NOT NULL
+            );
+        END IF;
+    ELSIF TG_TABLE_NAME = 'passengers' THEN
+        flight_ids := ARRAY(
+            SELECT DISTINCT fp.flight_id
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            JOIN flight_data.flight_passengers fp ON fp.passenger_id = n.id
+            WHERE n.full_name IS DISTINCT FROM o.full_name
+        );
+    ELSIF TG_TABLE_NAME = 'locations' THEN
+        flight_ids := ARRAY(
+            SELECT f.id
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            JOIN flight_data.flights f ON n.id IN (f.departure_location_id, f.arrival_location_id)
+            WHERE (n.airport_code, n.airport_name) IS DISTINCT FROM (o.airport_code, o.airport_name)
+        );
+    ELSIF TG_TABLE_NAME = 'aircraft' THEN
+        flight_ids := ARRAY(
+            SELECT f.id
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            JOIN flight_data.flights f ON f.aircraft_id = n.id
+            WHERE (n.tail_number, n.model) IS DISTINCT FROM (o.tail_number, o.model)
+        );
+    END IF;
+
+    IF cardinality(flight_ids) > 0 THEN
+        UPDATE flight_data.search_doc_deferrals
+        SET pending_flights = pending_flights || flight_ids
+        WHERE transaction_id = pg_current_xact_id();
+        IF NOT FOUND THEN
+            PERFORM flight_data.refresh_flight_search_docs(flight_ids);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = pg_catalog, pg_temp;
+
+-- Collect the search document refreshes of the rest of the current
+-- transaction instead of running them after every statement. Anyone may
+-- defer: the refresh still happens before the transaction commits.
+CREATE OR REPLACE FUNCTION flight_data.defer_search_docs() RETURNS VOID AS $$
+BEGIN
+    INSERT INTO flight_data.search_doc_deferrals (transaction_id)
+    VALUES (pg_current_xact_id())
+    ON CONFLICT (transaction_id) DO NOTHING;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = pg_catalog, pg_temp;
+
+-- Refresh the current transaction's deferred search documents and stop
+-- deferring. Returns the number of documents written.
+CREATE OR REPLACE FUNCTION flight_data.refresh_deferred_search_docs() RETURNS INTEGER AS $$
+DECLARE
+    pending UUID[];
+BEGIN
+    DELETE FROM flight_data.search_doc_deferrals
+    WHERE transaction_id = pg_current_xact_id()
+    RETURNING pending_flights INTO pending;
+
+    IF NOT FOUND THEN
+        RETURN 0;
+    END IF;
+    RETURN flight_data.refresh_flight_search_docs(ARRAY(SELECT DISTINCT unnest(pending)));
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = pg_catalog, pg_temp;
+
+-- Refresh whatever a transaction deferred and did not refresh itself
+CREATE OR REPLACE FUNCTION flight_data.refresh_search_docs_at_commit() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM flight_data.refresh_deferred_search_docs();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS search_doc_deferral_refreshed ON flight_data.search_doc_deferrals;
+CREATE CONSTRAINT TRIGGER search_doc_deferral_refreshed
+    AFTER INSERT ON flight_data.search_doc_deferrals
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION flight_data.refresh_search_docs_at_commit();
+
+-- Deferred search document refreshes are recorded only through the search document functions
+REVOKE ALL ON flight_data.search_doc_deferrals FROM flight_analyst;
+GRANT SELECT ON flight_data.search_doc_deferrals TO flight_analyst;
+
+COMMIT;
+
+\echo 'Migration 012 applied: search document deferrals.'
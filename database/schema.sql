@@ -18,6 +18,9 @@ CREATE DATABASE creepstate_flights_db
 
 \c creepstate_flights_db;
 
+-- Trigram indexes back the API's substring (ILIKE) searches
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Create schemas for organization
 CREATE SCHEMA flight_data;
 CREATE SCHEMA investigation;
@@ -28,13 +31,28 @@ GRANT USAGE ON SCHEMA flight_data TO flight_reader, flight_analyst;
 GRANT USAGE ON SCHEMA investigation TO flight_analyst;
 GRANT USAGE ON SCHEMA security_audit TO flight_admin;
 
+-- Time-ordered UUIDv7 keys (RFC 9562): a 48-bit millisecond timestamp and
+-- 12 bits of sub-millisecond clock fraction ahead of random bits. New keys
+-- land at the right edge of their B-tree indexes instead of on random
+-- pages, so inserts touch few pages and leaves stay full. p_at backdates a
+-- key, e.g. to a row's created_at.
+CREATE OR REPLACE FUNCTION public.uuid_generate_v7(p_at TIMESTAMPTZ DEFAULT clock_timestamp())
+RETURNS UUID AS $$
+    SELECT encode(
+        overlay(uuid_send(gen_random_uuid())
+                PLACING int8send((floor(ms)::bigint << 16) | (7 << 12) | floor((ms - floor(ms)) * 4096)::bigint)
+                FROM 1 FOR 8),
+        'hex')::uuid
+    FROM (SELECT extract(epoch FROM p_at) * 1000 AS ms) clock;
+$$ LANGUAGE sql VOLATILE PARALLEL SAFE;
+
 -- =============================================
 -- FLIGHT DATA CORE TABLES
 -- =============================================
 
 -- Aircraft table
 CREATE TABLE flight_data.aircraft (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v7(),
     tail_number VARCHAR(20) NOT NULL UNIQUE,
     model VARCHAR(100),
     manufacturer VARCHAR(100),
@@ -51,7 +69,7 @@ CREATE TABLE flight_data.aircraft (
 
 -- Locations/Airports table
 CREATE TABLE flight_data.locations (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v7(),
     airport_code VARCHAR(10) NOT NULL UNIQUE,
     airport_name VARCHAR(255),
     city VARCHAR(100),
@@ -69,7 +87,7 @@ CREATE TABLE flight_data.locations (
 
 -- Passengers master table
 CREATE TABLE flight_data.passengers (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v7(),
     full_name VARCHAR(255) NOT NULL,
     first_name VARCHAR(100),
     last_name VARCHAR(100),
@@ -87,7 +105,7 @@ CREATE TABLE flight_data.passengers (
 
 -- Passenger aliases table
 CREATE TABLE flight_data.passenger_aliases (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v7(),
     passenger_id UUID REFERENCES flight_data.passengers(id) ON DELETE CASCADE,
     alias VARCHAR(255) NOT NULL,
     alias_type VARCHAR(50), -- 'nickname', 'maiden_name', 'pseudonym', 'initials'
@@ -97,9 +115,19 @@ CREATE TABLE flight_data.passenger_aliases (
     created_at TIMESTAMP DEFAULT NOW()
 );
 
+-- Entity resolution decisions per manifest spelling (scripts/entity_resolution.py)
+CREATE TABLE flight_data.name_resolution_cache (
+    name_key VARCHAR(255) PRIMARY KEY, -- lowercased spelling
+    passenger_id UUID REFERENCES flight_data.passengers(id) ON DELETE CASCADE,
+    decision VARCHAR(20) NOT NULL CHECK (decision IN ('canonical', 'alias', 'distinct')),
+    similarity NUMERIC(4,3),
+    resolver_version INTEGER NOT NULL,
+    decided_at TIMESTAMP DEFAULT NOW()
+);
+
 -- Flights main table
 CREATE TABLE flight_data.flights (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v7(),
     flight_number VARCHAR(20),
     aircraft_id UUID REFERENCES flight_data.aircraft(id),
     departure_location_id UUID REFERENCES flight_data.locations(id),
@@ -117,13 +145,15 @@ CREATE TABLE flight_data.flights (
     source_document VARCHAR(255), -- Source file/document reference
     data_quality VARCHAR(20) DEFAULT 'standard', -- 'high', 'standard', 'low', 'questionable'
     verification_status VARCHAR(50) DEFAULT 'unverified', -- 'verified', 'cross_referenced', 'disputed'
+    content_hash CHAR(32), -- MD5 of the normalized source row, used for delta imports
     created_at TIMESTAMP DEFAULT NOW(),
-    updated_at TIMESTAMP DEFAULT NOW()
+    updated_at TIMESTAMP DEFAULT NOW(),
+    CONSTRAINT uq_flights_natural_key UNIQUE (flight_number, flight_date, departure_location_id, arrival_location_id)
 );
 
 -- Flight passengers junction table (many-to-many)
 CREATE TABLE flight_data.flight_passengers (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v7(),
     flight_id UUID REFERENCES flight_data.flights(id) ON DELETE CASCADE,
     passenger_id UUID REFERENCES flight_data.passengers(id),
     boarding_location_id UUID REFERENCES flight_data.locations(id),
@@ -135,13 +165,70 @@ CREATE TABLE flight_data.flight_passengers (
     created_at TIMESTAMP DEFAULT NOW()
 );
 
+-- Import journal: last committed batch of a row-by-row CSV import, for --resume
+CREATE TABLE flight_data.import_journal (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v7(),
+    source_document VARCHAR(255) NOT NULL,
+    file_fingerprint CHAR(32) NOT NULL, -- MD5 of file size and leading bytes
+    file_size BIGINT NOT NULL,
+    byte_offset BIGINT NOT NULL, -- first byte after the last committed row
+    rows_processed BIGINT NOT NULL DEFAULT 0,
+    flights_inserted INTEGER DEFAULT 0,
+    flights_updated INTEGER DEFAULT 0,
+    flights_unchanged INTEGER DEFAULT 0,
+    errors INTEGER DEFAULT 0,
+    status VARCHAR(20) NOT NULL DEFAULT 'running' CHECK (status IN ('running', 'completed', 'failed', 'interrupted')),
+    started_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW(),
+    completed_at TIMESTAMP
+);
+
+-- Great-circle distance of every route in use, refreshed by scripts/load_airports.py
+CREATE TABLE flight_data.route_distances (
+    departure_location_id UUID NOT NULL REFERENCES flight_data.locations(id) ON DELETE CASCADE,
+    arrival_location_id UUID NOT NULL REFERENCES flight_data.locations(id) ON DELETE CASCADE,
+    distance_km NUMERIC(8,1) NOT NULL,
+    distance_nm NUMERIC(8,1) NOT NULL,
+    computed_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (departure_location_id, arrival_location_id)
+);
+
+-- One denormalized row per flight for the search API: codes, names and the
+-- passenger list in place of the flight_details view and its joins. Kept
+-- current by the flight_search_doc triggers and the bulk importers
+CREATE TABLE flight_data.flight_search_doc (
+    flight_id UUID PRIMARY KEY REFERENCES flight_data.flights(id) ON DELETE CASCADE,
+    flight_number VARCHAR(20),
+    flight_date DATE NOT NULL,
+    departure_code VARCHAR(10),
+    departure_name VARCHAR(255),
+    arrival_code VARCHAR(10),
+    arrival_name VARCHAR(255),
+    tail_number VARCHAR(20),
+    aircraft_model VARCHAR(100),
+    passenger_count INTEGER,
+    passenger_names TEXT[] NOT NULL DEFAULT '{}',
+    passenger_names_text TEXT NOT NULL DEFAULT '', -- passenger_names, one per line, for the trigram index
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Search document refreshes deferred to the end of running transactions, one
+-- row per transaction with the flights touched since. Written only by the
+-- search document functions; whatever is still pending when the transaction
+-- commits is refreshed first, so documents are never left stale.
+CREATE TABLE flight_data.search_doc_deferrals (
+    transaction_id XID8 PRIMARY KEY,
+    pending_flights UUID[] NOT NULL DEFAULT '{}',
+    deferred_at TIMESTAMP DEFAULT NOW()
+);
+
 -- =============================================
 -- INVESTIGATION TABLES
 -- =============================================
 
 -- Connections/Relationships between passengers
 CREATE TABLE investigation.passenger_connections (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v7(),
     passenger1_id UUID REFERENCES flight_data.passengers(id),
     passenger2_id UUID REFERENCES flight_data.passengers(id),
     connection_type VARCHAR(100), -- 'business_associate', 'friend', 'family', 'romantic', 'professional'
@@ -154,12 +241,23 @@ CREATE TABLE investigation.passenger_connections (
     investigation_notes TEXT,
     created_at TIMESTAMP DEFAULT NOW(),
     updated_at TIMESTAMP DEFAULT NOW(),
-    CONSTRAINT no_self_connection CHECK (passenger1_id != passenger2_id)
+    CONSTRAINT no_self_connection CHECK (passenger1_id != passenger2_id),
+    CONSTRAINT uq_passenger_connection UNIQUE (passenger1_id, passenger2_id)
+);
+
+-- flight_passengers changes not yet applied to passenger_connections,
+-- queued by trigger and drained by the importers' incremental maintenance
+CREATE TABLE investigation.connection_changes (
+    id BIGSERIAL PRIMARY KEY,
+    flight_id UUID NOT NULL,
+    passenger_id UUID NOT NULL,
+    delta SMALLINT NOT NULL CHECK (delta IN (-1, 1)),
+    queued_at TIMESTAMP DEFAULT NOW()
 );
 
 -- Timeline events for cross-referencing
 CREATE TABLE investigation.timeline_events (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v7(),
     event_date DATE NOT NULL,
     event_title VARCHAR(500) NOT NULL,
     event_description TEXT,
@@ -177,7 +275,7 @@ CREATE TABLE investigation.timeline_events (
 
 -- Investigation cases
 CREATE TABLE investigation.cases (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v7(),
     case_name VARCHAR(255) NOT NULL,
     case_description TEXT,
     case_status VARCHAR(50) DEFAULT 'open', -- 'open', 'closed', 'ongoing', 'archived'
@@ -194,7 +292,7 @@ CREATE TABLE investigation.cases (
 
 -- Flight patterns analysis
 CREATE TABLE investigation.flight_patterns (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v7(),
     pattern_name VARCHAR(255) NOT NULL,
     pattern_type VARCHAR(100), -- 'frequent_route', 'suspicious_timing', 'group_travel', 'location_clustering'
     description TEXT,
@@ -206,16 +304,23 @@ CREATE TABLE investigation.flight_patterns (
     risk_assessment VARCHAR(20) DEFAULT 'low', -- 'low', 'medium', 'high', 'critical'
     analysis_notes TEXT,
     created_at TIMESTAMP DEFAULT NOW(),
-    updated_at TIMESTAMP DEFAULT NOW()
+    updated_at TIMESTAMP DEFAULT NOW(),
+    CONSTRAINT uq_flight_pattern UNIQUE (pattern_type, pattern_name)
 );
 
 -- =============================================
 -- SECURITY AND AUDIT TABLES
 -- =============================================
 
+-- The three log tables are range partitioned by month on timestamp. Old
+-- months are dropped whole by security_audit.maintain_partitions() instead
+-- of being DELETEd, and rows outside every monthly partition land in the
+-- DEFAULT partition rather than failing. Partition keys must be part of the
+-- primary key, hence (id, timestamp).
+
 -- Audit log for all data changes
 CREATE TABLE security_audit.audit_log (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID DEFAULT uuid_generate_v7(),
     table_name VARCHAR(100) NOT NULL,
     operation VARCHAR(20) NOT NULL, -- 'INSERT', 'UPDATE', 'DELETE'
     record_id UUID,
@@ -225,12 +330,13 @@ CREATE TABLE security_audit.audit_log (
     session_id VARCHAR(255),
     ip_address INET,
     user_agent TEXT,
-    timestamp TIMESTAMP DEFAULT NOW()
-);
+    timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
 
 -- Access control log
 CREATE TABLE security_audit.access_log (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID DEFAULT uuid_generate_v7(),
     user_id VARCHAR(100) NOT NULL,
     action VARCHAR(100) NOT NULL,
     resource_type VARCHAR(100),
@@ -239,12 +345,13 @@ CREATE TABLE security_audit.access_log (
     user_agent TEXT,
     success BOOLEAN DEFAULT TRUE,
     error_message TEXT,
-    timestamp TIMESTAMP DEFAULT NOW()
-);
+    timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
 
 -- Data export log
 CREATE TABLE security_audit.export_log (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID DEFAULT uuid_generate_v7(),
     user_id VARCHAR(100) NOT NULL,
     export_type VARCHAR(100), -- 'csv', 'json', 'pdf', 'excel'
     exported_tables VARCHAR(100)[],
@@ -252,7 +359,37 @@ CREATE TABLE security_audit.export_log (
     filter_criteria JSONB,
     export_purpose TEXT,
     ip_address INET,
-    timestamp TIMESTAMP DEFAULT NOW()
+    timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE security_audit.audit_log_default PARTITION OF security_audit.audit_log DEFAULT;
+CREATE TABLE security_audit.access_log_default PARTITION OF security_audit.access_log DEFAULT;
+CREATE TABLE security_audit.export_log_default PARTITION OF security_audit.export_log DEFAULT;
+
+-- Retention and look-ahead per partitioned log table
+CREATE TABLE security_audit.partition_retention (
+    table_name VARCHAR(100) PRIMARY KEY,
+    retention_months INTEGER NOT NULL CHECK (retention_months > 0),
+    months_ahead INTEGER NOT NULL DEFAULT 3 CHECK (months_ahead >= 0),
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+INSERT INTO security_audit.partition_retention (table_name, retention_months, months_ahead) VALUES
+    ('audit_log', 24, 3),
+    ('access_log', 12, 3),
+    ('export_log', 24, 3);
+
+-- Bulk-load audit batches open in running transactions, one per
+-- transaction. Rows are written only by security_audit.begin_bulk_audit and
+-- removed by end_bulk_audit; a transaction cannot commit with its batch
+-- still open, so no row here is ever visible to another session.
+CREATE TABLE security_audit.bulk_audit_batches (
+    transaction_id XID8 PRIMARY KEY,
+    batch_label TEXT,
+    opened_by NAME NOT NULL DEFAULT session_user,
+    row_counts JSONB NOT NULL DEFAULT '{}',
+    opened_at TIMESTAMP DEFAULT NOW()
 );
 
 -- =============================================
@@ -273,31 +410,51 @@ CREATE INDEX idx_passengers_risk ON flight_data.passengers(risk_level);
 CREATE INDEX idx_passengers_name_search ON flight_data.passengers USING gin(to_tsvector('english', full_name));
 
 -- Flight passengers indexes
-CREATE INDEX idx_flight_passengers_flight ON flight_data.flight_passengers(flight_id);
 CREATE INDEX idx_flight_passengers_passenger ON flight_data.flight_passengers(passenger_id);
+-- Also serves lookups by flight_id alone
 CREATE INDEX idx_flight_passengers_combined ON flight_data.flight_passengers(flight_id, passenger_id);
 
 -- Alias indexes
 CREATE INDEX idx_aliases_passenger ON flight_data.passenger_aliases(passenger_id);
 CREATE INDEX idx_aliases_name ON flight_data.passenger_aliases USING gin(to_tsvector('english', alias));
+CREATE INDEX idx_aliases_lower ON flight_data.passenger_aliases(LOWER(alias));
+
+-- Import journal indexes
+CREATE INDEX idx_import_journal_file ON flight_data.import_journal(source_document, file_fingerprint, started_at);
 
 -- Location indexes
 CREATE INDEX idx_locations_code ON flight_data.locations(airport_code);
 CREATE INDEX idx_locations_country ON flight_data.locations(country);
 CREATE INDEX idx_locations_type ON flight_data.locations(facility_type);
+CREATE INDEX idx_route_distances_arrival ON flight_data.route_distances(arrival_location_id);
+
+-- Flight search document indexes
+CREATE INDEX idx_search_doc_date ON flight_data.flight_search_doc(flight_date DESC);
+CREATE INDEX idx_search_doc_departure ON flight_data.flight_search_doc(departure_code, flight_date DESC);
+CREATE INDEX idx_search_doc_arrival ON flight_data.flight_search_doc(arrival_code, flight_date DESC);
+CREATE INDEX idx_search_doc_names_trgm ON flight_data.flight_search_doc USING gin(passenger_names_text gin_trgm_ops);
+CREATE INDEX idx_search_doc_departure_trgm ON flight_data.flight_search_doc USING gin(departure_code gin_trgm_ops);
+CREATE INDEX idx_search_doc_arrival_trgm ON flight_data.flight_search_doc USING gin(arrival_code gin_trgm_ops);
 
 -- Investigation indexes
 CREATE INDEX idx_connections_passenger1 ON investigation.passenger_connections(passenger1_id);
 CREATE INDEX idx_connections_passenger2 ON investigation.passenger_connections(passenger2_id);
 CREATE INDEX idx_connections_strength ON investigation.passenger_connections(connection_strength);
+-- One row per unordered pair, whichever way round it was entered
+CREATE UNIQUE INDEX uq_passenger_connection_pair ON investigation.passenger_connections
+    ((LEAST(passenger1_id, passenger2_id)), (GREATEST(passenger1_id, passenger2_id)));
 CREATE INDEX idx_timeline_date ON investigation.timeline_events(event_date);
 CREATE INDEX idx_timeline_participants ON investigation.timeline_events USING gin(participants);
 
 -- Audit indexes
 CREATE INDEX idx_audit_table ON security_audit.audit_log(table_name);
-CREATE INDEX idx_audit_timestamp ON security_audit.audit_log(timestamp);
 CREATE INDEX idx_access_user ON security_audit.access_log(user_id);
-CREATE INDEX idx_access_timestamp ON security_audit.access_log(timestamp);
+
+-- Log rows arrive in timestamp order, so a BRIN index per partition stays
+-- tiny and still prunes time-range scans
+CREATE INDEX idx_audit_timestamp ON security_audit.audit_log USING brin(timestamp);
+CREATE INDEX idx_access_timestamp ON security_audit.access_log USING brin(timestamp);
+CREATE INDEX idx_export_timestamp ON security_audit.export_log USING brin(timestamp);
 
 -- =============================================
 -- VIEWS FOR COMMON QUERIES
@@ -363,12 +520,15 @@ SELECT
     COUNT(*) as flight_count,
     MIN(f.flight_date) as first_flight,
     MAX(f.flight_date) as last_flight,
-    array_agg(DISTINCT a.tail_number) as aircraft_used
+    array_agg(DISTINCT a.tail_number) as aircraft_used,
+    rd.distance_km
 FROM flight_data.flights f
 JOIN flight_data.locations dl ON f.departure_location_id = dl.id
 JOIN flight_data.locations al ON f.arrival_location_id = al.id
 LEFT JOIN flight_data.aircraft a ON f.aircraft_id = a.id
-GROUP BY dl.airport_code, al.airport_code, dl.city, dl.country, al.city, al.country
+LEFT JOIN flight_data.route_distances rd
+    ON rd.departure_location_id = f.departure_location_id AND rd.arrival_location_id = f.arrival_location_id
+GROUP BY dl.airport_code, al.airport_code, dl.city, dl.country, al.city, al.country, rd.distance_km
 ORDER BY flight_count DESC;
 
 -- Passenger co-travel analysis view
@@ -393,38 +553,380 @@ ORDER BY shared_flights DESC, p1.full_name, p2.full_name;
 -- TRIGGERS FOR AUDIT LOGGING
 -- =============================================
 
--- Function to log data changes
-CREATE OR REPLACE FUNCTION security_audit.log_data_changes() RETURNS TRIGGER AS $$
+-- Function to log data changes, once per statement. The transition tables
+-- hold every affected row, so a bulk statement writes its audit rows in a
+-- single INSERT ... SELECT instead of one trigger call per row.
+-- While the transaction has an open bulk-load batch (opened by
+-- security_audit.begin_bulk_audit) only row counts are accumulated on the
+-- batch, and security_audit.end_bulk_audit writes one summary entry.
+-- Runs as its owner, so the audit trail does not depend on the writer's
+-- privileges on security_audit.
+CREATE OR REPLACE FUNCTION security_audit.log_statement_changes() RETURNS TRIGGER AS $$
+DECLARE
+    affected BIGINT;
+    count_key TEXT := TG_TABLE_NAME || '.' || TG_OP;
 BEGIN
+    IF EXISTS (SELECT 1 FROM security_audit.bulk_audit_batches
+               WHERE transaction_id = pg_current_xact_id()) THEN
+        IF TG_OP = 'DELETE' THEN
+            SELECT COUNT(*) INTO affected FROM old_rows;
+        ELSE
+            SELECT COUNT(*) INTO affected FROM new_rows;
+        END IF;
+        IF affected > 0 THEN
+            UPDATE security_audit.bulk_audit_batches
+            SET row_counts = row_counts || jsonb_build_object(
+                count_key, COALESCE((row_counts ->> count_key)::bigint, 0) + affected)
+            WHERE transaction_id = pg_current_xact_id();
+        END IF;
+        RETURN NULL;
+    END IF;
+
     IF TG_OP = 'DELETE' THEN
         INSERT INTO security_audit.audit_log (table_name, operation, record_id, old_values, user_id, session_id)
-        VALUES (TG_TABLE_NAME, TG_OP, OLD.id, row_to_json(OLD), current_setting('app.current_user_id', true), current_setting('app.session_id', true));
-        RETURN OLD;
+        SELECT TG_TABLE_NAME, TG_OP, o.id, to_jsonb(o), current_setting('app.current_user_id', true), current_setting('app.session_id', true)
+        FROM old_rows o;
     ELSIF TG_OP = 'UPDATE' THEN
         INSERT INTO security_audit.audit_log (table_name, operation, record_id, old_values, new_values, user_id, session_id)
-        VALUES (TG_TABLE_NAME, TG_OP, NEW.id, row_to_json(OLD), row_to_json(NEW), current_setting('app.current_user_id', true), current_setting('app.session_id', true));
-        RETURN NEW;
+        SELECT TG_TABLE_NAME, TG_OP, n.id, to_jsonb(o), to_jsonb(n), current_setting('app.current_user_id', true), current_setting('app.session_id', true)
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id;
     ELSIF TG_OP = 'INSERT' THEN
         INSERT INTO security_audit.audit_log (table_name, operation, record_id, new_values, user_id, session_id)
-        VALUES (TG_TABLE_NAME, TG_OP, NEW.id, row_to_json(NEW), current_setting('app.current_user_id', true), current_setting('app.session_id', true));
-        RETURN NEW;
+        SELECT TG_TABLE_NAME, TG_OP, n.id, to_jsonb(n), current_setting('app.current_user_id', true), current_setting('app.session_id', true)
+        FROM new_rows n;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = pg_catalog, pg_temp;
+
+-- Open a bulk-load batch for the rest of the current transaction. Only
+-- flight_admin may call it (see the grants below); opening it again keeps
+-- the counts so far and takes the new label
+CREATE OR REPLACE FUNCTION security_audit.begin_bulk_audit(p_batch_label TEXT) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO security_audit.bulk_audit_batches (transaction_id, batch_label)
+    VALUES (pg_current_xact_id(), p_batch_label)
+    ON CONFLICT (transaction_id) DO UPDATE SET batch_label = EXCLUDED.batch_label;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = pg_catalog, pg_temp;
+
+-- Close the current transaction's bulk-load batch, writing its summary entry
+CREATE OR REPLACE FUNCTION security_audit.end_bulk_audit() RETURNS UUID AS $$
+DECLARE
+    batch security_audit.bulk_audit_batches%ROWTYPE;
+    audit_id UUID;
+BEGIN
+    DELETE FROM security_audit.bulk_audit_batches
+    WHERE transaction_id = pg_current_xact_id()
+    RETURNING * INTO batch;
+
+    -- No open batch, or a batch that changed nothing, leaves no entry
+    IF NOT FOUND OR batch.row_counts = '{}' THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO security_audit.audit_log (table_name, operation, new_values, user_id, session_id)
+    VALUES (
+        'bulk_load',
+        'BULK_LOAD',
+        jsonb_build_object(
+            'batch', batch.batch_label,
+            'opened_by', batch.opened_by,
+            'row_counts', batch.row_counts
+        ),
+        current_setting('app.current_user_id', true),
+        current_setting('app.session_id', true)
+    )
+    RETURNING id INTO audit_id;
+
+    RETURN audit_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = pg_catalog, pg_temp;
+
+-- Refuse to commit a transaction whose bulk-load batch is still open, as
+-- its changes would have no audit entry at all
+CREATE OR REPLACE FUNCTION security_audit.check_bulk_audit_closed() RETURNS TRIGGER AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM security_audit.bulk_audit_batches
+               WHERE transaction_id = NEW.transaction_id) THEN
+        RAISE EXCEPTION 'Bulk audit batch "%" is still open; call security_audit.end_bulk_audit() before committing',
+            NEW.batch_label;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE CONSTRAINT TRIGGER bulk_audit_batch_closed
+    AFTER INSERT ON security_audit.bulk_audit_batches
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION security_audit.check_bulk_audit_closed();
+
+-- Create audit triggers for all main tables. A trigger with transition
+-- tables can only fire on one event, hence three per table.
+CREATE TRIGGER audit_flights_insert AFTER INSERT ON flight_data.flights
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+CREATE TRIGGER audit_flights_update AFTER UPDATE ON flight_data.flights
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+CREATE TRIGGER audit_flights_delete AFTER DELETE ON flight_data.flights
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+
+CREATE TRIGGER audit_passengers_insert AFTER INSERT ON flight_data.passengers
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+CREATE TRIGGER audit_passengers_update AFTER UPDATE ON flight_data.passengers
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+CREATE TRIGGER audit_passengers_delete AFTER DELETE ON flight_data.passengers
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+
+CREATE TRIGGER audit_flight_passengers_insert AFTER INSERT ON flight_data.flight_passengers
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+CREATE TRIGGER audit_flight_passengers_update AFTER UPDATE ON flight_data.flight_passengers
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+CREATE TRIGGER audit_flight_passengers_delete AFTER DELETE ON flight_data.flight_passengers
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+
+CREATE TRIGGER audit_connections_insert AFTER INSERT ON investigation.passenger_connections
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+CREATE TRIGGER audit_connections_update AFTER UPDATE ON investigation.passenger_connections
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+CREATE TRIGGER audit_connections_delete AFTER DELETE ON investigation.passenger_connections
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION security_audit.log_statement_changes();
+
+-- =============================================
+-- TRIGGERS FOR CONNECTION MAINTENANCE
+-- =============================================
+
+-- Queue passenger link changes for incremental connection maintenance
+CREATE OR REPLACE FUNCTION investigation.queue_connection_changes() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO investigation.connection_changes (flight_id, passenger_id, delta)
+        SELECT flight_id, passenger_id, 1 FROM new_rows
+        WHERE flight_id IS NOT NULL AND passenger_id IS NOT NULL;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO investigation.connection_changes (flight_id, passenger_id, delta)
+        SELECT flight_id, passenger_id, -1 FROM old_rows
+        WHERE flight_id IS NOT NULL AND passenger_id IS NOT NULL;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO investigation.connection_changes (flight_id, passenger_id, delta)
+        SELECT o.flight_id, o.passenger_id, -1
+        FROM old_rows o JOIN new_rows n ON n.id = o.id
+        WHERE (o.flight_id, o.passenger_id) IS DISTINCT FROM (n.flight_id, n.passenger_id)
+          AND o.flight_id IS NOT NULL AND o.passenger_id IS NOT NULL
+        UNION ALL
+        SELECT n.flight_id, n.passenger_id, 1
+        FROM old_rows o JOIN new_rows n ON n.id = o.id
+        WHERE (o.flight_id, o.passenger_id) IS DISTINCT FROM (n.flight_id, n.passenger_id)
+          AND n.flight_id IS NOT NULL AND n.passenger_id IS NOT NULL;
     END IF;
     RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
--- Create audit triggers for all main tables
-CREATE TRIGGER audit_flights AFTER INSERT OR UPDATE OR DELETE ON flight_data.flights
-    FOR EACH ROW EXECUTE FUNCTION security_audit.log_data_changes();
+CREATE TRIGGER queue_connections_insert AFTER INSERT ON flight_data.flight_passengers
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION investigation.queue_connection_changes();
+CREATE TRIGGER queue_connections_update AFTER UPDATE ON flight_data.flight_passengers
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION investigation.queue_connection_changes();
+CREATE TRIGGER queue_connections_delete AFTER DELETE ON flight_data.flight_passengers
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION investigation.queue_connection_changes();
 
-CREATE TRIGGER audit_passengers AFTER INSERT OR UPDATE OR DELETE ON flight_data.passengers
-    FOR EACH ROW EXECUTE FUNCTION security_audit.log_data_changes();
+-- =============================================
+-- TRIGGERS FOR FLIGHT SEARCH DOCUMENTS
+-- =============================================
 
-CREATE TRIGGER audit_flight_passengers AFTER INSERT OR UPDATE OR DELETE ON flight_data.flight_passengers
-    FOR EACH ROW EXECUTE FUNCTION security_audit.log_data_changes();
+-- Rebuild the search documents of the given flights (all flights for NULL)
+-- in one statement; documents whose content is unchanged are not rewritten.
+-- Returns the number of documents written.
+CREATE OR REPLACE FUNCTION flight_data.refresh_flight_search_docs(p_flight_ids UUID[] DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    written INTEGER;
+BEGIN
+    INSERT INTO flight_data.flight_search_doc AS doc (
+        flight_id, flight_number, flight_date, departure_code, departure_name,
+        arrival_code, arrival_name, tail_number, aircraft_model, passenger_count,
+        passenger_names, passenger_names_text
+    )
+    SELECT
+        f.id, f.flight_number, f.flight_date, dl.airport_code, dl.airport_name,
+        al.airport_code, al.airport_name, a.tail_number, a.model, f.passenger_count,
+        COALESCE(manifest.passenger_names, '{}'),
+        COALESCE(array_to_string(manifest.passenger_names, E'\n'), '')
+    FROM flight_data.flights f
+    LEFT JOIN flight_data.aircraft a ON a.id = f.aircraft_id
+    LEFT JOIN flight_data.locations dl ON dl.id = f.departure_location_id
+    LEFT JOIN flight_data.locations al ON al.id = f.arrival_location_id
+    LEFT JOIN LATERAL (
+        SELECT array_agg(p.full_name::text ORDER BY p.full_name, p.id) AS passenger_names
+        FROM flight_data.passengers p
+        WHERE p.id IN (SELECT fp.passenger_id FROM flight_data.flight_passengers fp WHERE fp.flight_id = f.id)
+    ) manifest ON TRUE
+    WHERE p_flight_ids IS NULL OR f.id = ANY(p_flight_ids)
+    ON CONFLICT (flight_id) DO UPDATE SET
+        flight_number = EXCLUDED.flight_number,
+        flight_date = EXCLUDED.flight_date,
+        departure_code = EXCLUDED.departure_code,
+        departure_name = EXCLUDED.departure_name,
+        arrival_code = EXCLUDED.arrival_code,
+        arrival_name = EXCLUDED.arrival_name,
+        tail_number = EXCLUDED.tail_number,
+        aircraft_model = EXCLUDED.aircraft_model,
+        passenger_count = EXCLUDED.passenger_count,
+        passenger_names = EXCLUDED.passenger_names,
+        passenger_names_text = EXCLUDED.passenger_names_text,
+        updated_at = NOW()
+    WHERE (doc.flight_number, doc.flight_date, doc.departure_code, doc.departure_name,
+           doc.arrival_code, doc.arrival_name, doc.tail_number, doc.aircraft_model,
+           doc.passenger_count, doc.passenger_names)
+          IS DISTINCT FROM
+          (EXCLUDED.flight_number, EXCLUDED.flight_date, EXCLUDED.departure_code, EXCLUDED.departure_name,
+           EXCLUDED.arrival_code, EXCLUDED.arrival_name, EXCLUDED.tail_number, EXCLUDED.aircraft_model,
+           EXCLUDED.passenger_count, EXCLUDED.passenger_names);
+    GET DIAGNOSTICS written = ROW_COUNT;
+    RETURN written;
+END;
+$$ LANGUAGE plpgsql;
 
-CREATE TRIGGER audit_connections AFTER INSERT OR UPDATE OR DELETE ON investigation.passenger_connections
-    FOR EACH ROW EXECUTE FUNCTION security_audit.log_data_changes();
+-- Refresh the search documents of the flights a statement touched, directly
+-- or through their passengers, airports or aircraft. In a transaction that
+-- called flight_data.defer_search_docs the flights are only collected, and
+-- refreshed once by refresh_deferred_search_docs or at commit.
+CREATE OR REPLACE FUNCTION flight_data.sync_flight_search_docs() RETURNS TRIGGER AS $$
+DECLARE
+    flight_ids UUID[];
+BEGIN
+    IF TG_TABLE_NAME = 'flights' THEN
+        flight_ids := ARRAY(SELECT id FROM new_rows);
+    ELSIF TG_TABLE_NAME = 'flight_passengers' THEN
+        IF TG_OP = 'INSERT' THEN
+            flight_ids := ARRAY(SELECT DISTINCT flight_id FROM new_rows WHERE flight_id IS NOT NULL);
+        ELSIF TG_OP = 'DELETE' THEN
+            flight_ids := ARRAY(SELECT DISTINCT flight_id FROM old_rows WHERE flight_id IS NOT NULL);
+        ELSE
+            flight_ids := ARRAY(
+                SELECT flight_id FROM new_rows WHERE flight_id IS NOT NULL
+                UNION
+                SELECT flight_id FROM old_rows WHERE flight_id IS NOT NULL
+            );
+        END IF;
+    ELSIF TG_TABLE_NAME = 'passengers' THEN
+        flight_ids := ARRAY(
+            SELECT DISTINCT fp.flight_id
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            JOIN flight_data.flight_passengers fp ON fp.passenger_id = n.id
+            WHERE n.full_name IS DISTINCT FROM o.full_name
+        );
+    ELSIF TG_TABLE_NAME = 'locations' THEN
+        flight_ids := ARRAY(
+            SELECT f.id
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            JOIN flight_data.flights f ON n.id IN (f.departure_location_id, f.arrival_location_id)
+            WHERE (n.airport_code, n.airport_name) IS DISTINCT FROM (o.airport_code, o.airport_name)
+        );
+    ELSIF TG_TABLE_NAME = 'aircraft' THEN
+        flight_ids := ARRAY(
+            SELECT f.id
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            JOIN flight_data.flights f ON f.aircraft_id = n.id
+            WHERE (n.tail_number, n.model) IS DISTINCT FROM (o.tail_number, o.model)
+        );
+    END IF;
+
+    IF cardinality(flight_ids) > 0 THEN
+        UPDATE flight_data.search_doc_deferrals
+        SET pending_flights = pending_flights || flight_ids
+        WHERE transaction_id = pg_current_xact_id();
+        IF NOT FOUND THEN
+            PERFORM flight_data.refresh_flight_search_docs(flight_ids);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = pg_catalog, pg_temp;
+
+-- Collect the search document refreshes of the rest of the current
+-- transaction instead of running them after every statement. Anyone may
+-- defer: the refresh still happens before the transaction commits.
+CREATE OR REPLACE FUNCTION flight_data.defer_search_docs() RETURNS VOID AS $$
+BEGIN
+    INSERT INTO flight_data.search_doc_deferrals (transaction_id)
+    VALUES (pg_current_xact_id())
+    ON CONFLICT (transaction_id) DO NOTHING;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = pg_catalog, pg_temp;
+
+-- Refresh the current transaction's deferred search documents and stop
+-- deferring. Returns the number of documents written.
+CREATE OR REPLACE FUNCTION flight_data.refresh_deferred_search_docs() RETURNS INTEGER AS $$
+DECLARE
+    pending UUID[];
+BEGIN
+    DELETE FROM flight_data.search_doc_deferrals
+    WHERE transaction_id = pg_current_xact_id()
+    RETURNING pending_flights INTO pending;
+
+    IF NOT FOUND THEN
+        RETURN 0;
+    END IF;
+    RETURN flight_data.refresh_flight_search_docs(ARRAY(SELECT DISTINCT unnest(pending)));
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = pg_catalog, pg_temp;
+
+-- Refresh whatever a transaction deferred and did not refresh itself
+CREATE OR REPLACE FUNCTION flight_data.refresh_search_docs_at_commit() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM flight_data.refresh_deferred_search_docs();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE CONSTRAINT TRIGGER search_doc_deferral_refreshed
+    AFTER INSERT ON flight_data.search_doc_deferrals
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION flight_data.refresh_search_docs_at_commit();
+
+CREATE TRIGGER search_doc_flights_insert AFTER INSERT ON flight_data.flights
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION flight_data.sync_flight_search_docs();
+CREATE TRIGGER search_doc_flights_update AFTER UPDATE ON flight_data.flights
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION flight_data.sync_flight_search_docs();
+CREATE TRIGGER search_doc_flight_passengers_insert AFTER INSERT ON flight_data.flight_passengers
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION flight_data.sync_flight_search_docs();
+CREATE TRIGGER search_doc_flight_passengers_update AFTER UPDATE ON flight_data.flight_passengers
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION flight_data.sync_flight_search_docs();
+CREATE TRIGGER search_doc_flight_passengers_delete AFTER DELETE ON flight_data.flight_passengers
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION flight_data.sync_flight_search_docs();
+CREATE TRIGGER search_doc_passengers_update AFTER UPDATE ON flight_data.passengers
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION flight_data.sync_flight_search_docs();
+CREATE TRIGGER search_doc_locations_update AFTER UPDATE ON flight_data.locations
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION flight_data.sync_flight_search_docs();
+CREATE TRIGGER search_doc_aircraft_update AFTER UPDATE ON flight_data.aircraft
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION flight_data.sync_flight_search_docs();
 
 -- =============================================
 -- FUNCTIONS FOR INVESTIGATION QUERIES
@@ -576,6 +1078,126 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Create the monthly partition of a security_audit log table holding
+-- p_month, named <table>_yYYYYmMM. Rows already sitting in the DEFAULT
+-- partition for that month are moved into it. Returns false if it exists.
+CREATE OR REPLACE FUNCTION security_audit.create_month_partition(
+    p_table TEXT,
+    p_month DATE
+) RETURNS BOOLEAN AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_month)::date;
+    month_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::date;
+    partition_name TEXT := p_table || '_' || to_char(p_month, '"y"YYYY"m"MM');
+    has_strays BOOLEAN;
+BEGIN
+    IF to_regclass(format('security_audit.%I', partition_name)) IS NOT NULL THEN
+        RETURN FALSE;
+    END IF;
+
+    -- A new range may not overlap rows held by the DEFAULT partition
+    EXECUTE format('SELECT EXISTS (SELECT 1 FROM security_audit.%I WHERE timestamp >= $1 AND timestamp < $2)',
+                   p_table || '_default')
+        INTO has_strays USING month_start, month_end;
+
+    IF has_strays THEN
+        EXECUTE format('CREATE TEMP TABLE partition_strays ON COMMIT DROP AS
+                        SELECT * FROM security_audit.%I WHERE timestamp >= $1 AND timestamp < $2',
+                       p_table || '_default') USING month_start, month_end;
+        EXECUTE format('DELETE FROM security_audit.%I WHERE timestamp >= $1 AND timestamp < $2',
+                       p_table || '_default') USING month_start, month_end;
+    END IF;
+
+    EXECUTE format('CREATE TABLE security_audit.%I PARTITION OF security_audit.%I FOR VALUES FROM (%L) TO (%L)',
+                   partition_name, p_table, month_start, month_end);
+
+    IF has_strays THEN
+        EXECUTE format('INSERT INTO security_audit.%I SELECT * FROM partition_strays', p_table);
+        DROP TABLE partition_strays;
+    END IF;
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop the monthly partitions of a log table that ended more than
+-- p_retention_months ago, and purge the same range from its DEFAULT
+-- partition. Each drop is recorded in audit_log.
+CREATE OR REPLACE FUNCTION security_audit.drop_expired_partitions(
+    p_table TEXT,
+    p_retention_months INTEGER
+) RETURNS INTEGER AS $$
+DECLARE
+    cutoff DATE := (date_trunc('month', NOW()) - make_interval(months => p_retention_months))::date;
+    part RECORD;
+    dropped INTEGER := 0;
+    purged BIGINT;
+BEGIN
+    FOR part IN
+        SELECT c.relname, to_date(right(c.relname, 8), '"y"YYYY"m"MM') AS month_start
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = format('security_audit.%I', p_table)::regclass
+          AND c.relname ~ ('^' || p_table || '_y\d{4}m\d{2}$')
+          AND to_date(right(c.relname, 8), '"y"YYYY"m"MM') + INTERVAL '1 month' <= cutoff
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('DROP TABLE security_audit.%I', part.relname);
+        dropped := dropped + 1;
+
+        INSERT INTO security_audit.audit_log (table_name, operation, new_values, user_id)
+        VALUES (p_table, 'PARTITION_DROP',
+                jsonb_build_object('partition', part.relname, 'month', part.month_start,
+                                   'retention_months', p_retention_months),
+                current_setting('app.current_user_id', true));
+    END LOOP;
+
+    EXECUTE format('DELETE FROM security_audit.%I WHERE timestamp < $1', p_table || '_default')
+        USING cutoff;
+    GET DIAGNOSTICS purged = ROW_COUNT;
+    IF purged > 0 THEN
+        INSERT INTO security_audit.audit_log (table_name, operation, new_values, user_id)
+        VALUES (p_table, 'PARTITION_DROP',
+                jsonb_build_object('partition', p_table || '_default', 'before', cutoff,
+                                   'rows', purged, 'retention_months', p_retention_months),
+                current_setting('app.current_user_id', true));
+    END IF;
+
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create the current and upcoming monthly partitions and apply retention
+-- for every table in security_audit.partition_retention. Run daily.
+CREATE OR REPLACE FUNCTION security_audit.maintain_partitions()
+RETURNS TABLE(partitioned_table TEXT, partitions_created INTEGER, partitions_dropped INTEGER) AS $$
+DECLARE
+    retention RECORD;
+    month_offset INTEGER;
+BEGIN
+    FOR retention IN
+        SELECT r.table_name, r.retention_months, r.months_ahead
+        FROM security_audit.partition_retention r
+        ORDER BY r.table_name
+    LOOP
+        partitioned_table := retention.table_name;
+        partitions_created := 0;
+        FOR month_offset IN 0..retention.months_ahead LOOP
+            IF security_audit.create_month_partition(
+                retention.table_name,
+                (date_trunc('month', NOW()) + make_interval(months => month_offset))::date
+            ) THEN
+                partitions_created := partitions_created + 1;
+            END IF;
+        END LOOP;
+        partitions_dropped := security_audit.drop_expired_partitions(retention.table_name, retention.retention_months);
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Monthly partitions for the current and upcoming months
+SELECT * FROM security_audit.maintain_partitions();
+
 -- =============================================
 -- PERMISSIONS SETUP
 -- =============================================
@@ -587,6 +1209,16 @@ GRANT ALL ON ALL TABLES IN SCHEMA flight_data TO flight_analyst;
 GRANT ALL ON ALL TABLES IN SCHEMA investigation TO flight_analyst;
 GRANT ALL ON ALL TABLES IN SCHEMA security_audit TO flight_admin;
 
+-- Bulk-load batches are opened and closed only through the audit functions
+REVOKE ALL ON security_audit.bulk_audit_batches FROM flight_admin;
+GRANT SELECT ON security_audit.bulk_audit_batches TO flight_admin;
+REVOKE EXECUTE ON FUNCTION security_audit.begin_bulk_audit(TEXT), security_audit.end_bulk_audit() FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION security_audit.begin_bulk_audit(TEXT), security_audit.end_bulk_audit() TO flight_admin;
+
+-- Deferred search document refreshes are recorded only through the search document functions
+REVOKE ALL ON flight_data.search_doc_deferrals FROM flight_analyst;
+GRANT SELECT ON flight_data.search_doc_deferrals TO flight_analyst;
+
 -- Grant sequence permissions
 GRANT USAGE, SELECT ON ALL SEQUENCES IN SCHEMA flight_data TO flight_reader, flight_analyst;
 GRANT USAGE, SELECT ON ALL SEQUENCES IN SCHEMA investigation TO flight_analyst;
@@ -627,6 +1259,7 @@ COMMENT ON SCHEMA security_audit IS 'Security audit and access logging schema';
 COMMENT ON TABLE flight_data.flights IS 'Main flights table containing all flight information';
 COMMENT ON TABLE flight_data.passengers IS 'Master passenger directory with identity verification';
 COMMENT ON TABLE flight_data.flight_passengers IS 'Junction table linking flights to passengers';
+COMMENT ON TABLE flight_data.flight_search_doc IS 'Denormalized per-flight search documents for the flight search API';
 COMMENT ON TABLE investigation.passenger_connections IS 'Relationship mapping between passengers';
 COMMENT ON TABLE investigation.timeline_events IS 'Timeline events for cross-referencing with flights';
 
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Local Article Store for Creepstate Research Tools
+Every article, post and page fetched by auto-research.py and fact-checker.py
+is kept in an SQLite database with an FTS5 index, deduplicated by URL and by
+content hash. Claim verification and connection discovery run BM25-ranked
+queries over the accumulated corpus instead of scanning the latest fetch.
+Run directly for corpus statistics, a query, or a latency benchmark.
+
+FTS5 picks the candidate articles, the best of its own bm25() ranking on the
+query's rarest words, and the final scores are computed here over every
+query word with the substring matching claims have always used. Document
+frequencies for those scores are cached per word and refreshed as the
+corpus grows, so lookups stay in milliseconds for common words.
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import random
+import re
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_STORE_PATH = os.getenv('CREEPSTATE_ARTICLE_STORE',
+                               os.path.join(os.path.expanduser('~'), '.local', 'share', 'creepstate', 'articles.sqlite'))
+
+# Best FTS5 matches scored per query; bounds lookup time when even the
+# rarest query words are very common
+DEFAULT_CANDIDATES = 250
+
+# BM25 parameters; title text counts three times as much as body text
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_WEIGHT = 3
+
+# Cached document frequencies are recounted once the corpus has changed
+# size by more than this fraction
+TERM_STATS_TOLERANCE = 0.1
+
+def content_hash(title: str, body: str) -> str:
+    """Hash of the normalized text, shared by syndicated copies of an article"""
+    text = re.sub(r'\s+', ' ', f"{title} {body}".lower()).strip()
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def query_terms(text: str) -> List[str]:
+    """Distinct words of a query, in order"""
+    return list(dict.fromkeys(word for word in re.findall(r'\w+', text.lower()) if len(word) > 1))
+
+def match_expression(terms: List[str]) -> str:
+    """FTS5 expression matching any of the terms"""
+    return ' OR '.join(f'"{term}"' for term in terms)
+
+class ArticleStore:
+    """SQLite article corpus with an external-content FTS5 index"""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE,
+                content_hash TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                source TEXT,
+                title TEXT NOT NULL DEFAULT '',
+                body TEXT NOT NULL DEFAULT '',
+                published TEXT,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_articles_hash ON articles(content_hash);
+            CREATE INDEX IF NOT EXISTS idx_articles_first_seen ON articles(first_seen);
+
+            CREATE TABLE IF NOT EXISTS corpus_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                articles INTEGER NOT NULL,
+                title_chars INTEGER NOT NULL,
+                body_chars INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO corpus_stats VALUES (1, 0, 0, 0);
+
+            CREATE TABLE IF NOT EXISTS term_stats (
+                term TEXT PRIMARY KEY,
+                docs INTEGER NOT NULL,
+                articles_at INTEGER NOT NULL
+            );
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title, body, content='articles', content_rowid='id', tokenize='porter unicode61'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+                UPDATE corpus_stats SET articles = articles + 1, title_chars = title_chars + length(new.title),
+                                        body_chars = body_chars + length(new.body);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts(articles_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+                UPDATE corpus_stats SET articles = articles - 1, title_chars = title_chars - length(old.title),
+                                        body_chars = body_chars - length(old.body);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, body ON articles BEGIN
+                INSERT INTO articles_fts(articles_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+                INSERT INTO articles_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+                UPDATE corpus_stats SET title_chars = title_chars + length(new.title) - length(old.title),
+                                        body_chars = body_chars + length(new.body) - length(old.body);
+            END;
+        """)
+        self.connection.commit()
+
+    def _add(self, cursor, article: Dict[str, Any], now: float) -> str:
+        """Insert, update or skip one article; returns which happened"""
+        title = article.get('title') or ''
+        body = article.get('body') or ''
+        digest = content_hash(title, body)
+        url = article.get('url') or f"{article['kind']}:{digest}"
+
+        existing = cursor.execute("SELECT id, content_hash FROM articles WHERE url = ?", (url,)).fetchone()
+        if existing and existing['content_hash'] == digest:
+            cursor.execute("UPDATE articles SET last_seen = ? WHERE id = ?", (now, existing['id']))
+            return 'unchanged'
+
+        # The same text under another URL is a syndicated copy
+        duplicate = cursor.execute("SELECT id FROM articles WHERE content_hash = ? AND url != ?",
+                                   (digest, url)).fetchone()
+        if duplicate:
+            cursor.execute("UPDATE articles SET last_seen = ? WHERE id = ?", (now, duplicate['id']))
+            return 'duplicate'
+
+        if existing:
+            cursor.execute("""
+                UPDATE articles SET content_hash = ?, source = ?, title = ?, body = ?, published = ?, last_seen = ?
+                WHERE id = ?
+            """, (digest, article.get('source'), title, body, article.get('published'), now, existing['id']))
+            return 'updated'
+
+        cursor.execute("""
+            INSERT INTO articles (url, content_hash, kind, source, title, body, published, first_seen, last_seen)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (url, digest, article['kind'], article.get('source'), title, body, article.get('published'), now, now))
+        return 'added'
+
+    def add_many(self, articles: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Store articles (dicts with kind, url, title, body, source, published) in one transaction"""
+        outcome = {'added': 0, 'updated': 0, 'unchanged': 0, 'duplicate': 0}
+        now = time.time()
+        with self.connection:
+            cursor = self.connection.cursor()
+            for article in articles:
+                outcome[self._add(cursor, article, now)] += 1
+        return outcome
+
+    def add(self, **article) -> str:
+        """Store a single article"""
+        outcome = self.add_many([article])
+        return next(name for name, count in outcome.items() if count)
+
+    def document_frequencies(self, terms: List[str]) -> Dict[str, int]:
+        """Articles containing each word, from term_stats or counted and cached"""
+        articles = self.count()
+        cached = {row['term']: row['docs'] for row in self.connection.execute(f"""
+            SELECT term, docs FROM term_stats
+            WHERE term IN ({', '.join('?' for _ in terms)}) AND abs(articles_at - ?) <= ?
+        """, [*terms, articles, TERM_STATS_TOLERANCE * articles])}
+
+        missing = [term for term in terms if term not in cached]
+        if missing:
+            with self.connection:
+                for term in missing:
+                    cached[term] = self.connection.execute(
+                        "SELECT COUNT(*) FROM articles_fts WHERE articles_fts MATCH ?", (f'"{term}"',)
+                    ).fetchone()[0]
+                    self.connection.execute("INSERT OR REPLACE INTO term_stats VALUES (?, ?, ?)",
+                                            (term, cached[term], articles))
+        return cached
+
+    def search(self, query: str, limit: int = 10, min_match: float = 1.0,
+               kinds: Optional[List[str]] = None, candidates: int = DEFAULT_CANDIDATES) -> List[Dict[str, Any]]:
+        """BM25-ranked articles containing at least min_match of the query's words
+
+        Words count as present the way claim matching always has, as
+        case-insensitive substrings of the title or body. An article with
+        k of n words contains one of the n - k + 1 rarest, so only those
+        are looked up in the index. Higher scores are better.
+        """
+        terms = query_terms(query)
+        if not terms:
+            return []
+        needed = min(len(terms), max(1, math.ceil(min_match * len(terms) - 1e-9)))
+
+        frequencies = self.document_frequencies(terms)
+        rarest = sorted(terms, key=frequencies.get)[:len(terms) - needed + 1]
+        if not any(frequencies[term] for term in rarest):
+            return []
+
+        articles, title_chars, body_chars = self.connection.execute(
+            "SELECT articles, title_chars, body_chars FROM corpus_stats").fetchone()
+        params: Dict[str, Any] = {
+            'expression': match_expression(rarest), 'candidates': candidates,
+            'needed': needed, 'limit': limit,
+            'average_length': max(1.0, (TITLE_WEIGHT * title_chars + body_chars) / max(articles, 1))
+        }
+
+        # Presence, weighted occurrences and BM25 contribution of each word;
+        # occurrences are only counted for articles with enough words present
+        counts, presence, contributions = [], [], []
+        for number, term in enumerate(terms):
+            params[f'term{number}'] = term
+            params[f'idf{number}'] = math.log(1 + (articles - frequencies[term] + 0.5) / (frequencies[term] + 0.5))
+            counts.append(f"""({TITLE_WEIGHT} * (length(title_text) - length(replace(title_text, :term{number}, '')))
+                              + length(body_text) - length(replace(body_text, :term{number}, ''))) / {len(term)}.0 AS tf{number}""")
+            presence.append(f"(instr(title_text, :term{number}) + instr(body_text, :term{number}) > 0)")
+            contributions.append(f":idf{number} * tf{number} * {BM25_K1 + 1}"
+                                 f" / (tf{number} + {BM25_K1} * (1 - {BM25_B} + {BM25_B} * length / :average_length))")
+
+        # Other kinds must not take up candidate slots, so they are
+        # filtered out before the best matches are picked
+        kind_join = kind_filter = ''
+        if kinds:
+            kind_join = "JOIN articles ON articles.id = articles_fts.rowid"
+            kind_filter = f"AND articles.kind IN ({', '.join(f':kind{n}' for n in range(len(kinds)))})"
+            params.update({f'kind{n}': kind for n, kind in enumerate(kinds)})
+
+        rows = self.connection.execute(f"""
+            WITH candidate AS MATERIALIZED (
+                SELECT id, url, kind, source, title, body, published, first_seen,
+                       lower(title) AS title_text, lower(body) AS body_text,
+                       {TITLE_WEIGHT} * length(title) + length(body) AS length
+                FROM articles
+                WHERE id IN (
+                    SELECT articles_fts.rowid FROM articles_fts {kind_join}
+                    WHERE articles_fts MATCH :expression {kind_filter}
+                    ORDER BY bm25(articles_fts, {TITLE_WEIGHT}, 1) LIMIT :candidates
+                )
+            ),
+            counted AS MATERIALIZED (
+                SELECT *, {', '.join(counts)} FROM candidate
+                WHERE {' + '.join(presence)} >= :needed
+            )
+            SELECT id, url, kind, source, title, body, published, first_seen,
+                   {' + '.join(contributions)} AS score
+            FROM counted
+            ORDER BY score DESC
+            LIMIT :limit
+        """, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self) -> int:
+        return self.connection.execute("SELECT articles FROM corpus_stats").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Stored articles per kind"""
+        return dict(self.connection.execute("SELECT kind, COUNT(*) FROM articles GROUP BY kind ORDER BY kind"))
+
+    def optimize(self):
+        """Merge the FTS5 index segments; worth running after bulk loads"""
+        with self.connection:
+            self.connection.execute("INSERT INTO articles_fts(articles_fts) VALUES ('optimize')")
+
+    def close(self):
+        self.connection.close()
+
+def benchmark(path: str, articles: int, queries: int):
+    """Load a synthetic corpus and time claim lookups against it"""
+    vocabulary = [f"w{n}" for n in range(20000)]
+    topical = ['trump', 'epstein', 'federal', 'court', 'charges', 'investigation', 'records', 'maxwell',
+               'trafficking', 'testimony', 'flight', 'island', 'documents', 'unsealed', 'grand', 'jury']
+    rng = random.Random(7)
+
+    def text(words: int) -> str:
+        # Zipf-distributed filler; topic word n appears in about 1/(n + 2) of articles
+        tokens = [vocabulary[min(int(rng.paretovariate(1.1)), len(vocabulary) - 1)] for _ in range(words)]
+        for rank, word in enumerate(topical):
+            if rng.random() < 1 / (rank + 2):
+                for _ in range(rng.randint(1, 3)):
+                    tokens[rng.randrange(words)] = word
+        return ' '.join(tokens)
+
+    store = ArticleStore(path)
+    started = time.perf_counter()
+    for offset in range(0, articles, 10000):
+        store.add_many({'kind': 'benchmark', 'url': f"https://example.org/{offset + n}",
+                        'title': text(10), 'body': text(250)}
+                       for n in range(min(10000, articles - offset)))
+    store.optimize()
+    load = time.perf_counter() - started
+
+    started = time.perf_counter()
+    store.document_frequencies(topical)
+    counting = time.perf_counter() - started
+    print(f"{store.count():,} articles loaded in {load:.1f}s")
+    print(f"document frequencies of {len(topical)} words counted in {counting * 1000:.1f} ms")
+
+    # Claims of topic words only are the worst case, as every word is
+    # common; typical claims also name someone or something rarer
+    claim_sets = {
+        'topic words only': [' '.join(rng.sample(topical, rng.randint(3, 6))) for _ in range(queries)],
+        'with a rarer word': [' '.join(rng.sample(topical, rng.randint(2, 4)) + [rng.choice(vocabulary[50:5000])])
+                              for _ in range(queries)]
+    }
+    for label, claims in claim_sets.items():
+        timings = []
+        for claim in claims:
+            started = time.perf_counter()
+            store.search(claim, limit=10, min_match=0.7)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        print(f"{queries} claim lookups, {label}: median {timings[len(timings) // 2]:.2f} ms, "
+              f"p95 {timings[int(len(timings) * 0.95)]:.2f} ms, max {timings[-1]:.2f} ms")
+    store.close()
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Query or benchmark the local article store')
+    parser.add_argument('query', nargs='?', help='Ranked lookup to run against the store')
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH,
+                        help=f'Article store path (default: {DEFAULT_STORE_PATH})')
+    parser.add_argument('--min-match', type=float, default=0.7,
+                        help='Fraction of query words a match must contain (default: 0.7)')
+    parser.add_argument('--limit', type=int, default=10, help='Results shown (default: 10)')
+    parser.add_argument('--benchmark', type=int, metavar='ARTICLES',
+                        help='Load this many synthetic articles into --store and time lookups')
+    return parser.parse_args()
+
+def main():
+    """Print corpus statistics, run a query, or benchmark"""
+    args = parse_args()
+
+    if args.benchmark:
+        benchmark(args.store, args.benchmark, queries=200)
+        return
+
+    store = ArticleStore(args.store)
+    try:
+        print(f"{store.count():,} articles: {store.stats()}")
+        if args.query:
+            started = time.perf_counter()
+            results = store.search(args.query, limit=args.limit, min_match=args.min_match)
+            print(f"{len(results)} results in {(time.perf_counter() - started) * 1000:.2f} ms")
+            for result in results:
+                print(f"{result['score']:8.2f}  [{result['kind']}] {result['title'][:80]}  {result['url']}")
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Primary Key Benchmark for Creepstate Investigation Platform
+Loads flight_passengers-shaped tables in import-sized batches with random
+UUIDv4 keys and with time-ordered UUIDv7 keys, and compares insert
+throughput and index sizes. Works in a scratch schema that is dropped after.
+"""
+
+import argparse
+import logging
+import os
+import time
+from typing import Dict, List
+
+import psycopg2
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_SCHEMA = 'key_benchmark'
+
+# name -> (key function, flight_passengers indexes besides the primary key)
+VARIANTS = {
+    'uuidv4 (before)': ('uuid_generate_v4()', ['flight_id', 'passenger_id', 'flight_id, passenger_id']),
+    'uuidv7': ('uuid_generate_v7()', ['flight_id', 'passenger_id', 'flight_id, passenger_id']),
+    'uuidv7 (after)': ('uuid_generate_v7()', ['passenger_id', 'flight_id, passenger_id']),
+}
+
+class KeyBenchmark:
+    """Insert the same synthetic manifests under each key variant"""
+
+    def __init__(self, db_config: Dict[str, str], rows: int = 1_000_000, batch_rows: int = 5000,
+                 passengers: int = 5000, manifest_size: int = 4):
+        self.db_config = db_config
+        self.connection = None
+        self.rows = rows
+        self.batch_rows = batch_rows
+        self.passengers = passengers
+        self.manifest_size = manifest_size
+        self.results: List[Dict] = []
+
+    def connect_database(self):
+        """Establish database connection"""
+        try:
+            self.connection = psycopg2.connect(**self.db_config)
+            logger.info("Connected to database successfully")
+        except Exception as e:
+            logger.error(f"Database connection failed: {e}")
+            raise
+
+    def _create_tables(self, key_function: str, indexes: List[str]):
+        """Fresh scratch copies of passengers, flights and flight_passengers"""
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"""
+                DROP SCHEMA IF EXISTS {BENCHMARK_SCHEMA} CASCADE;
+                CREATE SCHEMA {BENCHMARK_SCHEMA};
+
+                CREATE TABLE {BENCHMARK_SCHEMA}.passengers (
+                    id UUID PRIMARY KEY DEFAULT {key_function},
+                    n INTEGER UNIQUE NOT NULL
+                );
+                CREATE TABLE {BENCHMARK_SCHEMA}.flights (
+                    id UUID PRIMARY KEY DEFAULT {key_function},
+                    flight_date DATE NOT NULL
+                );
+                CREATE TABLE {BENCHMARK_SCHEMA}.flight_passengers (
+                    id UUID PRIMARY KEY DEFAULT {key_function},
+                    flight_id UUID REFERENCES {BENCHMARK_SCHEMA}.flights(id) ON DELETE CASCADE,
+                    passenger_id UUID REFERENCES {BENCHMARK_SCHEMA}.passengers(id),
+                    passenger_role VARCHAR(50) DEFAULT 'passenger',
+                    created_at TIMESTAMP DEFAULT NOW()
+                );
+
+                INSERT INTO {BENCHMARK_SCHEMA}.passengers (n)
+                SELECT n FROM generate_series(1, {int(self.passengers)}) n;
+            """)
+            for number, columns in enumerate(indexes):
+                cursor.execute(f"CREATE INDEX idx_benchmark_{number} "
+                               f"ON {BENCHMARK_SCHEMA}.flight_passengers({columns})")
+        self.connection.commit()
+
+    def _index_sizes(self) -> Dict[str, int]:
+        """Size in bytes of each flight_passengers index"""
+        with self.connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT pg_get_indexdef(i.indexrelid), pg_relation_size(i.indexrelid)
+                FROM pg_index i
+                WHERE i.indrelid = %s::regclass
+                ORDER BY i.indexrelid
+            """, (f'{BENCHMARK_SCHEMA}.flight_passengers',))
+            return {definition[definition.index('USING btree ') + len('USING btree '):]: size
+                    for definition, size in cursor.fetchall()}
+
+    def run_variant(self, name: str, key_function: str, indexes: List[str]) -> Dict:
+        """Load self.rows links in committed batches and measure the result"""
+        self._create_tables(key_function, indexes)
+        flights_per_batch = max(1, self.batch_rows // self.manifest_size)
+        inserted = 0
+
+        started = time.perf_counter()
+        with self.connection.cursor() as cursor:
+            while inserted < self.rows:
+                cursor.execute(f"""
+                    WITH new_flights AS (
+                        INSERT INTO {BENCHMARK_SCHEMA}.flights (flight_date)
+                        SELECT CURRENT_DATE FROM generate_series(1, %s)
+                        RETURNING id
+                    ),
+                    manifest AS (
+                        SELECT f.id AS flight_id, 1 + floor(random() * %s)::int AS n
+                        FROM new_flights f
+                        CROSS JOIN generate_series(1, %s)
+                    )
+                    INSERT INTO {BENCHMARK_SCHEMA}.flight_passengers (flight_id, passenger_id)
+                    SELECT m.flight_id, p.id
+                    FROM manifest m
+                    JOIN {BENCHMARK_SCHEMA}.passengers p ON p.n = m.n
+                """, (flights_per_batch, self.passengers, self.manifest_size))
+                inserted += cursor.rowcount
+                self.connection.commit()
+        elapsed = time.perf_counter() - started
+
+        result = {
+            'variant': name,
+            'rows': inserted,
+            'seconds': elapsed,
+            'rows_per_second': inserted / elapsed if elapsed else 0.0,
+            'index_sizes': self._index_sizes()
+        }
+        self.results.append(result)
+        logger.info(f"{name}: {inserted:,} links in {elapsed:.1f}s "
+                    f"({result['rows_per_second']:,.0f} rows/s)")
+        return result
+
+    def run(self):
+        """Run every variant, then drop the scratch schema"""
+        try:
+            for name, (key_function, indexes) in VARIANTS.items():
+                self.run_variant(name, key_function, indexes)
+        finally:
+            self.connection.rollback()
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"DROP SCHEMA IF EXISTS {BENCHMARK_SCHEMA} CASCADE")
+            self.connection.commit()
+
+    def print_summary(self):
+        """Print throughput and index sizes per variant"""
+        logger.info("="*50)
+        logger.info("PRIMARY KEY BENCHMARK")
+        logger.info("="*50)
+        logger.info(f"{self.rows:,} flight_passengers rows in batches of {self.batch_rows}, "
+                    f"{self.passengers:,} passengers, {self.manifest_size} per flight")
+        for result in self.results:
+            total = sum(result['index_sizes'].values())
+            logger.info(f"{result['variant']}: {result['rows_per_second']:,.0f} rows/s, "
+                        f"indexes {total / 1048576:.1f} MB")
+            for columns, size in result['index_sizes'].items():
+                logger.info(f"    {columns:<28} {size / 1048576:8.1f} MB")
+        logger.info("="*50)
+
+    def close_connection(self):
+        """Close database connection"""
+        if self.connection:
+            self.connection.close()
+            logger.info("Database connection closed")
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Benchmark UUIDv4 against UUIDv7 primary keys')
+    parser.add_argument('--rows', type=int, default=1_000_000,
+                        help='flight_passengers rows loaded per variant (default: 1000000)')
+    parser.add_argument('--batch-rows', type=int, default=5000,
+                        help='Rows per committed batch (default: 5000)')
+    parser.add_argument('--passengers', type=int, default=5000,
+                        help='Distinct passengers drawn from (default: 5000)')
+    return parser.parse_args()
+
+def main():
+    """Main benchmark function"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args()
+
+    # Database configuration
+    db_config = {
+        'host': os.getenv('DATABASE_HOST', 'localhost'),
+        'port': os.getenv('DATABASE_PORT', 5432),
+        'database': os.getenv('DATABASE_NAME', 'creepstate_flights_db'),
+        'user': os.getenv('DATABASE_USER', 'flight_admin'),
+        'password': os.getenv('DATABASE_PASSWORD', 'secure_admin_pass_2024!')
+    }
+
+    benchmark = KeyBenchmark(db_config, rows=args.rows, batch_rows=args.batch_rows,
+                             passengers=args.passengers)
+    try:
+        benchmark.connect_database()
+        benchmark.run()
+        benchmark.print_summary()
+
+    except Exception as e:
+        logger.error(f"Key benchmark failed: {e}")
+        raise
+    finally:
+        benchmark.close_connection()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Research Pipeline Benchmark for Creepstate Investigation Platform
+Runs the daily research stages of auto-research.py and the fact-checking
+stages of fact-checker.py end to end against a cassette of recorded
+DuckDuckGo, Wikipedia, RSS, Reddit and page responses, and reports how long
+each stage takes. Replays are offline and deterministic: every run starts
+from empty stores, known people come from the photo scripts rather than the
+passenger database, and no rate limit applies, since nothing is fetched.
+
+Record a cassette once from the live sources (this takes several minutes,
+as requests are rate limited):
+    python3 scripts/benchmark_pipeline.py --record fixtures/daily.json
+then benchmark against it as often as needed:
+    python3 scripts/benchmark_pipeline.py fixtures/daily.json --runs 5
+"""
+
+import argparse
+import importlib.util
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def _load_module(name: str, path: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class PipelineBenchmark:
+    """Time each research and fact-checking stage over recorded responses"""
+
+    def __init__(self, cassette_path: str, record: bool = False, runs: int = 3):
+        self.cassette_path = cassette_path
+        self.record = record
+        self.runs = 1 if record else runs
+        self.timings: Dict[str, List[float]] = {}
+        self.outcomes: List[Dict[str, Any]] = []
+
+        # Every store lives in a scratch directory, wiped between runs; the
+        # tools read these locations when their modules are imported
+        self.state_dir = tempfile.mkdtemp(prefix='creepstate-benchmark-')
+        os.environ['CREEPSTATE_HTTP_CACHE'] = os.path.join(self.state_dir, 'http')
+        os.environ['CREEPSTATE_ARTICLE_STORE'] = os.path.join(self.state_dir, 'articles.sqlite')
+        os.environ['CREEPSTATE_VERIFICATION_STATE'] = os.path.join(self.state_dir, 'verification.sqlite')
+
+        from http_cache import open_cassette
+        self.cassette = open_cassette(cassette_path, 'record' if record else 'replay')
+        self.auto_research = _load_module('auto_research', os.path.join(REPO_ROOT, 'auto-research.py'))
+        self.fact_checker = _load_module('fact_checker', os.path.join(REPO_ROOT, 'scripts', 'fact-checker.py'))
+
+        # Connection discovery looks up the known people it finds, so recording
+        # and replay need the same people without asking the passenger database
+        from gazetteer import Gazetteer, photo_script_names
+        self.gazetteer = Gazetteer()
+        self.gazetteer.add_all(photo_script_names())
+
+    def _stage(self, name: str, function: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        result = function()
+        self.timings.setdefault(name, []).append(time.perf_counter() - started)
+        return result
+
+    def run_once(self):
+        """Run every stage once from empty stores"""
+        researcher = self.auto_research.AnonymousResearcher()
+        researcher.timeline_path = os.path.join(REPO_ROOT, 'timeline-comprehensive.xml')
+        researcher.gazetteer = self.gazetteer
+        checker = self.fact_checker.FactChecker()
+        researcher.http_cache.cassette = checker.http_cache.cassette = self.cassette
+
+        # Searches name the month they cover; replay the recorded month
+        time_period = None
+        if not self.record:
+            time_period = datetime.fromisoformat(self.cassette.recorded_at).strftime('%Y %B')
+
+        try:
+            verifications = self._stage('research: verify timeline',
+                                        researcher.verify_timeline_dates)
+            distractions = self._stage('research: monitor distractions',
+                                       lambda: researcher.monitor_trump_distractions(time_period))
+            connections = self._stage('research: discover connections',
+                                      researcher.discover_new_connections)
+            snapshot = self._stage('fact-check: source snapshot', checker.take_snapshot)
+            report = self._stage('fact-check: verify claims',
+                                 lambda: checker.generate_verification_report(self.fact_checker.SAMPLE_CLAIMS,
+                                                                              snapshot))
+            breaking = self._stage('fact-check: breaking news', lambda: checker.check_breaking_news(snapshot))
+        finally:
+            researcher.scheduler.close()
+            for store in (researcher.article_store, researcher.verification_state, researcher.http_cache,
+                          checker.article_store, checker.http_cache):
+                store.close()
+            for name in os.listdir(self.state_dir):
+                path = os.path.join(self.state_dir, name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+
+        self.outcomes.append({
+            'timeline verifications': len(verifications),
+            'distraction alerts': len(distractions['alerts']),
+            'new connections': len(connections),
+            'relevant articles': len(snapshot['articles']),
+            'verified claims': report['verified_claims'],
+            'breaking items': len(breaking)
+        })
+
+    def run(self):
+        """Run the pipeline the configured number of times"""
+        try:
+            for _ in range(self.runs):
+                self.run_once()
+        finally:
+            shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def print_summary(self):
+        """Print per-stage timings and what the pipeline produced"""
+        print("=" * 60)
+        print(f"RESEARCH PIPELINE {'RECORDING' if self.record else 'BENCHMARK'}")
+        print("=" * 60)
+        print(f"Cassette: {self.cassette_path}, {len(self.cassette.interactions)} responses "
+              f"({dict(self.cassette.stats)})")
+        print(f"{'stage':<34} {'median':>10} {'min':>10}")
+        for name, seconds in self.timings.items():
+            print(f"{name:<34} {statistics.median(seconds) * 1000:8.1f}ms {min(seconds) * 1000:8.1f}ms")
+        total = [sum(run) for run in zip(*self.timings.values())]
+        print(f"{'total':<34} {statistics.median(total) * 1000:8.1f}ms {min(total) * 1000:8.1f}ms")
+        for name, value in self.outcomes[-1].items():
+            print(f"{name}: {value}")
+        if any(outcome != self.outcomes[0] for outcome in self.outcomes):
+            print("Warning: runs produced different results")
+        print("=" * 60)
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Benchmark the research and fact-checking pipeline '
+                                                 'against recorded responses')
+    parser.add_argument('cassette', help='Cassette file of recorded responses')
+    parser.add_argument('--record', action='store_true',
+                        help='Fetch from the live sources and record them to the cassette')
+    parser.add_argument('--runs', type=int, default=3,
+                        help='Replays to time (default: 3)')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Show the tools\' own logging')
+    return parser.parse_args()
+
+def main():
+    """Main benchmark function"""
+    args = parse_args()
+    if not args.record and not os.path.exists(args.cassette):
+        print(f"No cassette at {args.cassette}; record one first with --record", file=sys.stderr)
+        return 1
+
+    benchmark = PipelineBenchmark(args.cassette, record=args.record, runs=args.runs)
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+    benchmark.run()
+    benchmark.print_summary()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,14 @@
 #!/bin/bash
 
 # Setup automated fact-checking and container updates
-# Runs fact-checker every 4 hours, auto-update daily
+# Runs fact-checker every 4 hours, auto-update and audit log partition maintenance daily
 
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"  # Get current script directory
 
 # Create log directories
 sudo mkdir -p /var/log
-sudo touch /var/log/timeline-updates.log /var/log/fact-checker.log
-sudo chmod 666 /var/log/timeline-updates.log /var/log/fact-checker.log
+sudo touch /var/log/timeline-updates.log /var/log/fact-checker.log /var/log/audit-partitions.log
+sudo chmod 666 /var/log/timeline-updates.log /var/log/fact-checker.log /var/log/audit-partitions.log
 
 # Install cron job for fact-checking (every 4 hours)
 (crontab -l 2>/dev/null; echo "0 */4 * * * $SCRIPT_DIR/fact-checker.py >> /var/log/fact-checker.log 2>&1") | crontab -
@@ -19,11 +19,16 @@ sudo chmod 666 /var/log/timeline-updates.log /var/log/fact-checker.log
 # Install cron job for verification report (twice daily)
 (crontab -l 2>/dev/null; echo "0 8,20 * * * $SCRIPT_DIR/generate-verification-report.sh >> /var/log/timeline-updates.log 2>&1") | crontab -
 
+# Install cron job for audit log partition maintenance (daily at 1 AM)
+(crontab -l 2>/dev/null; echo "0 1 * * * cd $SCRIPT_DIR && python3 maintain_partitions.py >> /var/log/audit-partitions.log 2>&1") | crontab -
+
 echo "Cron jobs installed successfully:"
 echo "- Fact-checking: Every 4 hours"
 echo "- Auto-updates: Daily at 2 AM"
 echo "- Verification reports: 8 AM and 8 PM daily"
+echo "- Audit log partitions: Daily at 1 AM"
 echo ""
 echo "View logs with:"
 echo "  tail -f /var/log/fact-checker.log"
-echo "  tail -f /var/log/timeline-updates.log"
\ No newline at end of file
+echo "  tail -f /var/log/timeline-updates.log"
+echo "  tail -f /var/log/audit-partitions.log"
\ No newline at end of file
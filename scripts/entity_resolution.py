@@ -0,0 +1,685 @@
+#!/usr/bin/env python3
+"""
+Passenger Name Entity Resolution for Creepstate Investigation Platform
+Clusters manifest name variants ("Jeff Epstein", "J Epstein", "Gary Roxbury")
+onto one passenger and records them in flight_data.passenger_aliases
+"""
+
+import argparse
+import logging
+import os
+import re
+import sys
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import psycopg2
+from psycopg2.extras import RealDictCursor, execute_values
+
+from import_csv_data import NAME_MAPPINGS
+
+logger = logging.getLogger(__name__)
+
+# Bump when scoring or clustering rules change; cached decisions from older
+# versions are resolved again
+RESOLVER_VERSION = 1
+
+SOUNDEX_CODES = {
+    letter: digit
+    for letters, digit in (('bfpv', '1'), ('cgjkqsxz', '2'), ('dt', '3'),
+                           ('l', '4'), ('mn', '5'), ('r', '6'))
+    for letter in letters
+}
+
+NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+# Edge kinds, strongest first; edges are applied in this order
+EDGE_PRIORITY = {'mapping': 0, 'held': 0, 'exact': 1, 'fuzzy': 2, 'initials': 3}
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    if not name.isascii():
+        decomposed = unicodedata.normalize('NFKD', name)
+        name = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return NON_ALNUM.sub(' ', name.lower()).strip()
+
+def soundex(word: str) -> str:
+    """American Soundex code of a word (letters only)"""
+    letters = [ch for ch in word if ch.isalpha()]
+    if not letters:
+        return ''
+    code = letters[0].upper()
+    previous = SOUNDEX_CODES.get(letters[0], '')
+    for ch in letters[1:]:
+        digit = SOUNDEX_CODES.get(ch, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if ch not in 'hw':
+            previous = digit
+    return code.ljust(4, '0')
+
+def jaro_winkler(a: str, b: str, prefix_scale: float = 0.1) -> float:
+    """Jaro-Winkler similarity in [0, 1]"""
+    if a == b:
+        return 1.0
+    len_a, len_b = len(a), len(b)
+    if not len_a or not len_b:
+        return 0.0
+
+    window = max(max(len_a, len_b) // 2 - 1, 0)
+    a_matched = [False] * len_a
+    b_matched = [False] * len_b
+    matches = 0
+    for i, ch in enumerate(a):
+        for j in range(max(0, i - window), min(i + window + 1, len_b)):
+            if not b_matched[j] and b[j] == ch:
+                a_matched[i] = b_matched[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+
+    transpositions = 0
+    j = 0
+    for i in range(len_a):
+        if a_matched[i]:
+            while not b_matched[j]:
+                j += 1
+            if a[i] != b[j]:
+                transpositions += 1
+            j += 1
+
+    jaro = (matches / len_a + matches / len_b + (matches - transpositions // 2) / matches) / 3
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+def first_name_similarity(a: str, b: str) -> float:
+    """Compare first names, allowing initials (J/Jeffrey) and short forms (Jeff/Jeffrey)"""
+    if a == b:
+        return 1.0
+    if len(a) == 1 or len(b) == 1:
+        return 0.9 if a[0] == b[0] else 0.0
+    shorter, longer = sorted((a, b), key=len)
+    if len(shorter) >= 3 and longer.startswith(shorter):
+        return 0.95
+    return jaro_winkler(a, b)
+
+def name_similarity(a: List[str], b: List[str]) -> float:
+    """Score two tokenized names, 0.0 when they cannot be the same person
+
+    Only first and last tokens are compared. Single-token names and names
+    ending in an initial carry too little signal and only match exactly.
+    Relatives sharing a surname are kept apart by the first-name floor.
+    """
+    if a == b:
+        return 1.0
+    if len(a) < 2 or len(b) < 2 or len(a[-1]) < 2 or len(b[-1]) < 2:
+        return 0.0
+
+    last_a, last_b = a[-1], b[-1]
+    if min(len(last_a), len(last_b)) / max(len(last_a), len(last_b)) < 0.75:
+        return 0.0
+    last = jaro_winkler(last_a, last_b)
+    first = first_name_similarity(a[0], b[0])
+    if last < 0.88 or first < 0.85:
+        return 0.0
+    return 0.4 * first + 0.6 * last
+
+def initials_of(tokens: List[str]) -> Optional[str]:
+    """Initials spelled by an initials-only name ("A P", "JE"), else None"""
+    if len(tokens) == 2 and all(len(token) == 1 for token in tokens):
+        return ''.join(tokens)
+    if len(tokens) == 1 and len(tokens[0]) == 2 and tokens[0].isalpha():
+        return tokens[0]
+    return None
+
+class NameClusterer:
+    """Blocking, scoring and constrained clustering over distinct spellings
+
+    Surnames are blocked by Soundex code and trigrams and compared once per
+    distinct surname pair; spellings are then only scored against spellings
+    with the same first initial and a similar surname. Oversized blocks are
+    skipped, so work grows roughly linearly with the number of spellings.
+    Accepted pairs are merged strongest-first with union-find; a merge that
+    would join two clusters pinned to different passengers is refused.
+    Call resolve() after all spellings are added.
+    """
+
+    def __init__(self, threshold: float = 0.9, max_block: int = 256, link_initials: bool = False):
+        self.threshold = threshold
+        self.max_block = max_block
+        self.link_initials = link_initials
+
+        self.ids: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.display: List[str] = []
+        self.tokens: List[List[str]] = []
+        self.occurrences: List[Counter] = []  # passenger id -> occurrences of the spelling
+        self.parent: List[int] = []
+        self.size: List[int] = []
+        self.anchor: Dict[int, str] = {}  # cluster root -> pinned passenger id
+        self.evidence: Dict[int, Tuple[str, float]] = {}
+
+        # Blocking indexes
+        self.exact: Dict[str, List[int]] = defaultdict(list)
+        self.surname_ids: Dict[str, int] = {}
+        self.surnames: List[str] = []
+        self.surname_blocks: Dict[str, List[int]] = defaultdict(list)
+        self.similar_surnames: Dict[int, List[Tuple[int, float]]] = {}
+        self.by_surname: Dict[Tuple[int, str], List[int]] = defaultdict(list)
+        self.initials: Dict[str, List[int]] = defaultdict(list)
+
+        self.stats = {'pairs_scored': 0, 'merges': 0, 'refused_merges': 0, 'skipped_blocks': 0}
+
+    def add(self, name: str, passenger_id: Optional[str] = None, occurrences: int = 0) -> int:
+        """Register a spelling (keyed case-insensitively) and return its id"""
+        key = name.strip().lower()
+        node = self.ids.get(key)
+        if node is None:
+            node = len(self.keys)
+            self.ids[key] = node
+            self.keys.append(key)
+            self.display.append(name.strip())
+            tokens = normalize_name(name).split()
+            self.tokens.append(tokens)
+            self.occurrences.append(Counter())
+            self.parent.append(node)
+            self.size.append(1)
+            self._index(node, tokens)
+        if passenger_id is not None:
+            self.occurrences[node][passenger_id] += occurrences
+        return node
+
+    def _index(self, node: int, tokens: List[str]):
+        if not tokens:
+            return
+        self.exact[' '.join(tokens)].append(node)
+        first, last = tokens[0], tokens[-1]
+        if len(tokens) < 2 or len(last) < 2:
+            return
+        self.by_surname[(self._surname_id(last), first[0])].append(node)
+        if len(first) >= 2:
+            self.initials[first[0] + last[0]].append(node)
+
+    def _surname_id(self, surname: str) -> int:
+        surname_id = self.surname_ids.get(surname)
+        if surname_id is None:
+            surname_id = len(self.surnames)
+            self.surname_ids[surname] = surname_id
+            self.surnames.append(surname)
+            for block_key in self._surname_keys(surname):
+                self.surname_blocks[block_key].append(surname_id)
+        return surname_id
+
+    @staticmethod
+    def _surname_keys(surname: str) -> List[str]:
+        padded = f"#{surname}#"
+        return ['p:' + soundex(surname)] + ['t:' + padded[i:i + 3] for i in range(len(padded) - 2)]
+
+    def _similar(self, surname_id: int) -> List[Tuple[int, float]]:
+        """Surnames close enough to pass name_similarity's surname test"""
+        cached = self.similar_surnames.get(surname_id)
+        if cached is not None:
+            return cached
+
+        surname = self.surnames[surname_id]
+        shared = Counter()
+        for block_key in self._surname_keys(surname):
+            members = self.surname_blocks[block_key]
+            if len(members) > self.max_block:
+                self.stats['skipped_blocks'] += 1
+            else:
+                shared.update(members)
+
+        similar = [(surname_id, 1.0)]
+        for other, count in shared.items():
+            if other == surname_id or count < 2:
+                continue
+            candidate = self.surnames[other]
+            if min(len(surname), len(candidate)) / max(len(surname), len(candidate)) < 0.75:
+                continue
+            score = jaro_winkler(surname, candidate)
+            if score >= 0.88:
+                similar.append((other, score))
+        self.similar_surnames[surname_id] = similar
+        return similar
+
+    def find(self, node: int) -> int:
+        root = node
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[node] != root:
+            self.parent[node], node = root, self.parent[node]
+        return root
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge two clusters unless they are pinned to different passengers"""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return True
+        anchor_a, anchor_b = self.anchor.get(root_a), self.anchor.get(root_b)
+        if anchor_a and anchor_b and anchor_a != anchor_b:
+            self.stats['refused_merges'] += 1
+            return False
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        anchor = anchor_a or anchor_b
+        self.anchor.pop(root_b, None)
+        if anchor:
+            self.anchor[root_a] = anchor
+        self.stats['merges'] += 1
+        return True
+
+    def pin(self, node: int, passenger_id: str) -> bool:
+        """Fix the passenger a spelling's cluster resolves to"""
+        root = self.find(node)
+        if self.anchor.get(root, passenger_id) != passenger_id:
+            return False
+        self.anchor[root] = passenger_id
+        return True
+
+    def link(self, a: int, b: int, kind: str, score: float = 1.0) -> bool:
+        """Merge two spellings, recording the evidence for matched pairs"""
+        if a == b or not self.union(a, b):
+            return False
+        if kind in ('exact', 'fuzzy', 'initials'):
+            for node in (a, b):
+                self.evidence.setdefault(node, (kind, score))
+        return True
+
+    def _candidate_edges(self, node: int, new_nodes: Set[int]) -> List[Tuple[str, float, int, int]]:
+        tokens = self.tokens[node]
+        if not tokens:
+            return []
+        edges = [('exact', 1.0, node, other) for other in self.exact[' '.join(tokens)] if other != node]
+
+        first, last = tokens[0], tokens[-1]
+        if len(tokens) >= 2 and len(last) >= 2:
+            for surname_id, last_score in self._similar(self.surname_ids[last]):
+                bucket = self.by_surname[(surname_id, first[0])]
+                if len(bucket) > self.max_block:
+                    self.stats['skipped_blocks'] += 1
+                    continue
+                for other in bucket:
+                    # Pairs of new spellings are scored once, from the lower id
+                    if other == node or (other in new_nodes and other < node):
+                        continue
+                    self.stats['pairs_scored'] += 1
+                    first_score = first_name_similarity(first, self.tokens[other][0])
+                    if first_score < 0.85:
+                        continue
+                    score = 0.4 * first_score + 0.6 * last_score
+                    if score >= 1.0:
+                        edges.append(('exact', 1.0, node, other))
+                    elif score >= self.threshold:
+                        edges.append(('fuzzy', score, node, other))
+
+        letters = initials_of(tokens)
+        if self.link_initials and letters and self.find(node) not in self.anchor:
+            edges.extend(self._initials_edges(node, letters))
+        return edges
+
+    def _initials_edges(self, node: int, letters: str) -> List[Tuple[str, float, int, int]]:
+        """Link "A P" to a full name only when one name dominates those initials"""
+        members = self.initials.get(letters, [])
+        if not members or len(members) > self.max_block:
+            return []
+        weights = {member: sum(self.occurrences[member].values()) for member in members}
+        best = max(weights, key=weights.get)
+        total = sum(weights.values())
+        if total and weights[best] >= 0.9 * total and weights[best] >= 2:
+            return [('initials', 0.0, node, best)]
+        return []
+
+    def resolve(self, new_nodes: Iterable[int]) -> int:
+        """Score new spellings against the index and merge accepted pairs
+
+        Returns the number of edges accepted.
+        """
+        new_nodes = set(new_nodes)
+        self.similar_surnames.clear()
+        edges = []
+        for node in new_nodes:
+            edges.extend(self._candidate_edges(node, new_nodes))
+
+        edges.sort(key=lambda edge: (EDGE_PRIORITY[edge[0]], -edge[1]))
+        return sum(1 for kind, score, a, b in edges if self.link(a, b, kind, score))
+
+    def clusters(self, nodes: Iterable[int]) -> Dict[int, List[int]]:
+        """Members of every cluster containing one of nodes, keyed by root"""
+        roots = {self.find(node) for node in nodes}
+        members = defaultdict(list)
+        for node in range(len(self.keys)):
+            root = self.find(node)
+            if root in roots:
+                members[root].append(node)
+        return members
+
+class PassengerEntityResolver:
+    """Resolve manifest spellings in the database and write passenger aliases"""
+
+    def __init__(self, db_config: Dict[str, str], threshold: float = 0.9, max_block: int = 256,
+                 link_initials: bool = False):
+        self.db_config = db_config
+        self.connection = None
+        self.cursor = None
+        self.clusterer = NameClusterer(threshold, max_block, link_initials)
+
+        self.passenger_names: Dict[str, str] = {}
+        self.passenger_nodes: Dict[str, int] = {}
+        self.alias_keys: Dict[str, Set[str]] = defaultdict(set)
+        self.cached: Set[str] = set()
+
+        self.stats = {
+            'spellings_loaded': 0,
+            'spellings_resolved': 0,
+            'spellings_cached': 0,
+            'clusters_merged': 0,
+            'aliases_created': 0,
+            'errors': 0
+        }
+
+    def connect_database(self):
+        """Establish database connection"""
+        try:
+            self.connection = psycopg2.connect(**self.db_config)
+            self.cursor = self.connection.cursor(cursor_factory=RealDictCursor)
+            logger.info("Connected to database successfully")
+        except Exception as e:
+            logger.error(f"Failed to connect to database: {e}")
+            raise
+
+    def load_names(self, use_cache: bool = True):
+        """Load passengers, manifest spellings, aliases and cached decisions"""
+        clusterer = self.clusterer
+
+        self.cursor.execute("SELECT id, full_name FROM flight_data.passengers")
+        for row in self.cursor.fetchall():
+            passenger_id = str(row['id'])
+            self.passenger_names[passenger_id] = row['full_name']
+            self.passenger_nodes[passenger_id] = clusterer.add(row['full_name'], passenger_id)
+
+        # Spellings already attached to a passenger belong with its full name
+        self.cursor.execute("""
+            SELECT passenger_id, name_in_manifest, COUNT(*) AS occurrences
+            FROM flight_data.flight_passengers
+            WHERE passenger_id IS NOT NULL AND COALESCE(TRIM(name_in_manifest), '') <> ''
+            GROUP BY passenger_id, name_in_manifest
+        """)
+        for row in self.cursor.fetchall():
+            passenger_id = str(row['passenger_id'])
+            node = clusterer.add(row['name_in_manifest'], passenger_id, row['occurrences'])
+            clusterer.link(node, self.passenger_nodes[passenger_id], 'held')
+
+        # Curated aliases are fixed decisions
+        self.cursor.execute("SELECT passenger_id, alias FROM flight_data.passenger_aliases")
+        for row in self.cursor.fetchall():
+            passenger_id = str(row['passenger_id'])
+            self.alias_keys[passenger_id].add(row['alias'].strip().lower())
+            self._pin(row['alias'], passenger_id, 'held')
+
+        # Hard-coded import mappings, for canonical names that are passengers
+        for alias, canonical in NAME_MAPPINGS.items():
+            target = clusterer.ids.get(canonical.lower())
+            if target is not None and alias != canonical.lower():
+                clusterer.link(clusterer.add(alias), target, 'mapping')
+                clusterer.evidence[clusterer.ids[alias]] = ('mapping', 1.0)
+
+        if use_cache:
+            self.cursor.execute("""
+                SELECT name_key, passenger_id
+                FROM flight_data.name_resolution_cache
+                WHERE resolver_version = %s
+            """, (RESOLVER_VERSION,))
+            for row in self.cursor.fetchall():
+                if row['name_key'] not in clusterer.ids:
+                    continue
+                self.cached.add(row['name_key'])
+                if row['passenger_id'] is not None:
+                    self._pin(row['name_key'], str(row['passenger_id']), 'cached')
+
+        self.stats['spellings_loaded'] = len(clusterer.keys)
+        self.stats['spellings_cached'] = len(self.cached)
+        logger.info(f"Loaded {len(clusterer.keys)} spellings for {len(self.passenger_names)} passengers "
+                    f"({len(self.cached)} cached decisions)")
+
+    def _pin(self, name: str, passenger_id: str, kind: str):
+        clusterer = self.clusterer
+        node = clusterer.add(name, passenger_id)
+        if passenger_id in self.passenger_nodes:
+            clusterer.link(node, self.passenger_nodes[passenger_id], kind)
+        if not clusterer.pin(node, passenger_id):
+            logger.warning(f"Conflicting resolution for '{name}', keeping the earlier passenger")
+
+    def resolve(self) -> List[Dict]:
+        """Cluster uncached spellings and return one decision per spelling"""
+        clusterer = self.clusterer
+        new_nodes = [node for node, key in enumerate(clusterer.keys) if key not in self.cached]
+        self.stats['spellings_resolved'] = len(new_nodes)
+        if not new_nodes:
+            logger.info("No new spellings to resolve")
+            return []
+
+        clusterer.resolve(new_nodes)
+
+        decisions = []
+        for root, members in clusterer.clusters(new_nodes).items():
+            anchor = clusterer.anchor.get(root) or self._choose_anchor(members)
+            held_by = {passenger for member in members for passenger in clusterer.occurrences[member]}
+            if len(held_by - {anchor}) > 0:
+                self.stats['clusters_merged'] += 1
+
+            for member in members:
+                key = clusterer.keys[member]
+                if key in self.cached:
+                    continue
+                decisions.append(self._decide(member, anchor, len(members)))
+        return decisions
+
+    def _choose_anchor(self, members: List[int]) -> Optional[str]:
+        """Pick the passenger holding most manifest occurrences in a cluster"""
+        totals = Counter()
+        for member in members:
+            totals.update(self.clusterer.occurrences[member])
+        if not totals:
+            return None
+        return max(totals, key=lambda passenger: (totals[passenger],
+                                                  len(self.passenger_names.get(passenger, ''))))
+
+    def _decide(self, node: int, anchor: Optional[str], cluster_size: int) -> Dict:
+        clusterer = self.clusterer
+        key = clusterer.keys[node]
+        decision = {
+            'name_key': key,
+            'alias': clusterer.display[node],
+            'passenger_id': anchor,
+            'similarity': None,
+            'kind': None
+        }
+
+        if anchor is None or cluster_size == 1:
+            decision['decision'] = 'distinct'
+            return decision
+        if node == self.passenger_nodes.get(anchor):
+            decision['decision'] = 'canonical'
+            return decision
+
+        kind, score = self._evidence(node, anchor)
+        canonical = clusterer.tokens[self.passenger_nodes[anchor]]
+        decision.update({
+            'decision': 'alias',
+            'similarity': round(score, 3),
+            'kind': kind,
+            'alias_type': self._alias_type(clusterer.tokens[node], canonical),
+            'confidence_level': self._confidence_level(kind, score)
+        })
+        return decision
+
+    def _evidence(self, node: int, anchor: str) -> Tuple[str, float]:
+        """How a spelling ties to the anchor passenger's own name"""
+        clusterer = self.clusterer
+        if anchor in clusterer.occurrences[node]:
+            return 'held', 1.0
+        recorded = clusterer.evidence.get(node)
+        if recorded and recorded[0] == 'mapping':
+            return recorded
+        direct = name_similarity(clusterer.tokens[node], clusterer.tokens[self.passenger_nodes[anchor]])
+        if direct == 1.0:
+            return 'exact', 1.0
+        if direct >= clusterer.threshold:
+            return 'fuzzy', direct
+        # Joined through another variant rather than matching directly
+        if recorded and recorded[0] == 'initials':
+            return recorded
+        return 'fuzzy', clusterer.threshold
+
+    @staticmethod
+    def _alias_type(tokens: List[str], canonical: List[str]) -> str:
+        if initials_of(tokens):
+            return 'initials'
+        if tokens and canonical and tokens[0] != canonical[0]:
+            if len(tokens[0]) == 1:
+                return 'abbreviated'
+            if canonical[0].startswith(tokens[0]):
+                return 'nickname'
+        return 'variant'
+
+    def _confidence_level(self, kind: str, score: float) -> int:
+        """Map evidence to passenger_aliases.confidence_level (1-10)"""
+        if kind in ('mapping', 'held', 'exact'):
+            return 10
+        if kind == 'initials':
+            return 3
+        threshold = self.clusterer.threshold
+        span = (score - threshold) / (1 - threshold) if threshold < 1 else 1.0
+        return max(5, min(9, 5 + round(4 * span)))
+
+    def new_aliases(self, decisions: List[Dict]) -> List[Dict]:
+        """Alias decisions not yet recorded for their passenger"""
+        return [d for d in decisions
+                if d['decision'] == 'alias' and d['name_key'] not in self.alias_keys[d['passenger_id']]]
+
+    def write_decisions(self, decisions: List[Dict]):
+        """Insert new aliases and cache every decision in one transaction"""
+        aliases = [
+            (d['passenger_id'], d['alias'], d['alias_type'], d['confidence_level'],
+             'name_mappings' if d['kind'] == 'mapping' else 'entity_resolution', d['kind'] == 'mapping')
+            for d in self.new_aliases(decisions)
+        ]
+        try:
+            if aliases:
+                execute_values(self.cursor, """
+                    INSERT INTO flight_data.passenger_aliases
+                        (passenger_id, alias, alias_type, confidence_level, source, verified)
+                    SELECT v.passenger_id::uuid, v.alias, v.alias_type, v.confidence_level, v.source, v.verified
+                    FROM (VALUES %s) AS v(passenger_id, alias, alias_type, confidence_level, source, verified)
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM flight_data.passenger_aliases a
+                        WHERE a.passenger_id = v.passenger_id::uuid AND LOWER(a.alias) = LOWER(v.alias)
+                    )
+                """, aliases, page_size=1000)
+                self.stats['aliases_created'] = self.cursor.rowcount
+
+            execute_values(self.cursor, """
+                INSERT INTO flight_data.name_resolution_cache
+                    (name_key, passenger_id, decision, similarity, resolver_version)
+                VALUES %s
+                ON CONFLICT (name_key) DO UPDATE SET
+                    passenger_id = EXCLUDED.passenger_id,
+                    decision = EXCLUDED.decision,
+                    similarity = EXCLUDED.similarity,
+                    resolver_version = EXCLUDED.resolver_version,
+                    decided_at = NOW()
+            """, [(d['name_key'], d['passenger_id'], d['decision'], d['similarity'], RESOLVER_VERSION)
+                  for d in decisions], page_size=1000)
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            logger.error(f"Failed to write resolution decisions: {e}")
+            self.stats['errors'] += 1
+            raise
+
+    def print_decisions(self, decisions: List[Dict]):
+        """Print proposed aliases (dry run)"""
+        for d in sorted(self.new_aliases(decisions),
+                        key=lambda d: (self.passenger_names[d['passenger_id']], d['alias'])):
+            print(f"{d['alias']:<30} -> {self.passenger_names[d['passenger_id']]:<30} "
+                  f"{d['alias_type']:<12} confidence {d['confidence_level']:>2} ({d['kind']} {d['similarity']:.3f})")
+
+    def print_summary(self):
+        """Print resolution statistics"""
+        logger.info("="*50)
+        logger.info("ENTITY RESOLUTION SUMMARY")
+        logger.info("="*50)
+        logger.info(f"Spellings Loaded: {self.stats['spellings_loaded']} "
+                    f"(cached: {self.stats['spellings_cached']}, resolved: {self.stats['spellings_resolved']})")
+        logger.info(f"Pairs Scored: {self.clusterer.stats['pairs_scored']}")
+        logger.info(f"Clusters Spanning Several Passengers: {self.stats['clusters_merged']}")
+        logger.info(f"Refused Merges (pinned elsewhere): {self.clusterer.stats['refused_merges']}")
+        logger.info(f"Aliases Created: {self.stats['aliases_created']}")
+        logger.info(f"Errors Encountered: {self.stats['errors']}")
+        logger.info("="*50)
+
+    def close_connection(self):
+        """Close database connection"""
+        if self.cursor:
+            self.cursor.close()
+        if self.connection:
+            self.connection.close()
+        logger.info("Database connection closed")
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description='Resolve passenger name variants into aliases')
+    parser.add_argument('--threshold', type=float, default=0.9,
+                        help='Minimum similarity for a fuzzy match (default: 0.9)')
+    parser.add_argument('--max-block', type=int, default=256,
+                        help='Skip candidate blocks larger than this (default: 256)')
+    parser.add_argument('--link-initials', action='store_true',
+                        help='Also link initials-only names ("A P") to a dominant full name')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore cached decisions and resolve every spelling again')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Print proposed aliases without writing anything')
+    return parser.parse_args()
+
+def main():
+    """Main resolution function"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args()
+
+    db_config = {
+        'host': os.getenv('DATABASE_HOST', 'localhost'),
+        'port': os.getenv('DATABASE_PORT', 5432),
+        'database': os.getenv('DATABASE_NAME', 'creepstate_flights_db'),
+        'user': os.getenv('DATABASE_USER', 'flight_admin'),
+        'password': os.getenv('DATABASE_PASSWORD', 'secure_admin_pass_2024!')
+    }
+
+    resolver = PassengerEntityResolver(db_config, args.threshold, args.max_block, args.link_initials)
+    try:
+        resolver.connect_database()
+        resolver.load_names(use_cache=not args.full)
+        decisions = resolver.resolve()
+        if args.dry_run:
+            resolver.print_decisions(decisions)
+        elif decisions:
+            resolver.write_decisions(decisions)
+        resolver.print_summary()
+    except Exception as e:
+        logger.error(f"Entity resolution failed: {e}")
+        sys.exit(1)
+    finally:
+        resolver.close_connection()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Known-Person Gazetteer for Creepstate Research Tools
+Every passenger and alias in flight_data, plus the people listed in the
+photo download scripts, compiled into a trie over name tokens. A document
+is tokenized once and each position is walked down the trie, taking the
+longest name that starts there, so every known person in it is found in a
+single pass however many names there are. Co-mentions of known people are
+emitted in batches for connection discovery. The names last read from the
+database are kept on disk for runs where it cannot be reached.
+
+    python3 scripts/gazetteer.py "Prince Andrew met Jeff Epstein in 2001"
+"""
+
+import argparse
+import ast
+import glob
+import itertools
+import json
+import logging
+import os
+import re
+import time
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+DEFAULT_CACHE_PATH = os.getenv('CREEPSTATE_GAZETTEER',
+                               os.path.join(os.path.expanduser('~'), '.local', 'share', 'creepstate',
+                                            'gazetteer.json'))
+
+# Photo scripts whose {'name': ..., 'aliases': [...]} entries list known people
+PHOTO_SCRIPTS = ('download-*.py', 'create-missing-photo-placeholders.py')
+
+# Single words (manifest entries such as "Larry" or "Staff", surnames alone)
+# and initials ("JE", "GM") collide with ordinary words and acronyms in news
+# text, so names need at least two words and this many characters
+MIN_NAME_TOKENS = 2
+MIN_NAME_CHARS = 4
+
+NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+# Key of the entity a trie node completes; name tokens are never empty
+END = ''
+
+def name_tokens(text: str) -> List[str]:
+    """Tokens of a name or document, normalized as entity_resolution.normalize_name does"""
+    if not text.isascii():
+        decomposed = unicodedata.normalize('NFKD', text)
+        text = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return NON_ALNUM.sub(' ', text.lower()).split()
+
+def database_config() -> Dict[str, Any]:
+    """Connection settings from the DATABASE_* environment variables"""
+    return {
+        'host': os.getenv('DATABASE_HOST', 'localhost'),
+        'port': os.getenv('DATABASE_PORT', 5432),
+        'database': os.getenv('DATABASE_NAME', 'creepstate_flights_db'),
+        'user': os.getenv('DATABASE_USER', 'flight_admin'),
+        'password': os.getenv('DATABASE_PASSWORD', 'secure_admin_pass_2024!')
+    }
+
+def database_names(db_config: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(passenger, name) for every passenger's full name and non-initials alias"""
+    import psycopg2
+
+    connection = psycopg2.connect(connect_timeout=10, **db_config)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT full_name, full_name FROM flight_data.passengers
+                UNION ALL
+                SELECT p.full_name, a.alias
+                FROM flight_data.passenger_aliases a
+                JOIN flight_data.passengers p ON p.id = a.passenger_id
+                WHERE a.alias_type IS DISTINCT FROM 'initials'
+            """)
+            return [(entity, name) for entity, name in cursor.fetchall() if entity and name]
+    finally:
+        connection.close()
+
+def photo_script_names(root: str = REPO_ROOT) -> List[Tuple[str, str]]:
+    """(person, name) for every person and alias listed in the photo scripts
+
+    The scripts are read with ast rather than imported, as importing them
+    would need their image dependencies and some do not parse.
+    """
+    names = []
+    paths = sorted({path for pattern in PHOTO_SCRIPTS for path in glob.glob(os.path.join(root, pattern))})
+    for path in paths:
+        try:
+            with open(path, encoding='utf-8') as f:
+                tree = ast.parse(f.read(), path)
+        except (OSError, SyntaxError) as e:
+            logger.warning(f"Skipping people list in {os.path.basename(path)}: {e}")
+            continue
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Dict):
+                continue
+            fields = {key.value: value for key, value in zip(node.keys, node.values)
+                      if isinstance(key, ast.Constant)}
+            person = fields.get('name')
+            if not (isinstance(person, ast.Constant) and isinstance(person.value, str)):
+                continue
+            names.append((person.value, person.value))
+            aliases = fields.get('aliases')
+            if isinstance(aliases, (ast.List, ast.Tuple)):
+                names.extend((person.value, alias.value) for alias in aliases.elts
+                             if isinstance(alias, ast.Constant) and isinstance(alias.value, str))
+    return names
+
+class Gazetteer:
+    """Token trie of known people's names and aliases
+
+    An entity is a person's canonical name. A name shared by two people
+    keeps the first person it was added for.
+    """
+
+    def __init__(self):
+        self.trie: Dict[str, Any] = {}
+        self.entities: Dict[str, str] = {}  # normalized canonical name -> canonical name
+        self.names = 0
+        self.ambiguous = 0
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def add(self, entity: str, name: str) -> bool:
+        """Add a name for an entity; False when it is too short or already taken"""
+        tokens = name_tokens(name)
+        if len(tokens) < MIN_NAME_TOKENS or len(' '.join(tokens)) < MIN_NAME_CHARS:
+            return False
+        entity = self.entities.setdefault(' '.join(name_tokens(entity)), entity)
+
+        node = self.trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        if END in node:
+            if node[END] != entity:
+                self.ambiguous += 1
+            return False
+        node[END] = entity
+        self.names += 1
+        return True
+
+    def add_all(self, names: Iterable[Tuple[str, str]]) -> int:
+        return sum(self.add(entity, name) for entity, name in names)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[str, int, int]]:
+        """(entity, first token, token after the last) for every known name in the text
+
+        Matches are leftmost-longest and never overlap, so "Alexander
+        Acosta" is not also read as a mention of anyone named "Alexander".
+        """
+        tokens = name_tokens(text)
+        trie = self.trie
+        position = 0
+        while position < len(tokens):
+            node = trie.get(tokens[position])
+            match = None
+            end = position + 1
+            while node is not None:
+                if END in node:
+                    match = (node[END], position, end)
+                if end == len(tokens):
+                    break
+                node = node.get(tokens[end])
+                end += 1
+            if match:
+                yield match
+                position = match[2]
+            else:
+                position += 1
+
+    def find(self, text: str) -> Counter:
+        """Mentions of each known entity in the text"""
+        return Counter(entity for entity, _, _ in self.iter_matches(text))
+
+    @staticmethod
+    def co_mentions(mentions: Iterable[Tuple[Any, Iterable[str]]],
+                    batch_size: int = 500) -> Iterator[List[Tuple[str, str, Any]]]:
+        """Batches of (entity, entity, document key) for each pair mentioned together
+
+        mentions are (document key, entities found in it) pairs, as from
+        find; each pair of entities is reported once per document, in
+        sorted order.
+        """
+        batch: List[Tuple[str, str, Any]] = []
+        for key, entities in mentions:
+            for first, second in itertools.combinations(sorted(set(entities)), 2):
+                batch.append((first, second, key))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+def load_gazetteer(db_config: Optional[Dict[str, Any]] = None, cache_path: str = DEFAULT_CACHE_PATH,
+                   root: str = REPO_ROOT) -> Gazetteer:
+    """Gazetteer of the database's passengers and the photo scripts' people
+
+    Names read from the database are saved to cache_path; when the
+    database cannot be reached, the last saved names are used instead.
+    """
+    try:
+        db_names = database_names(db_config or database_config())
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({'saved_at': time.time(), 'names': db_names}, f)
+        os.replace(temp_path, cache_path)
+    except Exception as e:
+        db_names = []
+        if os.path.exists(cache_path):
+            with open(cache_path) as f:
+                db_names = [tuple(pair) for pair in json.load(f)['names']]
+            logger.warning(f"Passenger database unavailable ({e}); using {len(db_names)} saved names")
+        else:
+            logger.warning(f"Passenger database unavailable ({e}); using the photo scripts' people only")
+
+    gazetteer = Gazetteer()
+    gazetteer.add_all(db_names)
+    gazetteer.add_all(photo_script_names(root))
+    logger.info(f"Gazetteer: {len(gazetteer)} people, {gazetteer.names} names "
+                f"({gazetteer.ambiguous} shared names skipped)")
+    return gazetteer
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Find known people mentioned in text')
+    parser.add_argument('text', nargs='*',
+                        help='Text to scan (default: list the gazetteer\'s people)')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH,
+                        help=f'Saved database names (default: {DEFAULT_CACHE_PATH})')
+    return parser.parse_args()
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args()
+    gazetteer = load_gazetteer(cache_path=args.cache)
+    if not args.text:
+        for entity in sorted(gazetteer.entities.values()):
+            print(entity)
+        return
+    for entity, mentions in gazetteer.find(' '.join(args.text)).most_common():
+        print(f"{mentions:4d}  {entity}")
+
+if __name__ == "__main__":
+    main()
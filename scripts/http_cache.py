@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP Cache for Creepstate Research Tools
+On-disk cache shared by auto-research.py and fact-checker.py. Bodies are kept
+with their ETag/Last-Modified validators; once a per-source freshness TTL has
+passed the next request is conditional, so unchanged sources answer 304
+instead of resending the payload. Least recently used entries are evicted
+when the cache grows past its size cap.
+
+A cassette records every response served to a JSON file, or replays one
+offline without touching the cache or the network, so the research tools
+can be run and benchmarked deterministically. Set CREEPSTATE_CASSETTE to
+the file and CREEPSTATE_CASSETTE_MODE to 'record' or 'replay'.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv('CREEPSTATE_HTTP_CACHE',
+                              os.path.join(os.path.expanduser('~'), '.cache', 'creepstate', 'http'))
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL = 3600
+DEFAULT_CASSETTE = os.getenv('CREEPSTATE_CASSETTE')
+DEFAULT_CASSETTE_MODE = os.getenv('CREEPSTATE_CASSETTE_MODE', 'replay')
+
+# Response headers kept with a cached body. Bodies are stored as requests and
+# aiohttp return them, already decoded, so Content-Encoding is not kept
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+def prepare_url(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """The full URL a GET with these query parameters requests"""
+    return requests.Request('GET', url, params=params).prepare().url
+
+class CachedResponse:
+    """The parts of a requests.Response the research tools use"""
+
+    def __init__(self, url: str, status_code: int, content: bytes, headers: Dict[str, str],
+                 cache_status: str):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.cache_status = cache_status  # 'fresh', 'revalidated', 'downloaded', 'stale' or 'uncached'
+
+    @property
+    def text(self) -> str:
+        content_type = self.headers.get('Content-Type', '')
+        charset = 'utf-8'
+        if 'charset=' in content_type:
+            charset = content_type.split('charset=', 1)[1].split(';')[0].strip() or charset
+        return self.content.decode(charset, errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error for {self.url}")
+
+class CassetteMiss(requests.ConnectionError):
+    """A replayed cassette has no response for the requested URL"""
+
+class Cassette:
+    """Responses keyed by URL, recorded to or replayed from a JSON file
+
+    In 'record' mode every response the cache serves is written to the
+    file as it arrives. In 'replay' mode the file is the only source of
+    responses; URLs missing from it fail like an unreachable host.
+    """
+
+    def __init__(self, path: str, mode: str = 'replay'):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Cassette mode must be 'record' or 'replay', not {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.recorded_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self.interactions: Dict[str, Dict[str, Any]] = {}
+        self.stats = Counter()
+        if mode == 'replay' or os.path.exists(path):
+            with open(path, encoding='utf-8') as handle:
+                data = json.load(handle)
+            self.recorded_at = data.get('recorded_at', self.recorded_at)
+            self.interactions = {item['url']: item for item in data['interactions']}
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+
+    def play(self, url: str) -> CachedResponse:
+        """The recorded response for a URL"""
+        item = self.interactions.get(url)
+        if item is None:
+            self.stats['missed'] += 1
+            raise CassetteMiss(f"No recorded response for {url} in {self.path}")
+        self.stats['replayed'] += 1
+        body = (base64.b64decode(item['body_base64']) if 'body_base64' in item
+                else item['body'].encode('utf-8'))
+        return CachedResponse(url, item['status_code'], body, item['headers'], 'replayed')
+
+    def record(self, response: CachedResponse) -> CachedResponse:
+        """Add a response to the cassette file and pass it through"""
+        item = {'url': response.url, 'status_code': response.status_code,
+                'headers': {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}}
+        try:
+            item['body'] = response.content.decode('utf-8')
+        except UnicodeDecodeError:
+            item['body_base64'] = base64.b64encode(response.content).decode('ascii')
+        self.interactions[response.url] = item
+        self.stats['recorded'] += 1
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as handle:
+            json.dump({'recorded_at': self.recorded_at, 'interactions': list(self.interactions.values())},
+                      handle, indent=1)
+        os.replace(temp_path, self.path)
+        return response
+
+_cassettes: Dict[str, Cassette] = {}
+
+def open_cassette(path: str, mode: str = 'replay') -> Cassette:
+    """The process-wide Cassette for a file, so every cache records into one copy"""
+    key = os.path.abspath(path)
+    if key not in _cassettes or _cassettes[key].mode != mode:
+        _cassettes[key] = Cassette(path, mode)
+    return _cassettes[key]
+
+class HTTPCache:
+    """Conditional-GET cache with per-source TTLs and LRU eviction
+
+    ttls maps a URL prefix (or bare hostname) to a freshness lifetime in
+    seconds; the longest matching prefix wins and default_ttl applies
+    otherwise. Within its TTL an entry is served without any request. A
+    source that fails while a cached copy exists is served stale. With a
+    replaying cassette every response comes from the cassette instead.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 default_ttl: int = DEFAULT_TTL, ttls: Optional[Dict[str, int]] = None,
+                 session: Optional[requests.Session] = None, cassette: Optional[Cassette] = None):
+        if cassette is None and DEFAULT_CASSETTE:
+            cassette = open_cassette(DEFAULT_CASSETTE, DEFAULT_CASSETTE_MODE)
+        self.cassette = cassette
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.session = session or requests.Session()
+        self.stats = Counter()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite'), timeout=30)
+        self.index.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                headers TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.index.execute("CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access)")
+        self.index.commit()
+
+    def ttl_for(self, url: str) -> int:
+        """Freshness lifetime of a URL from the longest matching ttls prefix"""
+        host_path = url.split('://', 1)[-1]
+        best, best_len = self.default_ttl, -1
+        for prefix, ttl in self.ttls.items():
+            if (url.startswith(prefix) or host_path.startswith(prefix)) and len(prefix) > best_len:
+                best, best_len = ttl, len(prefix)
+        return best
+
+    @staticmethod
+    def cache_key(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Index row and body of a cached entry, or None"""
+        row = self.index.execute("""
+            SELECT url, headers, etag, last_modified, expires_at FROM entries WHERE key = ?
+        """, (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            with open(self._body_path(key), 'rb') as handle:
+                body = handle.read()
+        except OSError:
+            self.index.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.index.commit()
+            return None
+        return {'url': row[0], 'headers': json.loads(row[1]), 'etag': row[2],
+                'last_modified': row[3], 'expires_at': row[4], 'body': body}
+
+    def _validators(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Conditional request headers for a cached entry"""
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def _touch(self, key: str, expires_at: Optional[float] = None):
+        now = time.time()
+        if expires_at is None:
+            self.index.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+        else:
+            self.index.execute("UPDATE entries SET last_access = ?, fetched_at = ?, expires_at = ? WHERE key = ?",
+                               (now, now, expires_at, key))
+        self.index.commit()
+
+    def _store(self, key: str, url: str, headers: requests.structures.CaseInsensitiveDict,
+               body: bytes, ttl: int):
+        """Write a body and its validators, then evict down to the size cap"""
+        path = self._body_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as handle:
+            handle.write(body)
+        os.replace(temp_path, path)
+
+        now = time.time()
+        kept = {name: headers[name] for name in STORED_HEADERS if name in headers}
+        self.index.execute("""
+            INSERT OR REPLACE INTO entries
+            (key, url, headers, etag, last_modified, size, fetched_at, expires_at, last_access)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (key, url, json.dumps(kept), kept.get('ETag'), kept.get('Last-Modified'),
+              len(body), now, now + ttl, now))
+        self.index.commit()
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits max_bytes"""
+        total = self.index.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.index.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+            self.index.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            self.stats['evicted'] += 1
+        self.index.commit()
+
+    def _finish(self, key: str, url: str, entry: Optional[Dict[str, Any]], status: int,
+                headers: Dict[str, str], body: bytes, ttl: int) -> CachedResponse:
+        """Turn a network answer into a response, updating the cache"""
+        headers = requests.structures.CaseInsensitiveDict(headers)
+        if status == 304 and entry:
+            self._touch(key, time.time() + ttl)
+            self.stats['revalidated'] += 1
+            return CachedResponse(url, 200, entry['body'], entry['headers'], 'revalidated')
+
+        if status == 200 and 'no-store' not in headers.get('Cache-Control', ''):
+            self._store(key, url, headers, body, ttl)
+            self.stats['downloaded'] += 1
+            return CachedResponse(url, status, body, headers, 'downloaded')
+
+        self.stats['uncached'] += 1
+        return CachedResponse(url, status, body, headers, 'uncached')
+
+    def _serve_cached(self, key: str, entry: Optional[Dict[str, Any]]) -> Optional[CachedResponse]:
+        """The cached copy if it is still fresh"""
+        if entry and entry['expires_at'] > time.time():
+            self._touch(key)
+            self.stats['fresh'] += 1
+            return CachedResponse(entry['url'], 200, entry['body'], entry['headers'], 'fresh')
+        return None
+
+    def fresh(self, url: str) -> Optional[CachedResponse]:
+        """The cached response for a full URL if it can be served without a request
+
+        While a cassette replays, that is always the case: the response is
+        the recorded one, and a URL missing from the cassette raises.
+        """
+        if self.cassette and self.cassette.replaying:
+            return self.cassette.play(url)
+        key = self.cache_key(url)
+        cached = self._serve_cached(key, self._lookup(key))
+        return self.cassette.record(cached) if self.cassette and cached else cached
+
+    def _serve_stale(self, key: str, entry: Optional[Dict[str, Any]], error: Exception) -> CachedResponse:
+        """The expired copy when the source cannot be reached, else re-raise"""
+        if entry is None:
+            raise error
+        logger.warning(f"Serving stale cache for {entry['url']}: {error}")
+        self._touch(key)
+        self.stats['stale'] += 1
+        return CachedResponse(entry['url'], 200, entry['body'], entry['headers'], 'stale')
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+            ttl: Optional[int] = None, **kwargs) -> CachedResponse:
+        """GET through the cache with requests; kwargs go to Session.get"""
+        url = prepare_url(url, params)
+        if self.cassette and self.cassette.replaying:
+            return self.cassette.play(url)
+        response = self._get(url, headers, ttl, **kwargs)
+        return self.cassette.record(response) if self.cassette else response
+
+    def _get(self, url: str, headers: Optional[Dict[str, str]], ttl: Optional[int], **kwargs) -> CachedResponse:
+        key = self.cache_key(url)
+        ttl = self.ttl_for(url) if ttl is None else ttl
+        entry = self._lookup(key)
+
+        cached = self._serve_cached(key, entry)
+        if cached:
+            return cached
+
+        try:
+            response = self.session.get(url, headers={**(headers or {}), **self._validators(entry)}, **kwargs)
+        except requests.RequestException as e:
+            return self._serve_stale(key, entry, e)
+        if response.status_code >= 500 and entry:
+            return self._serve_stale(key, entry, requests.HTTPError(f"{response.status_code} error"))
+        return self._finish(key, url, entry, response.status_code, dict(response.headers),
+                            response.content, ttl)
+
+    async def aget(self, session, url: str, headers: Optional[Dict[str, str]] = None,
+                   ttl: Optional[int] = None, **kwargs) -> CachedResponse:
+        """GET through the cache with an aiohttp ClientSession; kwargs go to session.get"""
+        if self.cassette and self.cassette.replaying:
+            return self.cassette.play(url)
+        response = await self._aget(session, url, headers, ttl, **kwargs)
+        return self.cassette.record(response) if self.cassette else response
+
+    async def _aget(self, session, url: str, headers: Optional[Dict[str, str]], ttl: Optional[int],
+                    **kwargs) -> CachedResponse:
+        import asyncio
+
+        import aiohttp
+
+        key = self.cache_key(url)
+        ttl = self.ttl_for(url) if ttl is None else ttl
+        entry = self._lookup(key)
+
+        cached = self._serve_cached(key, entry)
+        if cached:
+            return cached
+
+        try:
+            async with session.get(url, headers={**(headers or {}), **self._validators(entry)},
+                                   **kwargs) as response:
+                status = response.status
+                response_headers = dict(response.headers)
+                body = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return self._serve_stale(key, entry, e)
+        if status >= 500 and entry:
+            return self._serve_stale(key, entry, aiohttp.ClientError(f"{status} error"))
+        return self._finish(key, url, entry, status, response_headers, body, ttl)
+
+    def log_summary(self):
+        """Log how requests were answered"""
+        answered = {name: self.stats[name] for name in
+                    ('fresh', 'revalidated', 'downloaded', 'stale', 'uncached', 'evicted') if self.stats[name]}
+        logger.info(f"HTTP cache: {answered or 'no requests'}")
+        if self.cassette:
+            logger.info(f"Cassette {self.cassette.path} ({self.cassette.mode}): {dict(self.cassette.stats)}")
+
+    def close(self):
+        self.index.close()
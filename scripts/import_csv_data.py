@@ -4,27 +4,197 @@ CSV Flight Data Import Script for Creepstate Investigation Platform Database
 Reads the flight_flights_table.csv file and imports all data into PostgreSQL
 """
 
+import argparse
 import csv
+import hashlib
+import io
+import multiprocessing
 import os
+import queue
 import re
+import time
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import logging
 import sys
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('flight_import.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger(__name__)
 
+# Pipeline mode: row numbers are (chunk index << 32 | line in chunk) so they
+# stay unique and in file order across workers
+PIPELINE_ROW_SHIFT = 32
+
+# Incremental connection maintenance falls back to a full rebuild when the
+# queued link changes exceed this share of all flight_passengers rows
+CONNECTION_REBUILD_FRACTION = 0.2
+
+# Leading bytes hashed with the file size to recognise a file in the import journal
+JOURNAL_FINGERPRINT_BYTES = 64 * 1024
+
+# Common name standardizations, keyed by lowercased manifest spelling
+NAME_MAPPINGS = {
+    'jeff epstein': 'Jeffrey Epstein',
+    'jeffrey epstein': 'Jeffrey Epstein',
+    'je': 'Jeffrey Epstein',
+    'g maxwell': 'Ghislaine Maxwell',
+    'g. maxwell': 'Ghislaine Maxwell',
+    'ghislaine maxwell': 'Ghislaine Maxwell',
+    'gm': 'Ghislaine Maxwell',
+    'bill clinton': 'Bill Clinton',
+    'william clinton': 'Bill Clinton',
+    'president clinton': 'Bill Clinton',
+    'wjc': 'Bill Clinton',
+    'donald trump': 'Donald Trump',
+    'd trump': 'Donald Trump',
+    'dt': 'Donald Trump',
+    'trump': 'Donald Trump',
+    'prince andrew': 'Prince Andrew',
+    'andrew windsor': 'Prince Andrew',
+    'duke of york': 'Prince Andrew',
+    'andrew': 'Prince Andrew',
+    's kellen': 'Sarah Kellen',
+    'sarah kellen': 'Sarah Kellen',
+    'kellen': 'Sarah Kellen',
+    'n marcinkova': 'Nadia Marcinkova',
+    'nada marcinkova': 'Nadia Marcinkova',
+    'nadia marcinkova': 'Nadia Marcinkova',
+    'alan dershowitz': 'Alan Dershowitz',
+    'dershowitz': 'Alan Dershowitz',
+    'kevin spacey': 'Kevin Spacey',
+    'spacey': 'Kevin Spacey',
+    'chris tucker': 'Chris Tucker',
+    'tucker': 'Chris Tucker',
+    'glenn dubin': 'Glenn Dubin',
+    'eva dubin': 'Eva Dubin',
+    'celina dubin': 'Celina Dubin',
+    'sophie biddle': 'Sophie Biddle',
+    'a s': 'A S',
+    'as': 'A S'
+}
+
+# Lowercased names (or name fragments) behind passenger metadata
+SUSPECT_NAMES = ['jeffrey epstein', 'ghislaine maxwell']
+VIP_NAMES = ['donald trump', 'bill clinton', 'prince andrew', 'alan dershowitz']
+STAFF_NAMES = ['sarah kellen', 'nadia marcinkova']
+CELEBRITY_NAMES = ['kevin spacey', 'chris tucker', 'naomi campbell']
+
+def read_csv_header(csv_file_path: str) -> Tuple[List[str], str, int]:
+    """Return (fieldnames, delimiter, byte offset of the first data line)"""
+    with open(csv_file_path, 'rb') as handle:
+        line = handle.readline()
+        while line and not line.strip():
+            line = handle.readline()
+        data_start = handle.tell()
+        sample = (line + handle.read(1024)).decode('utf-8')
+    
+    delimiter = csv.Sniffer().sniff(sample).delimiter
+    fieldnames = next(csv.reader([line.decode('utf-8')], delimiter=delimiter))
+    return fieldnames, delimiter, data_start
+
+def iter_csv_records(handle, delimiter: str) -> Iterator[Tuple[List[str], int]]:
+    """(values, byte offset after the record) for each CSV record from handle's position
+    
+    A quoted field may span lines, as csv.DictReader allows; the offset is
+    only reported after a record's last line, so it is always a safe restart
+    point. A quoted field still open at the end of the file is an error
+    rather than a record.
+    """
+    state = {'offset': handle.tell(), 'eof': False}
+    
+    def lines():
+        for raw_line in handle:
+            state['offset'] += len(raw_line)
+            yield raw_line.decode('utf-8')
+        state['eof'] = True
+    
+    for values in csv.reader(lines(), delimiter=delimiter):
+        # The reader only asks for more input after the last line while a quote is open
+        if state['eof']:
+            raise ValueError(f"Unterminated quoted field in the record ending at byte {state['offset']}")
+        yield values, state['offset']
+
+def csv_file_fingerprint(csv_file_path: str) -> Tuple[str, int]:
+    """Return (fingerprint, size) identifying a CSV file in the import journal
+    
+    Only the size and leading bytes are hashed, which is cheap on large dumps
+    and changes whenever a file is replaced by a different export.
+    """
+    size = os.path.getsize(csv_file_path)
+    with open(csv_file_path, 'rb') as handle:
+        head = handle.read(JOURNAL_FINGERPRINT_BYTES)
+    return hashlib.md5(str(size).encode('ascii') + b'\x1e' + head).hexdigest(), size
+
+def split_csv_offsets(csv_file_path: str, data_start: int, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """Split the data section of a CSV file into newline-aligned byte ranges
+    
+    Every boundary is moved forward to the start of the next line, so each
+    range holds whole records. Records with quoted embedded newlines are not
+    supported; flight manifests are one line per flight.
+    """
+    size = os.path.getsize(csv_file_path)
+    offsets = []
+    start = data_start
+    
+    with open(csv_file_path, 'rb') as handle:
+        while start < size:
+            end = min(start + chunk_bytes, size)
+            if end < size:
+                handle.seek(end)
+                handle.readline()
+                end = handle.tell()
+            offsets.append((start, end))
+            start = end
+    
+    return offsets
+
+def _pipeline_parse_worker(csv_file_path: str, fieldnames: List[str], delimiter: str,
+                           tasks, results, batch_rows: int):
+    """Worker process: parse byte ranges into COPY-ready batches
+    
+    Batches are (flights_text, passengers_text, staged, skipped) tuples put on
+    the bounded results queue, which blocks the worker while the loader is
+    behind. A ('done',) or ('error', message) message ends the worker.
+    """
+    parser = FlightDataImporter({})
+    try:
+        with open(csv_file_path, 'rb') as handle:
+            while True:
+                task = tasks.get()
+                if task is None:
+                    break
+                
+                chunk_index, start, end = task
+                handle.seek(start)
+                lines = handle.read(end - start).decode('utf-8').splitlines()
+                
+                flights, passengers = [], []
+                staged = skipped = 0
+                for line_no, values in enumerate(csv.reader(lines, delimiter=delimiter)):
+                    if not values:
+                        continue
+                    row = dict(zip(fieldnames, values))
+                    rendered = parser.render_stage_rows((chunk_index << PIPELINE_ROW_SHIFT) | line_no, row)
+                    if rendered is None:
+                        skipped += 1
+                    else:
+                        flights.append(rendered[0])
+                        passengers.append(rendered[1])
+                        staged += 1
+                    
+                    if staged >= batch_rows:
+                        results.put(('batch', ''.join(flights), ''.join(passengers), staged, skipped))
+                        flights, passengers = [], []
+                        staged = skipped = 0
+                
+                if staged or skipped:
+                    results.put(('batch', ''.join(flights), ''.join(passengers), staged, skipped))
+        
+        results.put(('done',))
+    except Exception as e:
+        results.put(('error', f"{type(e).__name__}: {e}"))
+
 class FlightDataImporter:
     def __init__(self, db_config: Dict[str, str]):
         self.db_config = db_config
@@ -34,6 +204,9 @@ class FlightDataImporter:
         # Statistics
         self.stats = {
             'flights_imported': 0,
+            'flights_inserted': 0,
+            'flights_updated': 0,
+            'flights_unchanged': 0,
             'passengers_created': 0,
             'locations_created': 0,
             'connections_created': 0,
@@ -45,6 +218,14 @@ class FlightDataImporter:
         self.location_cache = {}
         self.aircraft_cache = {}
         
+        # Natural key -> content hash of stored flights, loaded in delta mode
+        self.flight_hashes = None
+        self.source_document = 'flight_flights_table.csv'
+        self.manifest_prefix = 'CSV_IMPORT'
+        
+        # Bulk-load audit mode: one summary audit_log entry per committed batch
+        self.bulk_audit = False
+        
     def connect_database(self):
         """Establish database connection"""
         try:
@@ -102,6 +283,7 @@ class FlightDataImporter:
             '%Y-%m-%d',  # 1995-11-17
             '%d/%m/%Y',  # 17/11/1995
             '%d-%m-%Y',  # 17-11-1995
+            '%Y%m%d',    # 19951117
         ]
         
         for fmt in formats:
@@ -125,49 +307,8 @@ class FlightDataImporter:
         # Remove quotes and extra whitespace
         name = re.sub(r'["\']', '', name.strip())
         
-        # Common name standardizations
-        name_mappings = {
-            'jeff epstein': 'Jeffrey Epstein',
-            'jeffrey epstein': 'Jeffrey Epstein',
-            'je': 'Jeffrey Epstein',
-            'g maxwell': 'Ghislaine Maxwell',
-            'g. maxwell': 'Ghislaine Maxwell',
-            'ghislaine maxwell': 'Ghislaine Maxwell',
-            'gm': 'Ghislaine Maxwell',
-            'bill clinton': 'Bill Clinton',
-            'william clinton': 'Bill Clinton',
-            'president clinton': 'Bill Clinton',
-            'wjc': 'Bill Clinton',
-            'donald trump': 'Donald Trump',
-            'd trump': 'Donald Trump',
-            'dt': 'Donald Trump',
-            'trump': 'Donald Trump',
-            'prince andrew': 'Prince Andrew',
-            'andrew windsor': 'Prince Andrew',
-            'duke of york': 'Prince Andrew',
-            'andrew': 'Prince Andrew',
-            's kellen': 'Sarah Kellen',
-            'sarah kellen': 'Sarah Kellen',
-            'kellen': 'Sarah Kellen',
-            'n marcinkova': 'Nadia Marcinkova',
-            'nada marcinkova': 'Nadia Marcinkova',
-            'nadia marcinkova': 'Nadia Marcinkova',
-            'alan dershowitz': 'Alan Dershowitz',
-            'dershowitz': 'Alan Dershowitz',
-            'kevin spacey': 'Kevin Spacey',
-            'spacey': 'Kevin Spacey',
-            'chris tucker': 'Chris Tucker',
-            'tucker': 'Chris Tucker',
-            'glenn dubin': 'Glenn Dubin',
-            'eva dubin': 'Eva Dubin',
-            'celina dubin': 'Celina Dubin',
-            'sophie biddle': 'Sophie Biddle',
-            'a s': 'A S',
-            'as': 'A S'
-        }
-        
         name_lower = name.lower()
-        return name_mappings.get(name_lower, name)
+        return NAME_MAPPINGS.get(name_lower, name)
     
     def find_or_create_passenger(self, name: str) -> str:
         """Find existing passenger or create new one"""
@@ -215,22 +356,19 @@ class FlightDataImporter:
         name_lower = name.lower()
         
         # High-profile suspects
-        if name_lower in ['jeffrey epstein', 'ghislaine maxwell']:
+        if name_lower in SUSPECT_NAMES:
             return 'suspect', 'critical', True
             
         # VIP passengers
-        vip_names = ['donald trump', 'bill clinton', 'prince andrew', 'alan dershowitz']
-        if any(vip in name_lower for vip in vip_names):
+        if any(vip in name_lower for vip in VIP_NAMES):
             return 'vip', 'high', True
             
         # Staff/associates
-        staff_names = ['sarah kellen', 'nadia marcinkova']
-        if any(staff in name_lower for staff in staff_names):
+        if any(staff in name_lower for staff in STAFF_NAMES):
             return 'staff', 'medium', True
             
         # Celebrities
-        celebrity_names = ['kevin spacey', 'chris tucker', 'naomi campbell']
-        if any(celeb in name_lower for celeb in celebrity_names):
+        if any(celeb in name_lower for celeb in CELEBRITY_NAMES):
             return 'guest', 'low', True
             
         # Regular/unknown passengers
@@ -282,8 +420,44 @@ class FlightDataImporter:
         
         return passengers
     
+    def flight_content_hash(self, flight_number: str, flight_date: date, departure_code: str,
+                            arrival_code: str, passengers: List[str]) -> str:
+        """Hash the normalized content of a flight row
+        
+        Parsed values are hashed rather than the raw CSV line, so a re-export
+        with another date format or name spelling is not treated as a change.
+        """
+        content = '\x1f'.join([
+            flight_number or '',
+            flight_date.isoformat(),
+            departure_code,
+            arrival_code,
+            '\x1e'.join(passengers)
+        ])
+        return hashlib.md5(content.encode('utf-8')).hexdigest()
+    
+    def _load_flight_hashes(self):
+        """Load natural key -> content hash for every stored flight (delta mode)"""
+        self.cursor.execute("""
+            SELECT f.flight_number, f.flight_date, dl.airport_code AS departure_code,
+                   al.airport_code AS arrival_code, f.content_hash
+            FROM flight_data.flights f
+            JOIN flight_data.locations dl ON f.departure_location_id = dl.id
+            JOIN flight_data.locations al ON f.arrival_location_id = al.id
+        """)
+        self.flight_hashes = {
+            (row['flight_number'] or '', row['flight_date'], row['departure_code'], row['arrival_code']): row['content_hash']
+            for row in self.cursor.fetchall()
+        }
+        logger.info(f"Loaded {len(self.flight_hashes)} flight hashes for delta import")
+    
     def import_flight(self, flight_data: Dict) -> bool:
-        """Import a single flight record"""
+        """Import a single flight record
+        
+        Flights are upserted on their natural key (flight number, date,
+        departure, arrival). A stored flight is only rewritten when its content
+        hash changed, in which case its passenger links are replaced.
+        """
         try:
             # Parse date
             flight_date = self.parse_date(flight_data.get('Date', ''))
@@ -291,9 +465,25 @@ class FlightDataImporter:
                 logger.warning(f"Skipping flight with invalid date: {flight_data}")
                 return False
             
+            flight_number = flight_data.get('Flight_No', '') or ''
+            departure_code = (flight_data.get('Departure_Code') or '').upper().strip()
+            arrival_code = (flight_data.get('Arrival_Code') or '').upper().strip()
+            
+            # Parse passengers
+            passengers = self.parse_passengers(flight_data.get('Passengers', ''))
+            
+            natural_key = (flight_number, flight_date, departure_code, arrival_code)
+            content_hash = self.flight_content_hash(flight_number, flight_date, departure_code,
+                                                    arrival_code, passengers)
+            
+            # Delta mode: unchanged rows never reach the database
+            if self.flight_hashes is not None and self.flight_hashes.get(natural_key) == content_hash:
+                self.stats['flights_unchanged'] += 1
+                return True
+            
             # Get locations
-            departure_id = self.find_or_create_location(flight_data.get('Departure_Code', ''))
-            arrival_id = self.find_or_create_location(flight_data.get('Arrival_Code', ''))
+            departure_id = self.find_or_create_location(departure_code)
+            arrival_id = self.find_or_create_location(arrival_code)
             
             if not departure_id or not arrival_id:
                 logger.warning(f"Skipping flight with invalid locations: {flight_data}")
@@ -302,29 +492,51 @@ class FlightDataImporter:
             # Get default aircraft (N908JE - Lolita Express)
             aircraft_id = self.aircraft_cache.get('N908JE')
             
-            # Parse passengers
-            passengers = self.parse_passengers(flight_data.get('Passengers', ''))
-            
-            # Insert flight
+            # Upsert flight; the WHERE clause turns an identical row into a no-op
             self.cursor.execute("""
                 INSERT INTO flight_data.flights 
                 (flight_number, aircraft_id, departure_location_id, arrival_location_id, 
-                 flight_date, passenger_count, manifest_id, source_document, data_quality)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
+                 flight_date, passenger_count, manifest_id, source_document, data_quality,
+                 content_hash)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT ON CONSTRAINT uq_flights_natural_key DO UPDATE SET
+                    aircraft_id = EXCLUDED.aircraft_id,
+                    passenger_count = EXCLUDED.passenger_count,
+                    manifest_id = EXCLUDED.manifest_id,
+                    source_document = EXCLUDED.source_document,
+                    content_hash = EXCLUDED.content_hash,
+                    updated_at = NOW()
+                WHERE flight_data.flights.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                RETURNING id, (xmax = 0) AS inserted
             """, (
-                flight_data.get('Flight_No', ''),
+                flight_number,
                 aircraft_id,
                 departure_id,
                 arrival_id,
                 flight_date,
                 len(passengers),
-                f"CSV_IMPORT_{flight_data.get('Flight_No', '')}_{flight_date}",
-                'flight_flights_table.csv',
-                'standard'
+                f"{self.manifest_prefix}_{flight_number}_{flight_date}",
+                self.source_document,
+                'standard',
+                content_hash
             ))
             
-            flight_id = self.cursor.fetchone()['id']
+            result = self.cursor.fetchone()
+            if self.flight_hashes is not None:
+                self.flight_hashes[natural_key] = content_hash
+            
+            if result is None:
+                self.stats['flights_unchanged'] += 1
+                return True
+            
+            flight_id = result['id']
+            if result['inserted']:
+                self.stats['flights_inserted'] += 1
+            else:
+                self.stats['flights_updated'] += 1
+                self.cursor.execute("""
+                    DELETE FROM flight_data.flight_passengers WHERE flight_id = %s
+                """, (flight_id,))
             
             # Insert passengers
             for passenger_name in passengers:
@@ -337,10 +549,6 @@ class FlightDataImporter:
                     """, (flight_id, passenger_id, 'passenger', passenger_name))
             
             self.stats['flights_imported'] += 1
-            
-            if self.stats['flights_imported'] % 100 == 0:
-                logger.info(f"Imported {self.stats['flights_imported']} flights...")
-            
             return True
             
         except Exception as e:
@@ -348,133 +556,1036 @@ class FlightDataImporter:
             self.stats['errors'] += 1
             return False
     
-    def import_csv_file(self, csv_file_path: str):
-        """Import all flights from CSV file"""
+    def _open_csv_reader(self, csvfile) -> csv.DictReader:
+        """Create a DictReader positioned on the header row
+        
+        Blank lines before the header would otherwise become an empty
+        fieldnames list and every row would be keyed under None.
+        """
+        position = csvfile.tell()
+        line = csvfile.readline()
+        while line and not line.strip():
+            position = csvfile.tell()
+            line = csvfile.readline()
+        
+        # Try to detect delimiter
+        csvfile.seek(position)
+        sample = csvfile.read(1024)
+        csvfile.seek(position)
+        
+        sniffer = csv.Sniffer()
+        delimiter = sniffer.sniff(sample).delimiter
+        
+        return csv.DictReader(csvfile, delimiter=delimiter)
+    
+    def import_csv_file(self, csv_file_path: str, delta: bool = False,
+                        batch_size: int = 500, resume: bool = False):
+        """Import all flights from CSV file
+        
+        Rows are committed in transactions of batch_size rows. Each commit also
+        records the byte offset and row number reached in
+        flight_data.import_journal, so with resume=True an interrupted import
+        of the same file continues after its last committed batch.
+        
+        With delta=True the stored content hashes are loaded first and rows
+        that are already present unchanged are skipped without a round trip.
+        """
         if not os.path.exists(csv_file_path):
             raise FileNotFoundError(f"CSV file not found: {csv_file_path}")
         
         logger.info(f"Starting import from {csv_file_path}")
+        self.source_document = os.path.basename(csv_file_path)
+        if delta:
+            self._load_flight_hashes()
+        
+        fieldnames, delimiter, data_start = read_csv_header(csv_file_path)
+        journal_id, offset, rows_processed = self._open_journal(csv_file_path, data_start, resume)
+        file_size = os.path.getsize(csv_file_path)
+        progress_start = (time.perf_counter(), offset, rows_processed)
+        committed_rows = rows_processed
+        batch_rows = 0
+        
+        try:
+            self._begin_audit_batch(f"{self.source_document} after row {rows_processed}")
+            with open(csv_file_path, 'rb') as handle:
+                handle.seek(offset)
+                
+                for values, offset in iter_csv_records(handle, delimiter):
+                    if not values:
+                        continue
+                    
+                    rows_processed += 1
+                    batch_rows += 1
+                    if (not self.import_flight(dict(zip(fieldnames, values)))
+                            and self.connection.get_transaction_status()
+                            == psycopg2.extensions.TRANSACTION_STATUS_INERROR):
+                        raise RuntimeError(f"Row {rows_processed} aborted the transaction")
+                    
+                    if batch_rows >= batch_size:
+                        self._end_audit_batch()
+                        self._checkpoint_journal(journal_id, offset, rows_processed)
+                        self.connection.commit()
+                        committed_rows = rows_processed
+                        batch_rows = 0
+                        self._report_progress(progress_start, offset, rows_processed, file_size)
+                        self._begin_audit_batch(f"{self.source_document} after row {rows_processed}")
+            
+            self._end_audit_batch()
+            self._checkpoint_journal(journal_id, offset, rows_processed, status='completed')
+            self.connection.commit()
+        except BaseException as e:
+            self.connection.rollback()
+            status = 'interrupted' if isinstance(e, KeyboardInterrupt) else 'failed'
+            self._mark_journal(journal_id, status)
+            logger.error(f"Import {status} after {committed_rows} committed rows: {e!r}; "
+                         f"run again with --resume to continue")
+            self.stats['errors'] += 1
+            raise
+        
+        logger.info("All flights imported and committed to database")
+    
+    def _begin_audit_batch(self, label: str):
+        """Switch the current transaction to bulk-load audit mode when enabled"""
+        if self.bulk_audit:
+            self.cursor.execute("SELECT security_audit.begin_bulk_audit(%s)", (label,))
+    
+    def _end_audit_batch(self):
+        """Write the batch's summary audit entry before it commits"""
+        if self.bulk_audit:
+            self.cursor.execute("SELECT security_audit.end_bulk_audit() AS audit_id")
+            logger.debug(f"Bulk audit entry {self.cursor.fetchone()['audit_id']}")
+    
+    def _open_journal(self, csv_file_path: str, data_start: int, resume: bool) -> Tuple[str, int, int]:
+        """Start an import journal entry or reopen the last unfinished one
+        
+        Returns (journal_id, byte_offset, rows_processed). On resume the stats
+        counters are restored so the summary covers the whole file.
+        """
+        fingerprint, file_size = csv_file_fingerprint(csv_file_path)
+        
+        if resume:
+            self.cursor.execute("""
+                SELECT id, byte_offset, rows_processed, flights_inserted, flights_updated,
+                       flights_unchanged, errors
+                FROM flight_data.import_journal
+                WHERE source_document = %s AND file_fingerprint = %s AND status <> 'completed'
+                ORDER BY started_at DESC
+                LIMIT 1
+            """, (self.source_document, fingerprint))
+            entry = self.cursor.fetchone()
+            if entry:
+                for key in ('flights_inserted', 'flights_updated', 'flights_unchanged', 'errors'):
+                    self.stats[key] = entry[key]
+                self.stats['flights_imported'] = entry['flights_inserted'] + entry['flights_updated']
+                self.cursor.execute("""
+                    UPDATE flight_data.import_journal
+                    SET status = 'running', updated_at = NOW()
+                    WHERE id = %s
+                """, (entry['id'],))
+                self.connection.commit()
+                logger.info(f"Resuming import after row {entry['rows_processed']} "
+                            f"(byte {entry['byte_offset']} of {file_size})")
+                return entry['id'], entry['byte_offset'], entry['rows_processed']
+            logger.warning(f"No unfinished import of {self.source_document} with this content; "
+                           f"starting from the beginning")
+        
+        self.cursor.execute("""
+            INSERT INTO flight_data.import_journal
+            (source_document, file_fingerprint, file_size, byte_offset)
+            VALUES (%s, %s, %s, %s)
+            RETURNING id
+        """, (self.source_document, fingerprint, file_size, data_start))
+        journal_id = self.cursor.fetchone()['id']
+        self.connection.commit()
+        return journal_id, data_start, 0
+    
+    def _checkpoint_journal(self, journal_id: str, byte_offset: int, rows_processed: int,
+                            status: str = 'running'):
+        """Record progress in the current transaction, so it commits with the batch"""
+        self.cursor.execute("""
+            UPDATE flight_data.import_journal
+            SET byte_offset = %s,
+                rows_processed = %s,
+                flights_inserted = %s,
+                flights_updated = %s,
+                flights_unchanged = %s,
+                errors = %s,
+                status = %s,
+                updated_at = NOW(),
+                completed_at = CASE WHEN %s = 'completed' THEN NOW() END
+            WHERE id = %s
+        """, (byte_offset, rows_processed, self.stats['flights_inserted'],
+              self.stats['flights_updated'], self.stats['flights_unchanged'],
+              self.stats['errors'], status, status, journal_id))
+    
+    def _mark_journal(self, journal_id: str, status: str):
+        """Flag an import that stopped early; its last checkpoint stays intact"""
+        try:
+            self.cursor.execute("""
+                UPDATE flight_data.import_journal
+                SET status = %s, updated_at = NOW()
+                WHERE id = %s
+            """, (status, journal_id))
+            self.connection.commit()
+        except Exception as e:
+            logger.error(f"Failed to update import journal: {e}")
+    
+    def _report_progress(self, progress_start: Tuple[float, int, int], byte_offset: int,
+                         rows_processed: int, file_size: int):
+        """Log committed rows with row rate and an ETA from the byte rate"""
+        started, start_offset, start_rows = progress_start
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        row_rate = (rows_processed - start_rows) / elapsed
+        byte_rate = (byte_offset - start_offset) / elapsed
+        eta = timedelta(seconds=int((file_size - byte_offset) / byte_rate)) if byte_rate else 'unknown'
+        logger.info(f"Committed {rows_processed} rows ({byte_offset / file_size:.1%} of file), "
+                    f"{row_rate:,.0f} rows/s, ETA {eta}")
+    
+    @staticmethod
+    def _copy_row(values) -> str:
+        """Format one row for COPY ... FROM STDIN (text format)"""
+        fields = []
+        for value in values:
+            if value is None:
+                fields.append('\\N')
+                continue
+            text = str(value)
+            text = (text.replace('\\', '\\\\').replace('\t', '\\t')
+                        .replace('\n', '\\n').replace('\r', '\\r'))
+            fields.append(text)
+        return '\t'.join(fields) + '\n'
+    
+    def render_stage_rows(self, row_no: int, row: Dict) -> Optional[Tuple[str, str]]:
+        """Parse one CSV row into COPY lines for the staging tables
+        
+        Returns (flight_line, passenger_lines), or None when the row is skipped.
+        Needs no database connection, so pipeline workers call it too.
+        """
+        flight_date = self.parse_date(row.get('Date', ''))
+        if not flight_date:
+            logger.warning(f"Skipping flight with invalid date: {row}")
+            return None
+        
+        departure_code = (row.get('Departure_Code') or '').upper().strip()
+        arrival_code = (row.get('Arrival_Code') or '').upper().strip()
+        if not departure_code or not arrival_code:
+            logger.warning(f"Skipping flight with invalid locations: {row}")
+            return None
+        
+        flight_number = row.get('Flight_No', '') or ''
+        passengers = self.parse_passengers(row.get('Passengers', ''))
+        
+        content_hash = self.flight_content_hash(flight_number, flight_date, departure_code,
+                                                arrival_code, passengers)
+        flight_line = self._copy_row((
+            row_no, flight_number, flight_date, departure_code, arrival_code,
+            len(passengers), f"{self.manifest_prefix}_{flight_number}_{flight_date}", content_hash
+        ))
+        
+        passenger_lines = []
+        for position, passenger_name in enumerate(passengers):
+            cleaned_name = self.clean_passenger_name(passenger_name)
+            name_parts = cleaned_name.split()
+            passenger_type, risk_level, verified = self._get_passenger_metadata(cleaned_name)
+            passenger_lines.append(self._copy_row((
+                row_no, position, passenger_name, cleaned_name, cleaned_name.lower(),
+                name_parts[0] if name_parts else cleaned_name,
+                name_parts[-1] if len(name_parts) > 1 else None,
+                passenger_type, 't' if verified else 'f', risk_level
+            )))
+        
+        return flight_line, ''.join(passenger_lines)
+    
+    def _stage_csv_file(self, csv_file_path: str) -> Tuple[io.StringIO, io.StringIO, int]:
+        """Parse the CSV once and render COPY buffers for the staging tables"""
+        flights_buffer = io.StringIO()
+        passengers_buffer = io.StringIO()
+        staged = 0
         
         with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
-            # Try to detect delimiter
-            sample = csvfile.read(1024)
-            csvfile.seek(0)
+            reader = self._open_csv_reader(csvfile)
             
-            sniffer = csv.Sniffer()
-            delimiter = sniffer.sniff(sample).delimiter
+            for row_no, row in enumerate(reader, start=1):
+                rendered = self.render_stage_rows(row_no, row)
+                if rendered is None:
+                    continue
+                flights_buffer.write(rendered[0])
+                passengers_buffer.write(rendered[1])
+                staged += 1
+        
+        flights_buffer.seek(0)
+        passengers_buffer.seek(0)
+        return flights_buffer, passengers_buffer, staged
+    
+    def _create_staging_tables(self):
+        """Create the per-transaction staging tables used by the bulk loaders"""
+        self.cursor.execute("""
+            CREATE TEMP TABLE stage_flights (
+                row_no BIGINT PRIMARY KEY,
+                flight_id UUID NOT NULL DEFAULT uuid_generate_v7(),
+                flight_number VARCHAR(20),
+                flight_date DATE NOT NULL,
+                departure_code VARCHAR(10) NOT NULL,
+                arrival_code VARCHAR(10) NOT NULL,
+                passenger_count INTEGER,
+                manifest_id VARCHAR(50),
+                content_hash CHAR(32) NOT NULL,
+                existing BOOLEAN NOT NULL DEFAULT FALSE,
+                existing_hash CHAR(32)
+            ) ON COMMIT DROP;
             
-            reader = csv.DictReader(csvfile, delimiter=delimiter)
+            CREATE TEMP TABLE stage_flight_passengers (
+                row_no BIGINT NOT NULL,
+                position INTEGER NOT NULL,
+                name_in_manifest VARCHAR(255),
+                full_name VARCHAR(255) NOT NULL,
+                name_key VARCHAR(255) NOT NULL,
+                first_name VARCHAR(100),
+                last_name VARCHAR(100),
+                passenger_type VARCHAR(50),
+                verified_identity BOOLEAN,
+                risk_level VARCHAR(20)
+            ) ON COMMIT DROP;
+        """)
+    
+    def _copy_into_staging(self, flights_buffer, passengers_buffer):
+        """Append rendered COPY text to the staging tables"""
+        self.cursor.copy_expert("""
+            COPY stage_flights (row_no, flight_number, flight_date, departure_code,
+                                arrival_code, passenger_count, manifest_id, content_hash)
+            FROM STDIN
+        """, flights_buffer)
+        self.cursor.copy_expert("""
+            COPY stage_flight_passengers (row_no, position, name_in_manifest, full_name, name_key,
+                                          first_name, last_name, passenger_type,
+                                          verified_identity, risk_level)
+            FROM STDIN
+        """, passengers_buffer)
+    
+    def _merge_staging_tables(self, timings: Dict[str, float],
+                              update_existing: bool = True) -> Tuple[int, int]:
+        """Resolve staged rows into the flight_data tables with set-based statements
+        
+        Returns (flight_passenger_rows, duplicate_rows) and records the
+        'resolve' and 'insert' phase timings. With update_existing=False,
+        stored flights whose content differs are left as they are and counted
+        in stats['flights_conflicting'].
+        """
+        self.cursor.execute("ANALYZE stage_flights; ANALYZE stage_flight_passengers;")
+        # Search documents are refreshed once for all touched flights below,
+        # not by the triggers after every statement
+        self.cursor.execute("SELECT flight_data.defer_search_docs()")
+        
+        phase = time.perf_counter()
+        # Locations: airport_code is UNIQUE, so unseen codes resolve in one upsert
+        self.cursor.execute("""
+            INSERT INTO flight_data.locations (airport_code, airport_name, city, country, facility_type)
+            SELECT code, 'Unknown Airport - ' || code, 'Unknown', 'US', 'unknown'
+            FROM (
+                SELECT departure_code AS code FROM stage_flights
+                UNION
+                SELECT arrival_code FROM stage_flights
+            ) codes
+            ORDER BY code
+            ON CONFLICT (airport_code) DO NOTHING
+        """)
+        self.stats['locations_created'] += self.cursor.rowcount
+        
+        # A natural key repeated inside the file: the last occurrence wins,
+        # as it would when rows are upserted one after another
+        self.cursor.execute("""
+            DELETE FROM stage_flights s
+            USING stage_flights t
+            WHERE t.flight_number IS NOT DISTINCT FROM s.flight_number
+              AND t.flight_date = s.flight_date
+              AND t.departure_code = s.departure_code
+              AND t.arrival_code = s.arrival_code
+              AND s.row_no < t.row_no
+        """)
+        duplicate_rows = self.cursor.rowcount
+        
+        # Classify staged flights against stored ones by natural key
+        self.cursor.execute("""
+            UPDATE stage_flights s
+            SET flight_id = f.id, existing = TRUE, existing_hash = f.content_hash
+            FROM flight_data.flights f
+            JOIN flight_data.locations dl ON f.departure_location_id = dl.id
+            JOIN flight_data.locations al ON f.arrival_location_id = al.id
+            WHERE f.flight_number = s.flight_number
+              AND f.flight_date = s.flight_date
+              AND dl.airport_code = s.departure_code
+              AND al.airport_code = s.arrival_code
+        """)
+        self.cursor.execute("""
+            DELETE FROM stage_flights
+            WHERE existing AND existing_hash IS NOT DISTINCT FROM content_hash
+        """)
+        self.stats['flights_unchanged'] += self.cursor.rowcount
+        if not update_existing:
+            self.cursor.execute("""
+                DELETE FROM stage_flights WHERE existing
+                RETURNING flight_number, flight_date, departure_code, arrival_code
+            """)
+            conflicting = self.cursor.fetchall()
+            self.stats['flights_conflicting'] = self.stats.get('flights_conflicting', 0) + len(conflicting)
+            for row in conflicting:
+                logger.warning(f"Kept stored flight {row['flight_number']} on {row['flight_date']} "
+                               f"{row['departure_code']}->{row['arrival_code']}: staged content differs")
+        self.cursor.execute("""
+            DELETE FROM stage_flight_passengers sp
+            WHERE NOT EXISTS (SELECT 1 FROM stage_flights sf WHERE sf.row_no = sp.row_no)
+        """)
+        
+        # Passengers: match on full name or alias (case-insensitive) like the
+        # importer cache does, then create the remaining names once each
+        self.cursor.execute("""
+            CREATE TEMP TABLE stage_passenger_keys ON COMMIT DROP AS
+            SELECT DISTINCT ON (s.name_key)
+                s.name_key, s.full_name, s.first_name, s.last_name,
+                s.passenger_type, s.verified_identity, s.risk_level,
+                known.passenger_id
+            FROM stage_flight_passengers s
+            LEFT JOIN (
+                SELECT DISTINCT ON (name_key) name_key, passenger_id
+                FROM (
+                    SELECT lower(alias) AS name_key, passenger_id, 0 AS priority
+                    FROM flight_data.passenger_aliases
+                    WHERE passenger_id IS NOT NULL
+                    UNION ALL
+                    SELECT lower(full_name), id, 1
+                    FROM flight_data.passengers
+                ) candidates
+                ORDER BY name_key, priority
+            ) known ON known.name_key = s.name_key
+            ORDER BY s.name_key, s.row_no, s.position
+        """)
+        self.cursor.execute("""
+            WITH created AS (
+                INSERT INTO flight_data.passengers
+                (full_name, first_name, last_name, passenger_type, verified_identity, risk_level)
+                SELECT full_name, first_name, last_name, passenger_type, verified_identity, risk_level
+                FROM stage_passenger_keys
+                WHERE passenger_id IS NULL
+                ORDER BY name_key
+                RETURNING id, lower(full_name) AS name_key
+            )
+            UPDATE stage_passenger_keys k
+            SET passenger_id = created.id
+            FROM created
+            WHERE k.name_key = created.name_key
+        """)
+        self.stats['passengers_created'] += self.cursor.rowcount
+        
+        self.cursor.execute("SELECT name_key, passenger_id FROM stage_passenger_keys")
+        for row in self.cursor.fetchall():
+            self.passenger_cache[row['name_key']] = row['passenger_id']
+        timings['resolve'] = time.perf_counter() - phase
+        
+        phase = time.perf_counter()
+        aircraft_id = self.aircraft_cache.get('N908JE')
+        
+        # Changed flights keep their id; their passenger links are replaced
+        self.cursor.execute("""
+            UPDATE flight_data.flights f
+            SET aircraft_id = %s,
+                passenger_count = s.passenger_count,
+                manifest_id = s.manifest_id,
+                source_document = %s,
+                content_hash = s.content_hash,
+                updated_at = NOW()
+            FROM stage_flights s
+            WHERE s.existing AND f.id = s.flight_id
+        """, (aircraft_id, self.source_document))
+        self.stats['flights_updated'] += self.cursor.rowcount
+        self.cursor.execute("""
+            DELETE FROM flight_data.flight_passengers fp
+            USING stage_flights s
+            WHERE s.existing AND fp.flight_id = s.flight_id
+        """)
+        
+        self.cursor.execute("""
+            INSERT INTO flight_data.flights
+            (id, flight_number, aircraft_id, departure_location_id, arrival_location_id,
+             flight_date, passenger_count, manifest_id, source_document, data_quality,
+             content_hash)
+            SELECT s.flight_id, s.flight_number, %s, dl.id, al.id,
+                   s.flight_date, s.passenger_count, s.manifest_id, %s, 'standard',
+                   s.content_hash
+            FROM stage_flights s
+            JOIN flight_data.locations dl ON dl.airport_code = s.departure_code
+            JOIN flight_data.locations al ON al.airport_code = s.arrival_code
+            WHERE NOT s.existing
+            ORDER BY s.row_no
+        """, (aircraft_id, self.source_document))
+        self.stats['flights_inserted'] += self.cursor.rowcount
+        self.stats['flights_imported'] = self.stats['flights_inserted'] + self.stats['flights_updated']
+        
+        self.cursor.execute("""
+            INSERT INTO flight_data.flight_passengers
+            (flight_id, passenger_id, passenger_role, name_in_manifest)
+            SELECT sf.flight_id, k.passenger_id, 'passenger', sp.name_in_manifest
+            FROM stage_flight_passengers sp
+            JOIN stage_flights sf ON sf.row_no = sp.row_no
+            JOIN stage_passenger_keys k ON k.name_key = sp.name_key
+            ORDER BY sp.row_no, sp.position
+        """)
+        flight_passenger_rows = self.cursor.rowcount
+        timings['insert'] = time.perf_counter() - phase
+        
+        phase = time.perf_counter()
+        self.cursor.execute("SELECT flight_data.refresh_deferred_search_docs()")
+        timings['search'] = time.perf_counter() - phase
+        
+        return flight_passenger_rows, duplicate_rows
+    
+    def bulk_import_csv_file(self, csv_file_path: str, vectorized: bool = False):
+        """Import all flights from CSV file with COPY and set-based statements
+        
+        Produces the same rows as import_csv_file, but loads the parsed file into
+        temporary staging tables and resolves locations, passengers, flights and
+        flight_passengers in a handful of statements instead of one round trip
+        per row. Staged rows are compared with stored flights by natural key and
+        content hash, so only new or changed flights are written.
+        
+        With vectorized=True the CSV is parsed by the pandas normalization
+        stage in normalize_flights.py, which renders identical COPY buffers.
+        """
+        if not os.path.exists(csv_file_path):
+            raise FileNotFoundError(f"CSV file not found: {csv_file_path}")
+        
+        logger.info(f"Starting bulk import from {csv_file_path}")
+        self.source_document = os.path.basename(csv_file_path)
+        timings = {}
+        started = time.perf_counter()
+        
+        if vectorized:
+            from normalize_flights import FlightFrameNormalizer
+            flights_buffer, passengers_buffer, staged = FlightFrameNormalizer().stage_csv_file(csv_file_path)
+        else:
+            flights_buffer, passengers_buffer, staged = self._stage_csv_file(csv_file_path)
+        timings['parse'] = time.perf_counter() - started
+        
+        try:
+            phase = time.perf_counter()
+            self._begin_audit_batch(self.source_document)
+            self._create_staging_tables()
+            self._copy_into_staging(flights_buffer, passengers_buffer)
+            timings['copy'] = time.perf_counter() - phase
             
-            for row in reader:
-                self.import_flight(row)
+            flight_passenger_rows, duplicate_rows = self._merge_staging_tables(timings)
+            self._end_audit_batch()
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            logger.error(f"Bulk import failed, transaction rolled back: {e}")
+            self.stats['errors'] += 1
+            raise
+        
+        if duplicate_rows:
+            logger.info(f"Collapsed {duplicate_rows} rows repeating a flight already in the file")
+        timings['total'] = time.perf_counter() - started
+        self.print_throughput_report(staged, flight_passenger_rows, timings)
+    
+    def pipeline_import_csv_file(self, csv_file_path: str, workers: Optional[int] = None,
+                                 chunk_bytes: int = 8 * 1024 * 1024, batch_rows: int = 5000,
+                                 queue_batches: Optional[int] = None):
+        """Import a large CSV with parallel parsing and a single COPY loader
+        
+        The file is split at newline-aligned byte offsets. Worker processes
+        parse dates, split and normalize passenger names and render COPY text,
+        sending batches through a bounded queue; this process streams each
+        batch into the staging tables as it arrives and runs the same
+        set-based merge as bulk_import_csv_file at the end.
+        """
+        if not os.path.exists(csv_file_path):
+            raise FileNotFoundError(f"CSV file not found: {csv_file_path}")
+        
+        workers = workers or os.cpu_count() or 1
+        queue_batches = queue_batches or workers * 2
+        self.source_document = os.path.basename(csv_file_path)
+        
+        fieldnames, delimiter, data_start = read_csv_header(csv_file_path)
+        offsets = split_csv_offsets(csv_file_path, data_start, chunk_bytes)
+        logger.info(f"Starting pipeline import from {csv_file_path}: "
+                    f"{len(offsets)} chunks, {workers} workers")
+        
+        timings = {'copy': 0.0}
+        started = time.perf_counter()
+        staged = skipped = 0
+        
+        context = multiprocessing.get_context()
+        tasks = context.Queue()
+        results = context.Queue(maxsize=queue_batches)
+        for chunk_index, (start, end) in enumerate(offsets):
+            tasks.put((chunk_index, start, end))
+        for _ in range(workers):
+            tasks.put(None)
+        
+        processes = [
+            context.Process(target=_pipeline_parse_worker,
+                            args=(csv_file_path, fieldnames, delimiter, tasks, results, batch_rows),
+                            daemon=True)
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        
+        try:
+            self._begin_audit_batch(self.source_document)
+            self._create_staging_tables()
+            
+            finished = 0
+            while finished < len(processes):
+                try:
+                    message = results.get(timeout=5)
+                except queue.Empty:
+                    if not any(process.is_alive() for process in processes):
+                        raise RuntimeError("Parser workers exited without finishing")
+                    continue
                 
-                # Commit periodically
-                if self.stats['flights_imported'] % 50 == 0:
-                    self.connection.commit()
+                if message[0] == 'batch':
+                    _, flights_text, passengers_text, batch_staged, batch_skipped = message
+                    phase = time.perf_counter()
+                    self._copy_into_staging(io.StringIO(flights_text), io.StringIO(passengers_text))
+                    timings['copy'] += time.perf_counter() - phase
+                    staged += batch_staged
+                    skipped += batch_skipped
+                elif message[0] == 'done':
+                    finished += 1
+                else:
+                    raise RuntimeError(f"Parser worker failed: {message[1]}")
+            
+            timings['stream'] = time.perf_counter() - started
+            flight_passenger_rows, duplicate_rows = self._merge_staging_tables(timings)
+            self._end_audit_batch()
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            logger.error(f"Pipeline import failed, transaction rolled back: {e}")
+            self.stats['errors'] += 1
+            for process in processes:
+                process.terminate()
+            raise
+        finally:
+            for process in processes:
+                process.join()
         
-        # Final commit
-        self.connection.commit()
-        logger.info("All flights imported and committed to database")
+        if skipped:
+            logger.warning(f"Skipped {skipped} rows with invalid dates or locations")
+        if duplicate_rows:
+            logger.info(f"Collapsed {duplicate_rows} rows repeating a flight already in the file")
+        timings['total'] = time.perf_counter() - started
+        self.print_throughput_report(staged, flight_passenger_rows, timings)
+    
+    def print_throughput_report(self, staged_rows: int, flight_passenger_rows: int, timings: Dict[str, float]):
+        """Print per-phase timings and row rates for a bulk import"""
+        total = timings.get('total') or 1e-9
+        logger.info("="*50)
+        logger.info("BULK IMPORT THROUGHPUT")
+        logger.info("="*50)
+        for phase in ('parse', 'stream', 'copy', 'resolve', 'insert', 'search'):
+            if phase in timings:
+                logger.info(f"{phase.capitalize():<10} {timings[phase]:8.2f}s")
+        logger.info(f"{'Total':<10} {total:8.2f}s")
+        logger.info(f"CSV rows staged: {staged_rows} ({staged_rows / total:,.0f} rows/s)")
+        logger.info(f"Flight-passenger rows: {flight_passenger_rows} "
+                    f"({flight_passenger_rows / total:,.0f} rows/s)")
+        logger.info("="*50)
+    
+    # Exact shared-flight totals per unordered pair (p1 < p2), counted over
+    # distinct (flight, passenger) links so a name listed twice counts once
+    _PAIR_TOTALS_SQL = """
+        SELECT a.passenger_id AS p1, b.passenger_id AS p2,
+               COUNT(*) AS shared, MIN(f.flight_date) AS first_date, MAX(f.flight_date) AS last_date
+        FROM (SELECT DISTINCT flight_id, passenger_id FROM flight_data.flight_passengers) a
+        JOIN (SELECT DISTINCT flight_id, passenger_id FROM flight_data.flight_passengers) b
+            ON b.flight_id = a.flight_id AND a.passenger_id < b.passenger_id
+        JOIN flight_data.flights f ON f.id = a.flight_id
+        GROUP BY a.passenger_id, b.passenger_id
+        HAVING COUNT(*) > 1
+    """
+    
+    # Exact totals for the pairs listed in conn_recount, however few flights they share
+    _PAIR_RECOUNT_SQL = """
+        SELECT r.p1, r.p2, t.shared, t.first_date, t.last_date
+        FROM conn_recount r
+        CROSS JOIN LATERAL (
+            SELECT COUNT(DISTINCT a.flight_id) AS shared,
+                   MIN(f.flight_date) AS first_date, MAX(f.flight_date) AS last_date
+            FROM flight_data.flight_passengers a
+            JOIN flight_data.flight_passengers b
+                ON b.flight_id = a.flight_id AND b.passenger_id = r.p2
+            JOIN flight_data.flights f ON f.id = a.flight_id
+            WHERE a.passenger_id = r.p1
+        ) t
+    """
+    
+    def _apply_connection_totals(self):
+        """Write exact pair totals from conn_totals into passenger_connections
+        
+        Pairs sharing more than one flight are upserted as co_traveler rows.
+        Curated rows (any other connection_type) keep their type and strength
+        but get flight counts and dates; co_traveler rows whose pair no longer
+        shares more than one flight are removed.
+        """
+        self.cursor.execute("""
+            INSERT INTO investigation.passenger_connections (
+                passenger1_id, passenger2_id, connection_type, connection_strength,
+                shared_flights_count, first_documented_interaction,
+                last_documented_interaction, relationship_status
+            )
+            SELECT p1, p2, 'co_traveler', LEAST(10, shared * 2), shared, first_date, last_date, 'unknown'
+            FROM conn_totals
+            WHERE shared > 1
+            ORDER BY p1, p2
+            ON CONFLICT ((LEAST(passenger1_id, passenger2_id)), (GREATEST(passenger1_id, passenger2_id)))
+            DO UPDATE SET
+                shared_flights_count = EXCLUDED.shared_flights_count,
+                first_documented_interaction = EXCLUDED.first_documented_interaction,
+                last_documented_interaction = EXCLUDED.last_documented_interaction,
+                connection_strength = CASE
+                    WHEN passenger_connections.connection_type = 'co_traveler'
+                    THEN EXCLUDED.connection_strength
+                    ELSE passenger_connections.connection_strength
+                END,
+                updated_at = NOW()
+            WHERE (passenger_connections.shared_flights_count,
+                   passenger_connections.first_documented_interaction,
+                   passenger_connections.last_documented_interaction)
+                IS DISTINCT FROM
+                  (EXCLUDED.shared_flights_count,
+                   EXCLUDED.first_documented_interaction,
+                   EXCLUDED.last_documented_interaction)
+            RETURNING (xmax = 0) AS inserted
+        """)
+        written = self.cursor.fetchall()
+        created = sum(1 for row in written if row['inserted'])
+        
+        self.cursor.execute("""
+            DELETE FROM investigation.passenger_connections c
+            USING conn_totals t
+            WHERE LEAST(c.passenger1_id, c.passenger2_id) = t.p1
+              AND GREATEST(c.passenger1_id, c.passenger2_id) = t.p2
+              AND t.shared <= 1
+              AND c.connection_type = 'co_traveler'
+        """)
+        removed = self.cursor.rowcount
+        
+        self.cursor.execute("""
+            UPDATE investigation.passenger_connections c
+            SET shared_flights_count = t.shared,
+                first_documented_interaction = t.first_date,
+                last_documented_interaction = t.last_date,
+                updated_at = NOW()
+            FROM conn_totals t
+            WHERE LEAST(c.passenger1_id, c.passenger2_id) = t.p1
+              AND GREATEST(c.passenger1_id, c.passenger2_id) = t.p2
+              AND t.shared <= 1
+              AND (c.shared_flights_count, c.first_documented_interaction, c.last_documented_interaction)
+                  IS DISTINCT FROM (t.shared, t.first_date, t.last_date)
+        """)
+        updated = len(written) - created + self.cursor.rowcount
+        
+        self.stats['connections_created'] += created
+        return created, updated, removed
+    
+    def _build_full_connection_totals(self):
+        """Fill conn_totals with exact totals for every pair that needs a row
+        
+        That is every pair sharing more than one flight, plus every stored
+        connection outside that set (curated pairs and stale co_traveler rows).
+        """
+        self.cursor.execute(f"""
+            CREATE TEMP TABLE conn_totals ON COMMIT DROP AS
+            {self._PAIR_TOTALS_SQL}
+        """)
+        self.cursor.execute("""
+            CREATE TEMP TABLE conn_recount ON COMMIT DROP AS
+            SELECT DISTINCT LEAST(c.passenger1_id, c.passenger2_id) AS p1,
+                            GREATEST(c.passenger1_id, c.passenger2_id) AS p2
+            FROM investigation.passenger_connections c
+            WHERE NOT EXISTS (
+                SELECT 1 FROM conn_totals t
+                WHERE t.p1 = LEAST(c.passenger1_id, c.passenger2_id)
+                  AND t.p2 = GREATEST(c.passenger1_id, c.passenger2_id)
+            )
+        """)
+        self.cursor.execute(f"INSERT INTO conn_totals {self._PAIR_RECOUNT_SQL}")
     
     def analyze_and_create_connections(self):
-        """Analyze flight data and create passenger connections"""
-        logger.info("Analyzing passenger connections...")
+        """Rebuild passenger connections from every flight
+        
+        Also discards queued changes, which the rebuild already covers.
+        """
+        logger.info("Rebuilding passenger connections from all flights...")
+        started = time.perf_counter()
+        
+        try:
+            # Keep new links from being queued and then lost between the
+            # rebuild's snapshot and the queue being cleared
+            self.cursor.execute("LOCK TABLE investigation.connection_changes IN SHARE ROW EXCLUSIVE MODE")
+            self.cursor.execute("DELETE FROM investigation.connection_changes")
+            self._build_full_connection_totals()
+            created, updated, removed = self._apply_connection_totals()
+            self.connection.commit()
+            
+            logger.info(f"Rebuilt passenger connections in {time.perf_counter() - started:.2f}s: "
+                        f"{created} created, {updated} updated, {removed} removed")
+            
+        except Exception as e:
+            self.connection.rollback()
+            logger.error(f"Failed to create connections: {e}")
+            self.stats['errors'] += 1
+    
+    def update_connections(self):
+        """Apply queued flight_passengers changes to passenger_connections
+        
+        Links added or removed since the last run are queued by trigger in
+        investigation.connection_changes. For flights that only gained
+        passengers, the new pairs' flight counts and dates are added to the
+        stored connections. Pairs on flights that lost passengers, and pairs
+        not stored yet (they may have shared one flight before), are
+        recounted exactly for just those pairs.
+        """
+        logger.info("Updating passenger connections from queued flight changes...")
+        started = time.perf_counter()
         
         try:
-            # Create connections based on shared flights
+            # A queue covering a large share of all links (a first import) is
+            # cheaper to handle with one rebuild than with per-pair recounts
+            self.cursor.execute("""
+                SELECT (SELECT COUNT(*) FROM investigation.connection_changes) AS queued,
+                       (SELECT COUNT(*) FROM flight_data.flight_passengers) AS links
+            """)
+            backlog = self.cursor.fetchone()
+            self.connection.commit()
+            if backlog['queued'] > CONNECTION_REBUILD_FRACTION * backlog['links']:
+                self.analyze_and_create_connections()
+                return
+            
+            self.cursor.execute("""
+                CREATE TEMP TABLE conn_changes (
+                    flight_id UUID, passenger_id UUID, delta INTEGER
+                ) ON COMMIT DROP;
+                
+                WITH drained AS (
+                    DELETE FROM investigation.connection_changes
+                    RETURNING flight_id, passenger_id, delta
+                )
+                INSERT INTO conn_changes SELECT flight_id, passenger_id, delta FROM drained;
+            """)
+            queued = self.cursor.rowcount
+            if not queued:
+                self.connection.commit()
+                logger.info("Passenger connections are up to date")
+                return
+            
+            # Membership of each touched flight before and after the queued
+            # changes. A manifest may link one passenger to a flight more than
+            # once, so links are counted: the current count is 'after', and
+            # 'before' undoes the net delta on that count
             self.cursor.execute("""
-                INSERT INTO investigation.passenger_connections (
-                    passenger1_id, 
-                    passenger2_id, 
-                    connection_type, 
-                    connection_strength, 
-                    shared_flights_count,
-                    first_documented_interaction,
-                    last_documented_interaction,
-                    relationship_status
+                CREATE TEMP TABLE conn_members ON COMMIT DROP AS
+                WITH net AS (
+                    SELECT flight_id, passenger_id, SUM(delta) AS net
+                    FROM conn_changes
+                    GROUP BY flight_id, passenger_id
+                ), current_links AS (
+                    SELECT fp.flight_id, fp.passenger_id, COUNT(*) AS links
+                    FROM flight_data.flight_passengers fp
+                    WHERE fp.flight_id IN (SELECT flight_id FROM conn_changes)
+                      AND fp.passenger_id IS NOT NULL
+                    GROUP BY fp.flight_id, fp.passenger_id
                 )
-                SELECT DISTINCT
-                    p1.id,
-                    p2.id,
-                    'co_traveler',
-                    LEAST(10, shared_flights * 2),
-                    shared_flights,
-                    min_date,
-                    max_date,
-                    'unknown'
-                FROM (
-                    SELECT 
-                        fp1.passenger_id as passenger1_id,
-                        fp2.passenger_id as passenger2_id,
-                        COUNT(*) as shared_flights,
-                        MIN(f.flight_date) as min_date,
-                        MAX(f.flight_date) as max_date
-                    FROM flight_data.flight_passengers fp1
-                    JOIN flight_data.flight_passengers fp2 ON fp1.flight_id = fp2.flight_id 
-                        AND fp1.passenger_id < fp2.passenger_id
-                    JOIN flight_data.flights f ON fp1.flight_id = f.id
-                    GROUP BY fp1.passenger_id, fp2.passenger_id
-                    HAVING COUNT(*) > 1
-                ) shared_flight_data
-                JOIN flight_data.passengers p1 ON shared_flight_data.passenger1_id = p1.id
-                JOIN flight_data.passengers p2 ON shared_flight_data.passenger2_id = p2.id
-                ON CONFLICT (passenger1_id, passenger2_id) DO UPDATE SET
-                    shared_flights_count = EXCLUDED.shared_flights_count,
-                    connection_strength = EXCLUDED.connection_strength,
-                    last_documented_interaction = EXCLUDED.last_documented_interaction;
+                SELECT COALESCE(c.flight_id, n.flight_id) AS flight_id,
+                       COALESCE(c.passenger_id, n.passenger_id) AS passenger_id,
+                       COALESCE(c.links, 0) > 0 AS present_after,
+                       COALESCE(c.links, 0) - COALESCE(n.net, 0) > 0 AS present_before
+                FROM current_links c
+                FULL JOIN net n ON n.flight_id = c.flight_id AND n.passenger_id = c.passenger_id;
+                
+                CREATE TEMP TABLE conn_shrunk ON COMMIT DROP AS
+                SELECT DISTINCT flight_id FROM conn_members
+                WHERE present_before AND NOT present_after;
+            """)
+            
+            # Pairs that appeared on flights that only gained passengers
+            self.cursor.execute("""
+                CREATE TEMP TABLE conn_increments ON COMMIT DROP AS
+                SELECT a.passenger_id AS p1, b.passenger_id AS p2, COUNT(*) AS added,
+                       MIN(f.flight_date) AS first_date, MAX(f.flight_date) AS last_date
+                FROM conn_members a
+                JOIN conn_members b ON b.flight_id = a.flight_id AND a.passenger_id < b.passenger_id
+                JOIN flight_data.flights f ON f.id = a.flight_id
+                WHERE a.present_after AND b.present_after
+                  AND NOT (a.present_before AND b.present_before)
+                  AND a.flight_id NOT IN (SELECT flight_id FROM conn_shrunk)
+                GROUP BY a.passenger_id, b.passenger_id
+            """)
+            
+            # Pairs that need an exact count: changed on a shrunk flight, or
+            # gained a flight without having a stored row yet
+            self.cursor.execute("""
+                CREATE TEMP TABLE conn_recount ON COMMIT DROP AS
+                SELECT a.passenger_id AS p1, b.passenger_id AS p2
+                FROM conn_members a
+                JOIN conn_members b ON b.flight_id = a.flight_id AND a.passenger_id < b.passenger_id
+                WHERE a.flight_id IN (SELECT flight_id FROM conn_shrunk)
+                  AND (a.present_before AND b.present_before) <> (a.present_after AND b.present_after)
+                UNION
+                SELECT i.p1, i.p2
+                FROM conn_increments i
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM investigation.passenger_connections c
+                    WHERE LEAST(c.passenger1_id, c.passenger2_id) = i.p1
+                      AND GREATEST(c.passenger1_id, c.passenger2_id) = i.p2
+                );
+                
+                DELETE FROM conn_increments i
+                USING conn_recount r
+                WHERE r.p1 = i.p1 AND r.p2 = i.p2;
+            """)
+            
+            self.cursor.execute("""
+                UPDATE investigation.passenger_connections c
+                SET shared_flights_count = COALESCE(c.shared_flights_count, 0) + i.added,
+                    first_documented_interaction = LEAST(c.first_documented_interaction, i.first_date),
+                    last_documented_interaction = GREATEST(c.last_documented_interaction, i.last_date),
+                    connection_strength = CASE
+                        WHEN c.connection_type = 'co_traveler'
+                        THEN LEAST(10, (COALESCE(c.shared_flights_count, 0) + i.added) * 2)
+                        ELSE c.connection_strength
+                    END,
+                    updated_at = NOW()
+                FROM conn_increments i
+                WHERE LEAST(c.passenger1_id, c.passenger2_id) = i.p1
+                  AND GREATEST(c.passenger1_id, c.passenger2_id) = i.p2
             """)
+            incremented = self.cursor.rowcount
             
-            self.stats['connections_created'] = self.cursor.rowcount
+            self.cursor.execute(f"""
+                CREATE TEMP TABLE conn_totals ON COMMIT DROP AS
+                {self._PAIR_RECOUNT_SQL}
+            """)
+            recounted = self.cursor.rowcount
+            created, updated, removed = self._apply_connection_totals()
             self.connection.commit()
             
-            logger.info(f"Created {self.stats['connections_created']} passenger connections")
+            logger.info(f"Applied {queued} queued link changes in {time.perf_counter() - started:.2f}s: "
+                        f"{incremented} connections incremented, {recounted} pairs recounted "
+                        f"({created} created, {updated} updated, {removed} removed)")
             
         except Exception as e:
-            logger.error(f"Failed to create connections: {e}")
+            self.connection.rollback()
+            logger.error(f"Failed to update connections: {e}")
             self.stats['errors'] += 1
     
-    def create_flight_patterns(self):
-        """Analyze and create flight pattern records"""
-        logger.info("Analyzing flight patterns...")
+    def verify_connections(self, max_report: int = 20) -> int:
+        """Compare stored passenger connections with a full rebuild
+        
+        Nothing is written. Returns the number of pairs whose stored flight
+        count or dates differ from the rebuild, including pairs missing from
+        either side.
+        """
+        logger.info("Verifying passenger connections against a full rebuild...")
         
         try:
+            self.cursor.execute("SELECT COUNT(*) AS queued FROM investigation.connection_changes")
+            queued = self.cursor.fetchone()['queued']
+            if queued:
+                logger.warning(f"{queued} queued link changes are not applied yet; "
+                               f"the next import run applies them")
+            
+            self._build_full_connection_totals()
             self.cursor.execute("""
-                INSERT INTO investigation.flight_patterns (
-                    pattern_name,
-                    pattern_type,
-                    description,
-                    involved_flights,
-                    frequency_count,
-                    date_range_start,
-                    date_range_end,
-                    risk_assessment
-                )
-                SELECT 
-                    dl.airport_code || ' to ' || al.airport_code || ' Route',
-                    'frequent_route',
-                    'Route flown ' || COUNT(*) || ' times between ' || MIN(f.flight_date) || ' and ' || MAX(f.flight_date),
-                    array_agg(f.id),
-                    COUNT(*),
-                    MIN(f.flight_date),
-                    MAX(f.flight_date),
-                    CASE 
-                        WHEN COUNT(*) > 10 THEN 'high'
-                        WHEN COUNT(*) > 5 THEN 'medium'
-                        ELSE 'low'
-                    END
-                FROM flight_data.flights f
-                JOIN flight_data.locations dl ON f.departure_location_id = dl.id
-                JOIN flight_data.locations al ON f.arrival_location_id = al.id
-                GROUP BY dl.airport_code, al.airport_code, dl.id, al.id
-                HAVING COUNT(*) > 2;
+                SELECT COALESCE(t.p1, s.p1) AS p1, COALESCE(t.p2, s.p2) AS p2,
+                       s.connection_type,
+                       s.shared_flights_count AS stored_count, t.shared AS expected_count,
+                       s.first_documented_interaction AS stored_first, t.first_date AS expected_first,
+                       s.last_documented_interaction AS stored_last, t.last_date AS expected_last
+                FROM (
+                    SELECT * FROM conn_totals
+                    WHERE shared > 1 OR (p1, p2) IN (
+                        SELECT LEAST(passenger1_id, passenger2_id), GREATEST(passenger1_id, passenger2_id)
+                        FROM investigation.passenger_connections
+                        WHERE connection_type IS DISTINCT FROM 'co_traveler'
+                    )
+                ) t
+                FULL JOIN (
+                    SELECT LEAST(passenger1_id, passenger2_id) AS p1,
+                           GREATEST(passenger1_id, passenger2_id) AS p2,
+                           connection_type, shared_flights_count,
+                           first_documented_interaction, last_documented_interaction
+                    FROM investigation.passenger_connections
+                ) s ON s.p1 = t.p1 AND s.p2 = t.p2
+                WHERE (s.shared_flights_count, s.first_documented_interaction, s.last_documented_interaction)
+                      IS DISTINCT FROM (t.shared, t.first_date, t.last_date)
+                ORDER BY 1, 2
             """)
+            mismatches = self.cursor.fetchall()
             
-            patterns_created = self.cursor.rowcount
+            self.cursor.execute("SELECT COUNT(*) AS pairs FROM investigation.passenger_connections")
+            stored = self.cursor.fetchone()['pairs']
+        finally:
+            self.connection.rollback()
+        
+        for row in mismatches[:max_report]:
+            logger.warning(f"Connection {row['p1']} / {row['p2']} ({row['connection_type'] or 'missing'}): "
+                           f"stored {row['stored_count']} flights {row['stored_first']}..{row['stored_last']}, "
+                           f"rebuild {row['expected_count']} flights "
+                           f"{row['expected_first']}..{row['expected_last']}")
+        if len(mismatches) > max_report:
+            logger.warning(f"... and {len(mismatches) - max_report} more")
+        
+        if mismatches:
+            logger.error(f"Connection verification failed: {len(mismatches)} of {stored} pairs differ")
+        else:
+            logger.info(f"Connection verification passed: {stored} pairs match a full rebuild")
+        return len(mismatches)
+    
+    def update_route_distances(self) -> Dict[Tuple[str, str], float]:
+        """Refresh flight_data.route_distances for the routes now in use
+        
+        Returns (departure code, arrival code) -> km; routes whose airports
+        have no coordinates yet are left out.
+        """
+        started = time.perf_counter()
+        try:
+            from load_airports import refresh_route_distances
+            
+            distances = refresh_route_distances(self.connection)
             self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            logger.error(f"Failed to refresh route distances: {e}")
+            self.stats['errors'] += 1
+            return {}
+        
+        logger.info(f"Stored distances for {len(distances)} routes in {time.perf_counter() - started:.2f}s")
+        return distances
+    
+    def create_flight_patterns(self):
+        """Mine flight patterns into investigation.flight_patterns
+
+        Runs the single-pass miner in mine_patterns.py on this connection;
+        patterns are upserted by (type, name), so re-running is idempotent.
+        """
+        logger.info("Analyzing flight patterns...")
+        
+        try:
+            from mine_patterns import FlightPatternMiner
+            
+            miner = FlightPatternMiner(self.db_config, connection=self.connection)
+            miner.connect_database()
+            miner.run()
+            miner.close_connection()
             
-            logger.info(f"Created {patterns_created} flight patterns")
+            logger.info(f"Mined {len(miner.patterns)} flight patterns "
+                        f"({miner.stats['patterns_written']} written, "
+                        f"{miner.stats['patterns_removed']} removed)")
             
         except Exception as e:
+            self.connection.rollback()
             logger.error(f"Failed to create flight patterns: {e}")
             self.stats['errors'] += 1
     
@@ -483,7 +1594,10 @@ class FlightDataImporter:
         logger.info("="*50)
         logger.info("FLIGHT DATA IMPORT SUMMARY")
         logger.info("="*50)
-        logger.info(f"Flights Imported: {self.stats['flights_imported']}")
+        logger.info(f"Flights Imported: {self.stats['flights_imported']} "
+                   f"(inserted: {self.stats['flights_inserted']}, "
+                   f"updated: {self.stats['flights_updated']}, "
+                   f"unchanged: {self.stats['flights_unchanged']})")
         logger.info(f"Passengers Created: {self.stats['passengers_created']}")
         logger.info(f"Locations Created: {self.stats['locations_created']}")
         logger.info(f"Connections Created: {self.stats['connections_created']}")
@@ -498,8 +1612,60 @@ class FlightDataImporter:
             self.connection.close()
         logger.info("Database connection closed")
 
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description='Import flight log CSV data into PostgreSQL')
+    parser.add_argument('csv_file', nargs='?',
+                        help='CSV file to import (default: flight_flights_table.csv in the project root)')
+    parser.add_argument('--bulk', action='store_true',
+                        help='Load through COPY staging tables and set-based inserts')
+    parser.add_argument('--vectorized', action='store_true',
+                        help='Parse with the pandas normalization stage (implies --bulk)')
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help='Parse in N worker processes feeding one COPY loader (implies --bulk)')
+    parser.add_argument('--chunk-mb', type=int, default=8,
+                        help='Byte range handed to each worker task in pipeline mode (default: 8)')
+    parser.add_argument('--delta', action='store_true',
+                        help='Skip rows already stored with the same content hash '
+                             '(row-by-row mode; --bulk always compares hashes)')
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help='Rows per committed transaction in row-by-row mode (default: 500)')
+    parser.add_argument('--bulk-audit', action='store_true',
+                        help='Audit each committed batch with one summary entry '
+                             'instead of one audit row per changed row')
+    parser.add_argument('--rebuild-connections', action='store_true',
+                        help='Rebuild passenger connections from all flights instead of '
+                             'applying only the queued changes')
+    parser.add_argument('--verify-connections', action='store_true',
+                        help='Only compare stored passenger connections with a full rebuild '
+                             'and exit non-zero on differences')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted row-by-row import of the same file '
+                             'from its last committed batch')
+    parser.add_argument('--validate', action='store_true',
+                        help='Only parse the file and write a JSON quality report; '
+                             'no database connection is made')
+    parser.add_argument('--snapshot', metavar='PATH',
+                        help='With --validate: compare against a snapshot of the database keys '
+                             'for unknown airports, new names and stored flights')
+    parser.add_argument('--save-snapshot', metavar='PATH',
+                        help='Write a snapshot of passenger, location and flight keys for --validate and exit')
+    parser.add_argument('--report', metavar='PATH', default='flight_validation_report.json',
+                        help='With --validate: report file (default: flight_validation_report.json)')
+    return parser.parse_args()
+
 def main():
     """Main import function"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('flight_import.log'),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+    args = parse_args()
+    
     # Database configuration
     db_config = {
         'host': os.getenv('DATABASE_HOST', 'localhost'),
@@ -510,18 +1676,51 @@ def main():
     }
     
     # CSV file path
-    csv_file = os.path.join(
+    csv_file = args.csv_file or os.path.join(
         os.path.dirname(os.path.dirname(__file__)), 
         'flight_flights_table.csv'
     )
     
+    if args.validate or args.save_snapshot:
+        from validate_flights import FlightDumpValidator, print_report_summary, write_report
+        
+        validator = FlightDumpValidator(db_config)
+        if args.save_snapshot:
+            try:
+                validator.connect_database()
+                validator.save_snapshot(args.save_snapshot)
+            finally:
+                validator.close_connection()
+            return
+        
+        if args.snapshot:
+            validator.load_snapshot(args.snapshot)
+        report = validator.validate_csv_file(csv_file)
+        write_report(report, args.report)
+        print_report_summary(report)
+        sys.exit(1 if report['rows']['skipped'] else 0)
+    
     # Create importer and run import
     importer = FlightDataImporter(db_config)
+    importer.bulk_audit = args.bulk_audit
     
     try:
         importer.connect_database()
-        importer.import_csv_file(csv_file)
-        importer.analyze_and_create_connections()
+        if args.verify_connections:
+            sys.exit(1 if importer.verify_connections() else 0)
+        if args.workers:
+            importer.pipeline_import_csv_file(csv_file, workers=args.workers,
+                                              chunk_bytes=args.chunk_mb * 1024 * 1024)
+        elif args.bulk or args.vectorized:
+            importer.bulk_import_csv_file(csv_file, vectorized=args.vectorized)
+        else:
+            importer.import_csv_file(csv_file, delta=args.delta,
+                                     batch_size=args.batch_size, resume=args.resume)
+        if args.rebuild_connections:
+            importer.analyze_and_create_connections()
+        else:
+            importer.update_connections()
+        importer.update_route_distances()
         importer.create_flight_patterns()
         importer.print_import_summary()
         
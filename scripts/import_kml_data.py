@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+KML Flight Data Import Script for Creepstate Investigation Platform Database
+Streams flightlogs_flightgraph.kml, reconciles its flights with the CSV import
+and fills airport coordinates in flight_data.locations
+"""
+
+import argparse
+import io
+import logging
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+from import_csv_data import FlightDataImporter
+
+logger = logging.getLogger(__name__)
+
+# Same patterns as kml-parser.js so both importers read a placemark alike
+FLIGHT_NAME_PATTERN = re.compile(r'Flight\s+(\w+)\s+(\d{8})', re.IGNORECASE)
+PASSENGERS_PATTERN = re.compile(r'Passengers:\s*([^\n\r]+)', re.IGNORECASE)
+ROUTE_PATTERN = re.compile(r'Origin:\s*(\w+)\s*->\s*Destination:\s*(\w+)', re.IGNORECASE)
+
+# Endpoints of one airport further apart than this (degrees) are reported
+COORDINATE_TOLERANCE = 0.01
+
+def _local_name(tag: str) -> str:
+    """Strip the '{namespace}' prefix ElementTree puts on KML tags"""
+    return tag.rsplit('}', 1)[-1]
+
+def _child_text(element, name: str) -> str:
+    """Text of the first descendant with the given local name"""
+    for child in element.iter():
+        if _local_name(child.tag) == name:
+            return (child.text or '').strip()
+    return ''
+
+def parse_coordinates(text: str) -> List[Tuple[float, float]]:
+    """Parse a KML coordinates string into (longitude, latitude) pairs"""
+    points = []
+    for token in text.split():
+        parts = token.split(',')
+        if len(parts) < 2:
+            continue
+        try:
+            points.append((float(parts[0]), float(parts[1])))
+        except ValueError:
+            continue
+    return points
+
+def parse_placemark(placemark) -> Optional[Dict]:
+    """Extract a flight from one Placemark, or None when it is not a flight"""
+    name_match = FLIGHT_NAME_PATTERN.search(_child_text(placemark, 'name'))
+    if not name_match:
+        return None
+
+    description = _child_text(placemark, 'description')
+    route_match = ROUTE_PATTERN.search(description)
+    passengers_match = PASSENGERS_PATTERN.search(description)
+    points = parse_coordinates(_child_text(placemark, 'coordinates'))
+
+    return {
+        'flight_number': name_match.group(1),
+        'date': name_match.group(2),
+        'departure_code': route_match.group(1).upper() if route_match else '',
+        'arrival_code': route_match.group(2).upper() if route_match else '',
+        'passengers': passengers_match.group(1).strip() if passengers_match else '',
+        'origin': points[0] if points else None,
+        'destination': points[-1] if len(points) > 1 else None,
+    }
+
+def iter_kml_flights(kml_file_path: str) -> Iterator[Optional[Dict]]:
+    """Stream flights from a KML file in constant memory
+
+    Yields one dict per Placemark (None for placemarks that are not flights).
+    Each Placemark is detached from its parent once parsed, so the tree never
+    holds more than the placemark being read.
+    """
+    parents = []
+    for event, element in ET.iterparse(kml_file_path, events=('start', 'end')):
+        if event == 'start':
+            parents.append(element)
+            continue
+
+        parents.pop()
+        if _local_name(element.tag) != 'Placemark':
+            continue
+
+        yield parse_placemark(element)
+        element.clear()
+        if parents:
+            parents[-1].remove(element)
+
+class KMLFlightImporter(FlightDataImporter):
+    def __init__(self, db_config: Dict[str, str]):
+        super().__init__(db_config)
+        self.stats.update({
+            'placemarks_read': 0,
+            'placemarks_skipped': 0,
+            'flights_conflicting': 0,
+            'coordinates_filled': 0,
+            'coordinate_conflicts': 0
+        })
+        self.source_document = 'flightlogs_flightgraph.kml'
+        self.manifest_prefix = 'KML_IMPORT'
+
+        # Airport code -> (longitude, latitude) of the first endpoint seen
+        self.airport_coordinates = {}
+
+    def _record_endpoint(self, airport_code: str, point: Optional[Tuple[float, float]]):
+        """Remember an airport position, reporting endpoints that disagree"""
+        if not airport_code or point is None:
+            return
+        known = self.airport_coordinates.get(airport_code)
+        if known is None:
+            self.airport_coordinates[airport_code] = point
+        elif (abs(known[0] - point[0]) > COORDINATE_TOLERANCE
+              or abs(known[1] - point[1]) > COORDINATE_TOLERANCE):
+            self.stats['coordinate_conflicts'] += 1
+            logger.warning(f"Conflicting coordinates for {airport_code}: "
+                           f"kept {known}, ignored {point}")
+
+    def _stream_into_staging(self, kml_file_path: str, batch_rows: int,
+                             timings: Dict[str, float]) -> int:
+        """Parse placemarks and COPY them into the staging tables in batches"""
+        flights, passengers = [], []
+        staged = 0
+
+        def flush():
+            phase = time.perf_counter()
+            self._copy_into_staging(io.StringIO(''.join(flights)), io.StringIO(''.join(passengers)))
+            timings['copy'] += time.perf_counter() - phase
+            flights.clear()
+            passengers.clear()
+
+        for flight in iter_kml_flights(kml_file_path):
+            self.stats['placemarks_read'] += 1
+            if flight is None:
+                self.stats['placemarks_skipped'] += 1
+                continue
+
+            self._record_endpoint(flight['departure_code'], flight['origin'])
+            self._record_endpoint(flight['arrival_code'], flight['destination'])
+
+            rendered = self.render_stage_rows(self.stats['placemarks_read'], {
+                'Date': flight['date'],
+                'Flight_No': flight['flight_number'],
+                'Departure_Code': flight['departure_code'],
+                'Arrival_Code': flight['arrival_code'],
+                'Passengers': flight['passengers']
+            })
+            if rendered is None:
+                self.stats['placemarks_skipped'] += 1
+                continue
+
+            flights.append(rendered[0])
+            passengers.append(rendered[1])
+            staged += 1
+            if len(flights) >= batch_rows:
+                flush()
+
+        if flights:
+            flush()
+        return staged
+
+    def fill_coordinates(self, overwrite: bool = False) -> int:
+        """Bulk-update locations.coordinates from the collected endpoints
+
+        Only airports without coordinates are filled unless overwrite is set,
+        so positions entered by hand are kept.
+        """
+        if not self.airport_coordinates:
+            return 0
+
+        rows = [(code, lon, lat) for code, (lon, lat) in sorted(self.airport_coordinates.items())]
+        execute_values(self.cursor, f"""
+            UPDATE flight_data.locations l
+            SET coordinates = point(v.lon, v.lat),
+                updated_at = NOW()
+            FROM (VALUES %s) AS v(airport_code, lon, lat)
+            WHERE l.airport_code = v.airport_code
+              {'' if overwrite else 'AND l.coordinates IS NULL'}
+        """, rows, template='(%s, %s::float8, %s::float8)', page_size=1000)
+        filled = self.cursor.rowcount
+        self.stats['coordinates_filled'] += filled
+        return filled
+
+    def import_kml_file(self, kml_file_path: str, update_existing: bool = False,
+                        overwrite_coordinates: bool = False, coordinates_only: bool = False,
+                        batch_rows: int = 5000):
+        """Import flights and airport coordinates from a KML file
+
+        Placemarks are streamed into the bulk loader's staging tables and
+        merged by natural key and content hash, so flights already imported
+        from the CSV are matched rather than duplicated. Stored flights whose
+        manifest differs are kept unless update_existing is set.
+        """
+        if not os.path.exists(kml_file_path):
+            raise FileNotFoundError(f"KML file not found: {kml_file_path}")
+
+        logger.info(f"Starting KML import from {kml_file_path}")
+        self.source_document = os.path.basename(kml_file_path)
+        timings = {'copy': 0.0}
+        started = time.perf_counter()
+        flight_passenger_rows = 0
+
+        try:
+            self._begin_audit_batch(self.source_document)
+            if coordinates_only:
+                for flight in iter_kml_flights(kml_file_path):
+                    self.stats['placemarks_read'] += 1
+                    if flight is None:
+                        self.stats['placemarks_skipped'] += 1
+                        continue
+                    self._record_endpoint(flight['departure_code'], flight['origin'])
+                    self._record_endpoint(flight['arrival_code'], flight['destination'])
+                staged = 0
+                timings['stream'] = time.perf_counter() - started
+            else:
+                self._create_staging_tables()
+                staged = self._stream_into_staging(kml_file_path, batch_rows, timings)
+                timings['stream'] = time.perf_counter() - started
+                flight_passenger_rows, duplicate_rows = self._merge_staging_tables(
+                    timings, update_existing=update_existing)
+                if duplicate_rows:
+                    logger.info(f"Collapsed {duplicate_rows} placemarks repeating a flight already in the file")
+
+            filled = self.fill_coordinates(overwrite=overwrite_coordinates)
+            self._end_audit_batch()
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            logger.error(f"KML import failed, transaction rolled back: {e}")
+            self.stats['errors'] += 1
+            raise
+
+        logger.info(f"Filled coordinates for {filled} of {len(self.airport_coordinates)} airports")
+        timings['total'] = time.perf_counter() - started
+        if not coordinates_only:
+            self.print_throughput_report(staged, flight_passenger_rows, timings)
+
+    def print_import_summary(self):
+        """Print import statistics"""
+        super().print_import_summary()
+        logger.info(f"Placemarks Read: {self.stats['placemarks_read']} "
+                   f"(skipped: {self.stats['placemarks_skipped']})")
+        logger.info(f"Flights Kept (manifest differs): {self.stats['flights_conflicting']}")
+        logger.info(f"Coordinates Filled: {self.stats['coordinates_filled']} "
+                   f"(conflicting endpoints: {self.stats['coordinate_conflicts']})")
+        logger.info("="*50)
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description='Import flight log KML data into PostgreSQL')
+    parser.add_argument('kml_file', nargs='?',
+                        help='KML file to import (default: flightlogs_flightgraph.kml in the project root)')
+    parser.add_argument('--coordinates-only', action='store_true',
+                        help='Only fill airport coordinates; do not import flights')
+    parser.add_argument('--update-existing', action='store_true',
+                        help='Overwrite stored flights whose KML manifest differs '
+                             '(default: keep the CSV-imported version)')
+    parser.add_argument('--overwrite-coordinates', action='store_true',
+                        help='Replace coordinates that are already set')
+    parser.add_argument('--bulk-audit', action='store_true',
+                        help='Audit the import with one summary entry instead of one audit row per changed row')
+    parser.add_argument('--batch-rows', type=int, default=5000,
+                        help='Placemarks per COPY batch (default: 5000)')
+    return parser.parse_args()
+
+def main():
+    """Main import function"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args()
+
+    # Database configuration
+    db_config = {
+        'host': os.getenv('DATABASE_HOST', 'localhost'),
+        'port': os.getenv('DATABASE_PORT', 5432),
+        'database': os.getenv('DATABASE_NAME', 'creepstate_flights_db'),
+        'user': os.getenv('DATABASE_USER', 'flight_admin'),
+        'password': os.getenv('DATABASE_PASSWORD', 'secure_admin_pass_2024!')
+    }
+
+    kml_file = args.kml_file or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        'flightlogs_flightgraph.kml'
+    )
+
+    importer = KMLFlightImporter(db_config)
+    importer.bulk_audit = args.bulk_audit
+
+    try:
+        importer.connect_database()
+        importer.import_kml_file(kml_file,
+                                 update_existing=args.update_existing,
+                                 overwrite_coordinates=args.overwrite_coordinates,
+                                 coordinates_only=args.coordinates_only,
+                                 batch_rows=args.batch_rows)
+        if not args.coordinates_only:
+            importer.update_connections()
+            importer.create_flight_patterns()
+        importer.update_route_distances()
+        importer.print_import_summary()
+
+    except Exception as e:
+        logger.error(f"Import failed: {e}")
+        raise
+    finally:
+        importer.close_connection()
+
+if __name__ == "__main__":
+    main()
@@ -88,6 +88,9 @@ if [ "$FLIGHT_COUNT" -eq "0" ]; then
     export DATABASE_USER=$DB_USER
     export DATABASE_PASSWORD=$DB_PASSWORD
     
+    echo "🛫 Loading airport reference data..."
+    python3 load_airports.py || echo "⚠️  Airport reference load failed, continuing with placeholder locations"
+    
     echo "🚀 Starting flight data import..."
     
     if python3 import_csv_data.py; then
@@ -156,6 +159,12 @@ else
     echo "⚠️  Database functions may have issues, but continuing..."
 fi
 
+# Create upcoming audit log partitions and apply retention
+echo "🗂️  Maintaining audit log partitions..."
+(cd "$(dirname "$0")" && DATABASE_HOST=$DB_HOST DATABASE_PORT=$DB_PORT DATABASE_NAME=$DB_NAME \
+    DATABASE_USER=$DB_USER DATABASE_PASSWORD=$DB_PASSWORD python3 maintain_partitions.py) \
+    || echo "⚠️  Audit log partition maintenance failed, new rows go to the default partitions"
+
 # Set up database optimization
 echo "⚙️  Running database optimization..."
 
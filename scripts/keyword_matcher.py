@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Multi-Keyword Matcher for Creepstate Research Tools
+Aho-Corasick automaton compiled once from categorized keyword sets, so a text
+is scanned in a single pass for every keyword instead of once per keyword.
+Shared by auto-research.py and fact-checker.py for distraction and relevance
+scoring. Run directly to benchmark it against per-keyword scanning.
+"""
+
+import argparse
+import random
+import time
+from collections import Counter, deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+class KeywordMatcher:
+    """Case-insensitive substring matcher over {category: keywords}
+
+    Matches have the same semantics as `keyword.lower() in text.lower()`:
+    keywords match anywhere, including inside longer words. A keyword may
+    belong to several categories and is reported under each of them.
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        self.categories = {category: list(keywords) for category, keywords in categories.items()}
+
+        # Keyword trie; state 0 is the root
+        goto: List[Dict[str, int]] = [{}]
+        own_outputs: List[List[Tuple[str, str]]] = [[]]
+        for category, keywords in self.categories.items():
+            for keyword in keywords:
+                state = 0
+                for char in keyword.lower():
+                    if char not in goto[state]:
+                        goto.append({})
+                        own_outputs.append([])
+                        goto[state][char] = len(goto) - 1
+                    state = goto[state][char]
+                if (category, keyword) not in own_outputs[state]:
+                    own_outputs[state].append((category, keyword))
+
+        # Fold failure links into a complete transition table over the
+        # keyword alphabet, breadth first, so a scan step is a single dict
+        # lookup; characters outside the alphabet return to the root.
+        self._transitions: List[Dict[str, int]] = [{} for _ in goto]
+        self._outputs: List[Optional[Tuple[Tuple[str, str], ...]]] = [None for _ in goto]
+        fail = [0] * len(goto)
+        self._transitions[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        for state in queue:
+            self._transitions[state] = {**self._transitions[0], **goto[state]}
+            self._outputs[state] = tuple(own_outputs[state]) or None
+        while queue:
+            state = queue.popleft()
+            for char, child in goto[state].items():
+                fail[child] = self._transitions[fail[state]].get(char, 0)
+                self._transitions[child] = {**self._transitions[fail[child]], **goto[child]}
+                inherited = self._outputs[fail[child]] or ()
+                self._outputs[child] = tuple(own_outputs[child]) + inherited or None
+                queue.append(child)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[str, str]]:
+        """(category, keyword) for every keyword occurrence in the text"""
+        transitions, outputs = self._transitions, self._outputs
+        state = 0
+        for char in text.lower():
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                yield from outputs[state]
+
+    def scan(self, text: str) -> Dict[str, Counter]:
+        """Occurrences of each matched keyword, grouped by category"""
+        hits: Dict[str, Counter] = {}
+        for category, keyword in self.iter_matches(text):
+            hits.setdefault(category, Counter())[keyword] += 1
+        return hits
+
+    def counts(self, text: str) -> Counter:
+        """Total keyword occurrences per category"""
+        return Counter(category for category, _ in self.iter_matches(text))
+
+def _synthetic_articles(keywords: List[str], count: int, words: int) -> List[str]:
+    """Articles of filler words with a sprinkling of keywords"""
+    filler = ['the', 'report', 'said', 'officials', 'according', 'to', 'sources', 'on', 'monday',
+              'statement', 'new', 'policy', 'press', 'conference', 'after', 'week', 'of', 'talks']
+    rng = random.Random(42)
+    return [' '.join(rng.choice(keywords) if rng.random() < 0.03 else rng.choice(filler)
+                     for _ in range(words))
+            for _ in range(count)]
+
+def benchmark(articles: int = 2000, words: int = 400):
+    """Time category counts for auto-research's keyword sets, per keyword against one pass"""
+    import importlib.util
+    import os
+
+    spec = importlib.util.spec_from_file_location(
+        'auto_research', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'auto-research.py'))
+    auto_research = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(auto_research)
+    categories = auto_research.AnonymousResearcher().keyword_matcher.categories
+
+    texts = _synthetic_articles([k for keywords in categories.values() for k in keywords], articles, words)
+    lowered_categories = {name: [k.lower() for k in keywords] for name, keywords in categories.items()}
+
+    started = time.perf_counter()
+    expected = []
+    for text in texts:
+        lowered = text.lower()
+        expected.append(Counter({name: sum(lowered.count(k) for k in keywords)
+                                 for name, keywords in lowered_categories.items()}))
+    per_keyword = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matcher = KeywordMatcher(categories)
+    compile_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    found = [matcher.counts(text) for text in texts]
+    one_pass = time.perf_counter() - started
+
+    characters = sum(len(text) for text in texts)
+    keywords = sum(len(k) for k in categories.values())
+    print(f"{articles} articles, {characters / 1e6:.1f}M characters, "
+          f"{keywords} keywords in {len(categories)} categories")
+    print(f"per-keyword str.count: {per_keyword:.3f}s")
+    print(f"aho-corasick one pass: {one_pass:.3f}s (compile {compile_time * 1000:.1f}ms)")
+    print(f"results identical: {all(+a == +b for a, b in zip(expected, found))}")
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Benchmark the Aho-Corasick keyword matcher')
+    parser.add_argument('--articles', type=int, default=2000,
+                        help='Synthetic articles scanned (default: 2000)')
+    parser.add_argument('--words', type=int, default=400,
+                        help='Words per article (default: 400)')
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    benchmark(args.articles, args.words)
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Airport Reference Loader for Creepstate Investigation Platform
+Bulk-loads database/reference/airports.csv into flight_data.locations with a
+single COPY and precomputes the great-circle distance of every route in use
+"""
+
+import argparse
+import csv
+import io
+import logging
+import os
+from typing import Dict, Tuple
+
+import numpy as np
+
+from import_csv_data import FlightDataImporter
+
+logger = logging.getLogger(__name__)
+
+AIRPORT_REFERENCE_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'database', 'reference', 'airports.csv'
+)
+
+REFERENCE_COLUMNS = [
+    'airport_code', 'icao_code', 'iata_code', 'airport_name', 'city', 'state_province',
+    'country', 'latitude', 'longitude', 'elevation_ft', 'facility_type', 'is_international',
+    'timezone'
+]
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_NAUTICAL_MILE = 1.852
+
+# Locations created by the importers for codes they had never seen
+PLACEHOLDER_NAME_PREFIX = 'Unknown Airport - '
+
+def great_circle_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Haversine distance in km between arrays of points given in degrees"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def refresh_route_distances(connection) -> Dict[Tuple[str, str], float]:
+    """Store the great-circle distance of every departure/arrival pair in use
+
+    Distances are computed for all routes at once with NumPy and upserted
+    into flight_data.route_distances; routes no longer flown, or whose
+    airports lost their coordinates, are removed. Returns
+    (departure code, arrival code) -> km. The caller commits.
+    """
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT DISTINCT f.departure_location_id, f.arrival_location_id,
+               dl.airport_code, al.airport_code,
+               dl.coordinates[1], dl.coordinates[0], al.coordinates[1], al.coordinates[0]
+        FROM flight_data.flights f
+        JOIN flight_data.locations dl ON f.departure_location_id = dl.id
+        JOIN flight_data.locations al ON f.arrival_location_id = al.id
+        WHERE dl.coordinates IS NOT NULL AND al.coordinates IS NOT NULL
+    """)
+    routes = cursor.fetchall()
+
+    distances = {}
+    buffer = io.StringIO()
+    if routes:
+        _, _, _, _, lat1, lon1, lat2, lon2 = zip(*routes)
+        kilometres = great_circle_km(lat1, lon1, lat2, lon2)
+        for route, km in zip(routes, kilometres.tolist()):
+            distances[(route[2], route[3])] = km
+            buffer.write(FlightDataImporter._copy_row((
+                route[0], route[1], round(km, 1), round(km / KM_PER_NAUTICAL_MILE, 1)
+            )))
+    buffer.seek(0)
+
+    cursor.execute("""
+        CREATE TEMP TABLE stage_route_distances (
+            departure_location_id UUID,
+            arrival_location_id UUID,
+            distance_km NUMERIC(8,1),
+            distance_nm NUMERIC(8,1)
+        ) ON COMMIT DROP
+    """)
+    cursor.copy_expert("COPY stage_route_distances FROM STDIN", buffer)
+    cursor.execute("""
+        INSERT INTO flight_data.route_distances
+            (departure_location_id, arrival_location_id, distance_km, distance_nm)
+        SELECT departure_location_id, arrival_location_id, distance_km, distance_nm
+        FROM stage_route_distances
+        ON CONFLICT (departure_location_id, arrival_location_id) DO UPDATE SET
+            distance_km = EXCLUDED.distance_km,
+            distance_nm = EXCLUDED.distance_nm,
+            computed_at = NOW()
+        WHERE route_distances.distance_km IS DISTINCT FROM EXCLUDED.distance_km
+    """)
+    cursor.execute("""
+        DELETE FROM flight_data.route_distances rd
+        WHERE NOT EXISTS (
+            SELECT 1 FROM stage_route_distances s
+            WHERE s.departure_location_id = rd.departure_location_id
+              AND s.arrival_location_id = rd.arrival_location_id
+        )
+    """)
+    cursor.execute("DROP TABLE stage_route_distances")
+    cursor.close()
+    return distances
+
+class AirportReferenceLoader(FlightDataImporter):
+    def __init__(self, db_config: Dict[str, str]):
+        super().__init__(db_config)
+        self.stats.update({
+            'airports_read': 0,
+            'locations_inserted': 0,
+            'locations_updated': 0,
+            'route_distances': 0
+        })
+        self.source_document = os.path.basename(AIRPORT_REFERENCE_FILE)
+
+        # (departure code, arrival code) -> great-circle km, after refresh
+        self.route_distances = {}
+
+    def _render_reference_rows(self, reference_path: str) -> io.StringIO:
+        """Validate the reference CSV and render it as COPY text"""
+        buffer = io.StringIO()
+        seen = set()
+        with open(reference_path, 'r', encoding='utf-8', newline='') as handle:
+            reader = csv.DictReader(handle)
+            missing = [column for column in REFERENCE_COLUMNS if column not in (reader.fieldnames or [])]
+            if missing:
+                raise ValueError(f"Airport reference file {reference_path} lacks columns: {', '.join(missing)}")
+
+            for line_no, row in enumerate(reader, start=2):
+                code = (row.get('airport_code') or '').upper().strip()
+                try:
+                    latitude, longitude = float(row['latitude']), float(row['longitude'])
+                except (TypeError, ValueError):
+                    logger.error(f"{reference_path}:{line_no}: invalid coordinates for {code or 'row'}")
+                    self.stats['errors'] += 1
+                    continue
+                if not code or code in seen or not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                    logger.error(f"{reference_path}:{line_no}: missing, duplicate or out-of-range airport {code!r}")
+                    self.stats['errors'] += 1
+                    continue
+                seen.add(code)
+
+                buffer.write(self._copy_row((
+                    code, row.get('airport_name') or None, row.get('city') or None,
+                    row.get('state_province') or None, (row.get('country') or '').upper() or None,
+                    latitude, longitude, row.get('elevation_ft') or None,
+                    row.get('facility_type') or None,
+                    't' if (row.get('is_international') or '').lower() == 'true' else 'f',
+                    row.get('timezone') or None
+                )))
+        self.stats['airports_read'] = len(seen)
+        buffer.seek(0)
+        return buffer
+
+    def load_reference_file(self, reference_path: str = AIRPORT_REFERENCE_FILE, overwrite: bool = False):
+        """COPY the reference file into flight_data.locations
+
+        Codes not stored yet are inserted. Placeholder locations created by
+        the importers ('Unknown Airport - XXX') take every reference value;
+        other stored locations only have empty columns filled, unless
+        overwrite is set. The returned ids fill location_cache.
+        """
+        if not os.path.exists(reference_path):
+            raise FileNotFoundError(f"Airport reference file not found: {reference_path}")
+
+        logger.info(f"Loading airport reference data from {reference_path}")
+        self.source_document = os.path.basename(reference_path)
+        buffer = self._render_reference_rows(reference_path)
+
+        placeholder = f"locations.airport_name LIKE '{PLACEHOLDER_NAME_PREFIX}%'"
+
+        def merged(column: str) -> str:
+            """Value a stored location ends up with for one column"""
+            if overwrite:
+                return f"EXCLUDED.{column}"
+            if column == 'is_international':
+                return f"CASE WHEN {placeholder} THEN EXCLUDED.{column} ELSE locations.{column} END"
+            return (f"CASE WHEN {placeholder} THEN COALESCE(EXCLUDED.{column}, locations.{column}) "
+                    f"ELSE COALESCE(locations.{column}, EXCLUDED.{column}) END")
+
+        columns = ['airport_name', 'city', 'state_province', 'country', 'coordinates',
+                   'elevation_ft', 'facility_type', 'is_international', 'timezone']
+        assignments = ',\n                    '.join(f"{column} = {merged(column)}" for column in columns)
+        # point has no equality operator, so coordinates are compared as text
+        stored = ', '.join(f"locations.{column}::text" if column == 'coordinates' else f"locations.{column}"
+                           for column in columns)
+        incoming = ', '.join(f"({merged(column)})::text" if column == 'coordinates' else merged(column)
+                             for column in columns)
+
+        try:
+            self._begin_audit_batch(self.source_document)
+            self.cursor.execute("""
+                CREATE TEMP TABLE stage_airports (
+                    airport_code VARCHAR(10),
+                    airport_name VARCHAR(255),
+                    city VARCHAR(100),
+                    state_province VARCHAR(100),
+                    country CHAR(2),
+                    latitude FLOAT8,
+                    longitude FLOAT8,
+                    elevation_ft INTEGER,
+                    facility_type VARCHAR(50),
+                    is_international BOOLEAN,
+                    timezone VARCHAR(50)
+                ) ON COMMIT DROP
+            """)
+            self.cursor.copy_expert("COPY stage_airports FROM STDIN", buffer)
+
+            self.cursor.execute(f"""
+                INSERT INTO flight_data.locations AS locations (
+                    airport_code, airport_name, city, state_province, country, coordinates,
+                    elevation_ft, facility_type, is_international, timezone
+                )
+                SELECT airport_code, airport_name, city, state_province, country,
+                       point(longitude, latitude), elevation_ft, facility_type,
+                       is_international, timezone
+                FROM stage_airports
+                ON CONFLICT (airport_code) DO UPDATE SET
+                    {assignments},
+                    updated_at = NOW()
+                WHERE ({stored}) IS DISTINCT FROM ({incoming})
+                RETURNING id, airport_code, (xmax = 0) AS inserted
+            """)
+
+            for row in self.cursor.fetchall():
+                self.location_cache[row['airport_code'].upper()] = row['id']
+                self.stats['locations_inserted' if row['inserted'] else 'locations_updated'] += 1
+            self.stats['locations_created'] += self.stats['locations_inserted']
+
+            self._end_audit_batch()
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            logger.error(f"Airport reference load failed, transaction rolled back: {e}")
+            self.stats['errors'] += 1
+            raise
+
+        logger.info(f"Loaded {self.stats['airports_read']} reference airports: "
+                    f"{self.stats['locations_inserted']} inserted, "
+                    f"{self.stats['locations_updated']} updated")
+
+    def update_route_distances(self) -> Dict[Tuple[str, str], float]:
+        """Refresh flight_data.route_distances and keep the distances in memory"""
+        self.route_distances = super().update_route_distances()
+        self.stats['route_distances'] = len(self.route_distances)
+        return self.route_distances
+
+    def print_import_summary(self):
+        """Print load statistics"""
+        logger.info("="*50)
+        logger.info("AIRPORT REFERENCE LOAD SUMMARY")
+        logger.info("="*50)
+        logger.info(f"Reference Airports Read: {self.stats['airports_read']}")
+        logger.info(f"Locations Inserted: {self.stats['locations_inserted']}")
+        logger.info(f"Locations Updated: {self.stats['locations_updated']}")
+        logger.info(f"Locations Known: {len(self.location_cache)}")
+        logger.info(f"Route Distances Stored: {self.stats['route_distances']}")
+        logger.info(f"Errors Encountered: {self.stats['errors']}")
+        logger.info("="*50)
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description='Load airport reference data and route distances')
+    parser.add_argument('reference_file', nargs='?', default=AIRPORT_REFERENCE_FILE,
+                        help='Airport reference CSV (default: database/reference/airports.csv)')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='Replace stored location details with the reference values '
+                             '(default: only fill placeholders and empty columns)')
+    parser.add_argument('--distances-only', action='store_true',
+                        help='Only refresh route distances from the stored coordinates')
+    parser.add_argument('--bulk-audit', action='store_true',
+                        help='Audit the load with one summary entry instead of one audit row per changed row')
+    return parser.parse_args()
+
+def main():
+    """Main load function"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args()
+
+    # Database configuration
+    db_config = {
+        'host': os.getenv('DATABASE_HOST', 'localhost'),
+        'port': os.getenv('DATABASE_PORT', 5432),
+        'database': os.getenv('DATABASE_NAME', 'creepstate_flights_db'),
+        'user': os.getenv('DATABASE_USER', 'flight_admin'),
+        'password': os.getenv('DATABASE_PASSWORD', 'secure_admin_pass_2024!')
+    }
+
+    loader = AirportReferenceLoader(db_config)
+    loader.bulk_audit = args.bulk_audit
+
+    try:
+        loader.connect_database()
+        if not args.distances_only:
+            loader.load_reference_file(args.reference_file, overwrite=args.overwrite)
+        loader.update_route_distances()
+        loader.print_import_summary()
+
+    except Exception as e:
+        logger.error(f"Airport load failed: {e}")
+        raise
+    finally:
+        loader.close_connection()
+
+if __name__ == "__main__":
+    main()
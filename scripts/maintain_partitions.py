@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Audit Log Partition Maintenance for Creepstate Investigation Platform
+Creates the upcoming monthly partitions of the security_audit logs and drops
+the ones past their retention (security_audit.partition_retention). Run daily.
+"""
+
+import argparse
+import logging
+import os
+from typing import Dict, List, Tuple
+
+import psycopg2
+
+logger = logging.getLogger(__name__)
+
+def maintain_partitions(connection) -> List[Tuple[str, int, int]]:
+    """Run security_audit.maintain_partitions() and commit"""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT * FROM security_audit.maintain_partitions()")
+        results = cursor.fetchall()
+    connection.commit()
+    return results
+
+def list_partitions(connection) -> List[Tuple[str, str, int, str]]:
+    """Partitions of the security_audit logs with estimated rows and size"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT p.relname, c.relname, GREATEST(c.reltuples, 0)::bigint,
+                   pg_size_pretty(pg_total_relation_size(c.oid))
+            FROM pg_inherits i
+            JOIN pg_class p ON p.oid = i.inhparent
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_namespace n ON n.oid = p.relnamespace
+            WHERE n.nspname = 'security_audit' AND p.relkind = 'p'
+            ORDER BY p.relname, c.relname
+        """)
+        return cursor.fetchall()
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Maintain monthly security_audit log partitions')
+    parser.add_argument('--list', action='store_true',
+                        help='List the log partitions after maintenance')
+    return parser.parse_args()
+
+def main():
+    """Main maintenance function"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args()
+
+    # Database configuration
+    db_config: Dict[str, str] = {
+        'host': os.getenv('DATABASE_HOST', 'localhost'),
+        'port': os.getenv('DATABASE_PORT', 5432),
+        'database': os.getenv('DATABASE_NAME', 'creepstate_flights_db'),
+        'user': os.getenv('DATABASE_USER', 'flight_admin'),
+        'password': os.getenv('DATABASE_PASSWORD', 'secure_admin_pass_2024!')
+    }
+
+    connection = None
+    try:
+        connection = psycopg2.connect(**db_config)
+        for table_name, created, dropped in maintain_partitions(connection):
+            logger.info(f"security_audit.{table_name}: {created} partitions created, {dropped} expired partitions dropped")
+
+        if args.list:
+            for table_name, partition_name, rows, size in list_partitions(connection):
+                logger.info(f"{table_name:<12} {partition_name:<24} ~{rows:>10,} rows {size:>10}")
+
+    except Exception as e:
+        logger.error(f"Partition maintenance failed: {e}")
+        raise
+    finally:
+        if connection:
+            connection.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,607 @@
+#!/usr/bin/env python3
+"""
+Flight Pattern Mining for Creepstate Investigation Platform
+Scans the date-sorted flights once and upserts frequent routes, recurring
+passenger groups, bursts of flights and airport clusters into
+investigation.flight_patterns
+"""
+
+import argparse
+import hashlib
+import io
+import logging
+import os
+import time
+from collections import Counter
+from datetime import date, timedelta
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from import_csv_data import FlightDataImporter
+
+logger = logging.getLogger(__name__)
+
+# Pattern types this job owns; rows of these types it no longer finds are removed
+MINED_PATTERN_TYPES = ('frequent_route', 'group_travel', 'suspicious_timing', 'location_clustering')
+
+PATTERN_NAME_LENGTH = 255
+EARTH_RADIUS_KM = 6371.0
+EPOCH = date(1970, 1, 1)
+
+PATTERN_COLUMNS = [
+    'pattern_name', 'pattern_type', 'description', 'involved_flights', 'involved_passengers',
+    'frequency_count', 'date_range_start', 'date_range_end', 'risk_assessment'
+]
+
+def _day(day_number: int) -> date:
+    """Convert days since 1970-01-01 back to a date"""
+    return EPOCH + timedelta(days=int(day_number))
+
+def _pattern_name(name: str, key: str) -> str:
+    """Fit a pattern name in the column, keeping truncated names unique"""
+    if len(name) <= PATTERN_NAME_LENGTH:
+        return name
+    digest = hashlib.md5(key.encode('utf-8')).hexdigest()[:8]
+    return name[:PATTERN_NAME_LENGTH - 12].rstrip(' ,+') + f' ... #{digest}'
+
+def _uuid_array(ids: Sequence[str]) -> str:
+    """Render ids as a Postgres array literal for COPY"""
+    return '{' + ','.join(ids) + '}'
+
+class FlightPatternMiner:
+    """Mine flight_patterns from one columnar snapshot of flights and manifests
+
+    Flights are loaded once, sorted by date, into NumPy arrays; passenger
+    links become (flight index, passenger code) pairs. Every pattern type is
+    computed from those arrays, so a run reads each table a single time.
+    """
+
+    def __init__(self, db_config: Dict[str, str], connection=None,
+                 min_route_flights: int = 3, min_group_support: int = 5, max_group_size: int = 5,
+                 burst_window_days: int = 7, burst_ratio: float = 4.0, min_burst_flights: int = 5,
+                 cluster_radius_km: float = 60.0):
+        self.db_config = db_config
+        self.connection = connection
+        self.owns_connection = connection is None
+        self.cursor = None
+
+        self.min_route_flights = min_route_flights
+        self.min_group_support = min_group_support
+        self.max_group_size = max_group_size
+        self.burst_window_days = burst_window_days
+        self.burst_ratio = burst_ratio
+        self.min_burst_flights = min_burst_flights
+        self.cluster_radius_km = cluster_radius_km
+
+        self.patterns = []
+        self.timings = {}
+        self.stats = {
+            'flights_scanned': 0,
+            'links_scanned': 0,
+            'patterns_written': 0,
+            'patterns_unchanged': 0,
+            'patterns_removed': 0,
+            'errors': 0
+        }
+        self.stats.update({pattern_type: 0 for pattern_type in MINED_PATTERN_TYPES})
+
+    def connect_database(self):
+        """Establish database connection, unless one was handed in"""
+        try:
+            if self.connection is None:
+                self.connection = psycopg2.connect(**self.db_config)
+                logger.info("Connected to database successfully")
+            self.cursor = self.connection.cursor(cursor_factory=RealDictCursor)
+        except Exception as e:
+            logger.error(f"Failed to connect to database: {e}")
+            raise
+
+    def _copy_frame(self, query: str, columns: List[str], dtypes: Dict[str, str]) -> pd.DataFrame:
+        """Read a query result through COPY into a DataFrame"""
+        buffer = io.StringIO()
+        self.cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH CSV", buffer)
+        buffer.seek(0)
+        return pd.read_csv(buffer, names=columns, header=None, dtype=dtypes, keep_default_na=False)
+
+    def load(self):
+        """Read flights, passenger links, names and airport coordinates"""
+        started = time.perf_counter()
+        flights = self._copy_frame("""
+            SELECT f.id, f.flight_date - DATE '1970-01-01',
+                   COALESCE(dl.airport_code, ''), COALESCE(al.airport_code, '')
+            FROM flight_data.flights f
+            LEFT JOIN flight_data.locations dl ON f.departure_location_id = dl.id
+            LEFT JOIN flight_data.locations al ON f.arrival_location_id = al.id
+            ORDER BY f.flight_date, f.id
+        """, ['id', 'day', 'departure', 'arrival'],
+            {'id': str, 'day': np.int64, 'departure': str, 'arrival': str})
+        links = self._copy_frame("""
+            SELECT DISTINCT flight_id, passenger_id
+            FROM flight_data.flight_passengers
+            WHERE flight_id IS NOT NULL AND passenger_id IS NOT NULL
+        """, ['flight_id', 'passenger_id'], {'flight_id': str, 'passenger_id': str})
+
+        self.cursor.execute("SELECT id, full_name FROM flight_data.passengers")
+        names = {str(row['id']): row['full_name'] for row in self.cursor.fetchall()}
+        self.cursor.execute("""
+            SELECT airport_code, coordinates[0] AS lon, coordinates[1] AS lat
+            FROM flight_data.locations
+            WHERE coordinates IS NOT NULL
+        """)
+        coordinates = {row['airport_code']: (row['lon'], row['lat']) for row in self.cursor.fetchall()}
+
+        self.snapshot = (flights, links, names, coordinates)
+        self.prepare(flights, links, names, coordinates)
+        self.timings['load'] = time.perf_counter() - started
+
+    def prepare(self, flights: pd.DataFrame, links: pd.DataFrame, names: Dict[str, str],
+                coordinates: Dict[str, Tuple[float, float]]):
+        """Build the columnar arrays every miner works from
+
+        flights must be sorted by day; links may come in any order.
+        """
+        self.flight_ids = flights['id'].to_numpy()
+        self.days = flights['day'].to_numpy(np.int64)
+        self.departures = flights['departure'].to_numpy()
+        self.arrivals = flights['arrival'].to_numpy()
+        self.names = names
+        self.coordinates = coordinates
+
+        flight_index = pd.Index(self.flight_ids).get_indexer(links['flight_id'])
+        known = flight_index >= 0
+        passenger_codes, self.passenger_ids = pd.factorize(links['passenger_id'][known])
+
+        # Links ordered by passenger, then flight (= date) order
+        order = np.lexsort((flight_index[known], passenger_codes))
+        self.link_flight = flight_index[known][order]
+        self.link_passenger = passenger_codes[order]
+        self.passenger_starts = np.searchsorted(self.link_passenger,
+                                                np.arange(len(self.passenger_ids) + 1))
+
+        self.stats['flights_scanned'] = len(self.flight_ids)
+        self.stats['links_scanned'] = len(self.link_flight)
+
+    def _passenger_flights(self, code: int) -> np.ndarray:
+        """Flight indexes of one passenger, in date order"""
+        return self.link_flight[self.passenger_starts[code]:self.passenger_starts[code + 1]]
+
+    def _shared_flights(self, codes: Sequence[int]) -> np.ndarray:
+        """Flights every passenger in codes was on, probing from the rarest one"""
+        members = sorted((self._passenger_flights(code) for code in codes), key=len)
+        shared = members[0]
+        for flights in members[1:]:
+            positions = np.minimum(np.searchsorted(flights, shared), len(flights) - 1)
+            shared = shared[flights[positions] == shared]
+        return shared
+
+    def _add_pattern(self, pattern_type: str, name: str, key: str, description: str,
+                     flights: np.ndarray, passengers: Optional[List[str]], risk: str):
+        """Record one mined pattern over the given flight indexes (date order)"""
+        self.patterns.append({
+            'pattern_name': _pattern_name(name, key),
+            'pattern_type': pattern_type,
+            'description': description,
+            'involved_flights': self.flight_ids[flights].tolist(),
+            'involved_passengers': passengers,
+            'frequency_count': len(flights),
+            'date_range_start': _day(self.days[flights[0]]),
+            'date_range_end': _day(self.days[flights[-1]]),
+            'risk_assessment': risk
+        })
+        self.stats[pattern_type] += 1
+
+    def mine_routes(self):
+        """frequent_route: departure/arrival pairs flown at least min_route_flights times"""
+        routes, route_codes = np.unique(self.departures + '\x1f' + self.arrivals, return_inverse=True)
+        counts = np.bincount(route_codes, minlength=len(routes))
+        order = np.argsort(route_codes, kind='stable')
+        ends = np.cumsum(counts)
+
+        for code in np.flatnonzero(counts >= self.min_route_flights):
+            departure, arrival = routes[code].split('\x1f')
+            if not departure or not arrival:
+                continue
+            flights = order[ends[code] - counts[code]:ends[code]]
+            count = len(flights)
+            first, last = _day(self.days[flights[0]]), _day(self.days[flights[-1]])
+            risk = 'high' if count > 10 else 'medium' if count > 5 else 'low'
+            self._add_pattern('frequent_route', f"{departure} to {arrival} Route", routes[code],
+                              f"Route flown {count} times between {first} and {last}",
+                              flights, None, risk)
+
+    def _frequent_itemsets(self, manifests: Counter) -> Dict[Tuple[int, ...], int]:
+        """Apriori over weighted manifests: itemsets of 3..max_group_size passengers
+
+        An itemset of size k is only counted when all its (k-1)-subsets are
+        frequent, so each level scans the (deduplicated) manifests once.
+        """
+        frequent = {}
+        previous = None
+        for size in range(3, self.max_group_size + 1):
+            counts = Counter()
+            for manifest, weight in manifests.items():
+                if len(manifest) < size:
+                    continue
+                if previous is not None:
+                    members = previous_members
+                    manifest = tuple(p for p in manifest if p in members)
+                for itemset in combinations(manifest, size):
+                    if previous is not None and any(
+                            subset not in previous for subset in combinations(itemset, size - 1)):
+                        continue
+                    counts[itemset] += weight
+
+            level = {itemset: n for itemset, n in counts.items() if n >= self.min_group_support}
+            if not level:
+                break
+            frequent.update(level)
+            previous = level
+            previous_members = {p for itemset in level for p in itemset}
+        return frequent
+
+    def mine_groups(self):
+        """group_travel: closed sets of 3+ passengers who flew together repeatedly
+
+        Pairs are covered by investigation.passenger_connections. A group is
+        reported unless a larger group has the same support, so a crew that
+        always travels together shows up once rather than as every subset.
+        """
+        support = np.diff(self.passenger_starts)
+        frequent_links = np.repeat(support >= self.min_group_support, support)
+        flights = self.link_flight[frequent_links]
+        passengers = self.link_passenger[frequent_links]
+
+        # Only flights with three or more frequent passengers can hold a group
+        per_flight = np.bincount(flights, minlength=len(self.flight_ids))
+        keep = per_flight[flights] >= 3
+        flights, passengers = flights[keep], passengers[keep]
+        order = np.lexsort((passengers, flights))
+        flights, passengers = flights[order], passengers[order]
+        boundaries = np.concatenate(([0], np.flatnonzero(np.diff(flights)) + 1, [len(flights)]))
+        members = passengers.tolist()
+        manifests = Counter(tuple(members[start:end])
+                            for start, end in zip(boundaries[:-1].tolist(), boundaries[1:].tolist())
+                            if end > start)
+
+        frequent = self._frequent_itemsets(manifests)
+        not_closed = set()
+        for itemset, count in frequent.items():
+            for subset in combinations(itemset, len(itemset) - 1):
+                if frequent.get(subset) == count:
+                    not_closed.add(subset)
+
+        for itemset in sorted(frequent, key=lambda s: (-frequent[s], s)):
+            if itemset in not_closed:
+                continue
+            shared = self._shared_flights(itemset)
+
+            ids = sorted(str(self.passenger_ids[code]) for code in itemset)
+            names = sorted(self.names.get(pid, pid) for pid in ids)
+            count = len(shared)
+            first, last = _day(self.days[shared[0]]), _day(self.days[shared[-1]])
+            risk = 'high' if count > 20 else 'medium' if count > 10 else 'low'
+            self._add_pattern('group_travel', f"Group: {' + '.join(names)}", ','.join(ids),
+                              f"{len(itemset)} passengers flew together on {count} flights "
+                              f"between {first} and {last}",
+                              shared, ids, risk)
+
+    def _bursts(self, days: np.ndarray) -> List[Tuple[int, int, float]]:
+        """Find runs of flights far denser than a series' average rate
+
+        A window of burst_window_days starting at each flight is counted with
+        one searchsorted over the sorted days; windows reaching burst_ratio
+        times the expected count (and min_burst_flights) are merged into
+        (start, end, intensity) position ranges.
+        """
+        count = len(days)
+        if count < self.min_burst_flights:
+            return []
+
+        window = self.burst_window_days
+        window_ends = np.searchsorted(days, days + window, side='left')
+        window_counts = window_ends - np.arange(count)
+        expected = count * window / (days[-1] - days[0] + window)
+        threshold = max(self.min_burst_flights, self.burst_ratio * expected)
+
+        bursts = []
+        for start in np.flatnonzero(window_counts >= threshold):
+            end = window_ends[start]
+            if bursts and start < bursts[-1][1]:
+                bursts[-1][1] = max(bursts[-1][1], end)
+            else:
+                bursts.append([start, end])
+
+        result = []
+        for start, end in bursts:
+            periods = max(1.0, (days[end - 1] - days[start] + 1) / window)
+            result.append((start, end, (end - start) / (expected * periods)))
+        return result
+
+    def _add_bursts(self, who: str, key: str, flights: np.ndarray, passengers: Optional[List[str]]):
+        """Turn the bursts of one flight series into suspicious_timing patterns"""
+        days = self.days[flights]
+        for start, end, intensity in self._bursts(days):
+            burst = flights[start:end]
+            first, last = _day(days[start]), _day(days[end - 1])
+            risk = ('high' if intensity >= 2 * self.burst_ratio
+                    else 'medium' if intensity >= 1.5 * self.burst_ratio else 'low')
+            self._add_pattern('suspicious_timing', f"Burst: {who} {first} to {last}", f"{key}:{first}",
+                              f"{len(burst)} flights in {(last - first).days + 1} days, "
+                              f"{intensity:.1f}x the usual rate of {who}",
+                              burst, passengers, risk)
+
+    def mine_bursts(self):
+        """suspicious_timing: bursts across all flights and per passenger"""
+        self._add_bursts('all flights', 'all', np.arange(len(self.flight_ids)), None)
+
+        support = np.diff(self.passenger_starts)
+        for code in np.flatnonzero(support >= self.min_burst_flights):
+            passenger_id = str(self.passenger_ids[code])
+            self._add_bursts(self.names.get(passenger_id, passenger_id), passenger_id,
+                             self._passenger_flights(code), [passenger_id])
+
+    def mine_clusters(self):
+        """location_clustering: airports within cluster_radius_km of a busier airport
+
+        Airports with coordinates are taken busiest first; each one not yet
+        assigned starts a cluster and claims the unassigned airports within
+        the radius. Centre-based clusters do not chain along a coastline the
+        way single-linkage clusters would.
+        """
+        if not self.coordinates:
+            return
+
+        traffic = Counter(self.departures.tolist()) + Counter(self.arrivals.tolist())
+        codes = sorted(self.coordinates, key=lambda code: (-traffic.get(code, 0), code))
+        points = np.radians(np.array([self.coordinates[code] for code in codes], dtype=float))
+        lon, lat = points[:, 0], points[:, 1]
+
+        assigned = np.zeros(len(codes), dtype=bool)
+        for centre in range(len(codes)):
+            if assigned[centre]:
+                continue
+            # Haversine distance from the centre to every airport
+            a = (np.sin((lat - lat[centre]) / 2) ** 2
+                 + np.cos(lat[centre]) * np.cos(lat) * np.sin((lon - lon[centre]) / 2) ** 2)
+            distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+            members = np.flatnonzero(~assigned & (distance <= self.cluster_radius_km))
+            assigned[members] = True
+
+            cluster = sorted(codes[m] for m in members)
+            if len(cluster) < 2:
+                continue
+            flights = np.flatnonzero(np.isin(self.departures, cluster) | np.isin(self.arrivals, cluster))
+            if not len(flights):
+                continue
+            count = len(flights)
+            risk = 'high' if count > 100 else 'medium' if count > 25 else 'low'
+            self._add_pattern('location_clustering', f"Cluster: {', '.join(cluster)}", ','.join(cluster),
+                              f"{len(cluster)} airports within {self.cluster_radius_km:g} km of "
+                              f"{codes[centre]} used by {count} flights",
+                              flights, None, risk)
+
+    def mine(self):
+        """Run every miner over the loaded snapshot"""
+        self.patterns = []
+        for pattern_type, miner in (('frequent_route', self.mine_routes),
+                                    ('group_travel', self.mine_groups),
+                                    ('suspicious_timing', self.mine_bursts),
+                                    ('location_clustering', self.mine_clusters)):
+            started = time.perf_counter()
+            self.stats[pattern_type] = 0
+            miner()
+            self.timings[pattern_type] = time.perf_counter() - started
+        return self.patterns
+
+    def write_patterns(self):
+        """Upsert the mined patterns and drop ones of the same types no longer found
+
+        Rows are keyed by uq_flight_pattern (type, name); unchanged rows are
+        not rewritten, so a repeated run over the same data writes nothing.
+        """
+        started = time.perf_counter()
+        buffer = io.StringIO()
+        for pattern in self.patterns:
+            buffer.write(FlightDataImporter._copy_row((
+                pattern['pattern_name'], pattern['pattern_type'], pattern['description'],
+                _uuid_array(pattern['involved_flights']),
+                _uuid_array(pattern['involved_passengers']) if pattern['involved_passengers'] else None,
+                pattern['frequency_count'], pattern['date_range_start'], pattern['date_range_end'],
+                pattern['risk_assessment']
+            )))
+        buffer.seek(0)
+
+        try:
+            self.cursor.execute("""
+                CREATE TEMP TABLE stage_patterns (
+                    pattern_name VARCHAR(255) NOT NULL,
+                    pattern_type VARCHAR(100) NOT NULL,
+                    description TEXT,
+                    involved_flights UUID[],
+                    involved_passengers UUID[],
+                    frequency_count INTEGER,
+                    date_range_start DATE,
+                    date_range_end DATE,
+                    risk_assessment VARCHAR(20)
+                ) ON COMMIT DROP
+            """)
+            self.cursor.copy_expert(f"COPY stage_patterns ({', '.join(PATTERN_COLUMNS)}) FROM STDIN", buffer)
+
+            self.cursor.execute("""
+                INSERT INTO investigation.flight_patterns (
+                    pattern_name, pattern_type, description, involved_flights, involved_passengers,
+                    frequency_count, date_range_start, date_range_end, risk_assessment
+                )
+                SELECT pattern_name, pattern_type, description, involved_flights, involved_passengers,
+                       frequency_count, date_range_start, date_range_end, risk_assessment
+                FROM stage_patterns
+                ORDER BY pattern_type, pattern_name
+                ON CONFLICT ON CONSTRAINT uq_flight_pattern DO UPDATE SET
+                    description = EXCLUDED.description,
+                    involved_flights = EXCLUDED.involved_flights,
+                    involved_passengers = EXCLUDED.involved_passengers,
+                    frequency_count = EXCLUDED.frequency_count,
+                    date_range_start = EXCLUDED.date_range_start,
+                    date_range_end = EXCLUDED.date_range_end,
+                    risk_assessment = EXCLUDED.risk_assessment,
+                    updated_at = NOW()
+                WHERE (flight_patterns.description, flight_patterns.involved_flights,
+                       flight_patterns.involved_passengers, flight_patterns.frequency_count,
+                       flight_patterns.date_range_start, flight_patterns.date_range_end,
+                       flight_patterns.risk_assessment)
+                    IS DISTINCT FROM
+                      (EXCLUDED.description, EXCLUDED.involved_flights,
+                       EXCLUDED.involved_passengers, EXCLUDED.frequency_count,
+                       EXCLUDED.date_range_start, EXCLUDED.date_range_end,
+                       EXCLUDED.risk_assessment)
+            """)
+            self.stats['patterns_written'] = self.cursor.rowcount
+            self.stats['patterns_unchanged'] = len(self.patterns) - self.cursor.rowcount
+
+            self.cursor.execute("""
+                DELETE FROM investigation.flight_patterns p
+                WHERE p.pattern_type = ANY(%s)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM stage_patterns s
+                      WHERE s.pattern_type = p.pattern_type AND s.pattern_name = p.pattern_name
+                  )
+            """, (list(MINED_PATTERN_TYPES),))
+            self.stats['patterns_removed'] = self.cursor.rowcount
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            logger.error(f"Failed to write flight patterns: {e}")
+            self.stats['errors'] += 1
+            raise
+
+        self.timings['write'] = time.perf_counter() - started
+
+    def run(self, dry_run: bool = False):
+        """Load, mine and (unless dry_run) write patterns"""
+        self.load()
+        self.mine()
+        if not dry_run:
+            self.write_patterns()
+
+    def print_summary(self):
+        """Print pattern counts and per-phase timings"""
+        logger.info("="*50)
+        logger.info("FLIGHT PATTERN MINING SUMMARY")
+        logger.info("="*50)
+        logger.info(f"Flights Scanned: {self.stats['flights_scanned']} "
+                    f"({self.stats['links_scanned']} passenger links)")
+        for pattern_type in MINED_PATTERN_TYPES:
+            logger.info(f"{pattern_type:<20} {self.stats[pattern_type]:>6} patterns "
+                        f"{self.timings.get(pattern_type, 0.0):8.2f}s")
+        logger.info(f"Patterns Written: {self.stats['patterns_written']} "
+                    f"(unchanged: {self.stats['patterns_unchanged']}, "
+                    f"removed: {self.stats['patterns_removed']})")
+        for phase in ('load', 'prepare', 'write'):
+            if phase in self.timings:
+                logger.info(f"{phase.capitalize():<20} {self.timings[phase]:15.2f}s")
+        logger.info(f"Errors Encountered: {self.stats['errors']}")
+        logger.info("="*50)
+
+    def close_connection(self):
+        """Close database connection if this miner opened it"""
+        if self.cursor:
+            self.cursor.close()
+        if self.connection and self.owns_connection:
+            self.connection.close()
+            logger.info("Database connection closed")
+
+def run_benchmark(miner: FlightPatternMiner, scale: int):
+    """Time the miners on the loaded snapshot repeated scale times in memory
+
+    Each copy gets its own flight ids on the same dates, so supports and
+    burst sizes grow with the scale while the pattern count stays put.
+    Nothing is written.
+    """
+    flights, links, names, coordinates = miner.snapshot
+    if scale > 1:
+        suffixes = np.repeat([f"-{copy}" for copy in range(scale)], len(flights))
+        flights = pd.concat([flights] * scale, ignore_index=True)
+        flights['id'] = flights['id'] + suffixes
+        flights = flights.sort_values('day', kind='stable', ignore_index=True)
+
+        link_suffixes = np.repeat([f"-{copy}" for copy in range(scale)], len(links))
+        links = pd.concat([links] * scale, ignore_index=True)
+        links['flight_id'] = links['flight_id'] + link_suffixes
+
+    started = time.perf_counter()
+    miner.prepare(flights, links, names, coordinates)
+    miner.timings['prepare'] = time.perf_counter() - started
+    miner.mine()
+    logger.info(f"Mined {len(miner.patterns)} patterns from {len(flights):,} flights "
+                f"in {sum(miner.timings[t] for t in ('prepare',) + MINED_PATTERN_TYPES):.2f}s")
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description='Mine flight patterns into investigation.flight_patterns')
+    parser.add_argument('--min-route-flights', type=int, default=3,
+                        help='Flights on a route before it is a pattern (default: 3)')
+    parser.add_argument('--min-group-support', type=int, default=5,
+                        help='Shared flights before a passenger group is a pattern (default: 5)')
+    parser.add_argument('--max-group-size', type=int, default=5,
+                        help='Largest passenger group searched for (default: 5)')
+    parser.add_argument('--burst-window', type=int, default=7,
+                        help='Sliding window in days for burst detection (default: 7)')
+    parser.add_argument('--burst-ratio', type=float, default=4.0,
+                        help='Window count over the average rate that makes a burst (default: 4.0)')
+    parser.add_argument('--min-burst-flights', type=int, default=5,
+                        help='Fewest flights in a burst window (default: 5)')
+    parser.add_argument('--cluster-radius', type=float, default=60.0,
+                        help='Airport cluster radius in km (default: 60)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Mine and report without writing flight_patterns')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Time the miners on an in-memory copy of the data; writes nothing')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='Repeat the flights N times for the benchmark (default: 1)')
+    return parser.parse_args()
+
+def main():
+    """Main mining function"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args()
+
+    # Database configuration
+    db_config = {
+        'host': os.getenv('DATABASE_HOST', 'localhost'),
+        'port': os.getenv('DATABASE_PORT', 5432),
+        'database': os.getenv('DATABASE_NAME', 'creepstate_flights_db'),
+        'user': os.getenv('DATABASE_USER', 'flight_admin'),
+        'password': os.getenv('DATABASE_PASSWORD', 'secure_admin_pass_2024!')
+    }
+
+    miner = FlightPatternMiner(db_config,
+                               min_route_flights=args.min_route_flights,
+                               min_group_support=args.min_group_support,
+                               max_group_size=args.max_group_size,
+                               burst_window_days=args.burst_window,
+                               burst_ratio=args.burst_ratio,
+                               min_burst_flights=args.min_burst_flights,
+                               cluster_radius_km=args.cluster_radius)
+
+    try:
+        miner.connect_database()
+        if args.benchmark:
+            miner.load()
+            run_benchmark(miner, args.scale)
+        else:
+            miner.run(dry_run=args.dry_run)
+        miner.print_summary()
+
+    except Exception as e:
+        logger.error(f"Pattern mining failed: {e}")
+        raise
+    finally:
+        miner.close_connection()
+
+if __name__ == "__main__":
+    main()
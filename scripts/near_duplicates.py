@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Story Detection for Creepstate Research Tools
+Wire stories are syndicated across NPR, CNN, NBC and CBC and reposted on
+Reddit with small edits, so the same story would otherwise be counted once
+per outlet. Stories are shingled into word n-grams and summarised with a
+MinHash signature; locality-sensitive hashing over signature bands finds
+the clusters a new story may belong to without comparing it against every
+story seen so far. Run directly to benchmark it against pairwise comparison.
+"""
+
+import argparse
+import hashlib
+import random
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+SHINGLE_SIZE = 3          # Words per shingle
+NUM_PERMUTATIONS = 48     # MinHash signature length
+BANDS = 16                # LSH bands of NUM_PERMUTATIONS // BANDS rows each
+DEFAULT_THRESHOLD = 0.6   # Estimated Jaccard similarity for two stories to be copies
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """Hashed word n-grams of the lowercased text; shorter texts form one shingle"""
+    words = re.findall(r'[a-z0-9]+', text.lower())
+    size = min(size, len(words))
+    return {int.from_bytes(hashlib.blake2b(' '.join(words[i:i + size]).encode('utf-8'), digest_size=8).digest(),
+                           'little')
+            for i in range(len(words) - size + 1)} if words else set()
+
+class MinHasher:
+    """MinHash signatures whose agreement estimates Jaccard similarity
+
+    Shingle hashes are already uniform 64-bit values, so XOR with a random
+    mask serves as each permutation; it is several times cheaper in Python
+    than an (a * x + b) mod p hash and estimates as accurately.
+    """
+
+    def __init__(self, num_permutations: int = NUM_PERMUTATIONS, seed: int = 1):
+        rng = random.Random(seed)
+        self.masks = [rng.getrandbits(64) for _ in range(num_permutations)]
+
+    def signature(self, hashes: Set[int]) -> Tuple[int, ...]:
+        return tuple(min([h ^ mask for h in hashes]) for mask in self.masks)
+
+    @staticmethod
+    def similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+        return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+class StoryClusters:
+    """Groups stories whose text is a near copy of an earlier story
+
+    The first story of a cluster is its canonical copy; later stories join
+    the cluster whose canonical signature they best match at `threshold`
+    or above. Only clusters sharing an LSH band with a story are compared.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, shingle_size: int = SHINGLE_SIZE,
+                 num_permutations: int = NUM_PERMUTATIONS, bands: int = BANDS):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_permutations)
+        self.rows = num_permutations // bands
+        self.bands = bands
+        self.buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        self.clusters: List[Dict[str, Any]] = []
+        self._signatures: List[Optional[Tuple[int, ...]]] = []
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def add(self, text: str, story: Any = None) -> int:
+        """Add a story by its text and return the index of its cluster"""
+        hashes = shingles(text, self.shingle_size)
+        signature = self.hasher.signature(hashes) if hashes else None
+
+        if signature is not None:
+            keys = self._band_keys(signature)
+            candidates = {index for key in keys for index in self.buckets.get(key, ())}
+            best, best_similarity = None, self.threshold
+            for index in candidates:
+                similarity = MinHasher.similarity(signature, self._signatures[index])
+                if similarity >= best_similarity:
+                    best, best_similarity = index, similarity
+            if best is not None:
+                self.clusters[best]['copies'] += 1
+                self.clusters[best]['members'].append(story)
+                return best
+
+        # A new story; texts without words never match anything
+        index = len(self.clusters)
+        self.clusters.append({'story': story, 'copies': 1, 'members': [story]})
+        self._signatures.append(signature)
+        if signature is not None:
+            for key in keys:
+                self.buckets.setdefault(key, []).append(index)
+        return index
+
+def collapse_duplicates(stories: Iterable[Any], text_of: Callable[[Any], str],
+                        threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """Clusters of near-duplicate stories, in order of each cluster's first story
+
+    Each cluster has its canonical 'story', the number of 'copies' and all
+    'members' including the canonical one.
+    """
+    clusters = StoryClusters(threshold)
+    for story in stories:
+        clusters.add(text_of(story), story)
+    return clusters.clusters
+
+def _synthetic_stories(count: int, copies: int, words: int) -> List[str]:
+    """Distinct stories, each repeated with a few words changed"""
+    rng = random.Random(7)
+    vocabulary = [f"word{i}" for i in range(5000)]
+    stories = []
+    for _ in range(count):
+        original = [rng.choice(vocabulary) for _ in range(words)]
+        for _ in range(copies):
+            copy = list(original)
+            for position in rng.sample(range(words), max(1, words // 40)):
+                copy[position] = rng.choice(vocabulary)
+            stories.append(' '.join(copy))
+    rng.shuffle(stories)
+    return stories
+
+def benchmark(count: int = 500, copies: int = 4, words: int = 80):
+    """Time LSH clustering against comparing every story with every cluster"""
+    texts = _synthetic_stories(count, copies, words)
+
+    started = time.perf_counter()
+    clusters = StoryClusters()
+    for text in texts:
+        clusters.add(text)
+    lsh_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    hasher = MinHasher()
+    canonical: List[Tuple[int, ...]] = []
+    for text in texts:
+        signature = hasher.signature(shingles(text))
+        if not any(MinHasher.similarity(signature, other) >= DEFAULT_THRESHOLD for other in canonical):
+            canonical.append(signature)
+    pairwise_time = time.perf_counter() - started
+
+    print(f"{len(texts)} stories ({count} distinct, {copies} near copies each, {words} words)")
+    print(f"LSH clustering: {lsh_time:.3f}s, {len(clusters.clusters)} clusters")
+    print(f"pairwise:       {pairwise_time:.3f}s, {len(canonical)} clusters")
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Benchmark near-duplicate story clustering')
+    parser.add_argument('--stories', type=int, default=500,
+                        help='Distinct synthetic stories (default: 500)')
+    parser.add_argument('--copies', type=int, default=4,
+                        help='Near copies of each story (default: 4)')
+    parser.add_argument('--words', type=int, default=80,
+                        help='Words per story (default: 80)')
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    benchmark(args.stories, args.copies, args.words)
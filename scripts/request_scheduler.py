@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Per-Host Request Scheduler for Creepstate Research Tools
+Rate limits GETs with a token bucket per host and caps how many requests
+each host has in flight. Batches run concurrently, so requests to different
+hosts overlap while each host still sees no more than its configured rate.
+Responses go through the shared HTTP cache; fresh cached copies are served
+without spending a token. The aiohttp session and its event loop are kept
+between batches, so connections to each host stay open in long-running
+processes.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from http_cache import CachedResponse, HTTPCache, prepare_url
+
+logger = logging.getLogger(__name__)
+
+# (requests per second, burst, concurrent requests) for hosts without their own limits
+DEFAULT_LIMITS = (1.0, 1, 2)
+
+Target = Union[str, Tuple[str, Optional[Dict[str, Any]]]]
+
+class TokenBucket:
+    """Allows `rate` requests per second on average and `burst` at once"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it
+
+        Tokens may go negative: each caller reserves the next free slot,
+        so waiters are spaced out at the bucket's rate in arrival order.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+class RequestScheduler:
+    """Rate-limited, cached GETs, run concurrently across hosts
+
+    limits maps a hostname to (requests per second, burst, concurrent
+    requests); other hosts get default_limits.
+    """
+
+    def __init__(self, cache: HTTPCache, limits: Optional[Dict[str, Tuple[float, int, int]]] = None,
+                 default_limits: Tuple[float, int, int] = DEFAULT_LIMITS):
+        self.cache = cache
+        self.limits = dict(limits or {})
+        self.default_limits = default_limits
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.stats = Counter()
+        self.delayed = Counter()
+        self.longest_wait = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session = None
+
+    def _bucket(self, host: str) -> TokenBucket:
+        if host not in self.buckets:
+            rate, burst, _ = self.limits.get(host, self.default_limits)
+            self.buckets[host] = TokenBucket(rate, burst)
+        return self.buckets[host]
+
+    def _reserve(self, host: str) -> float:
+        delay = self._bucket(host).reserve()
+        self.stats[host] += 1
+        if delay:
+            self.delayed[host] += 1
+            self.longest_wait = max(self.longest_wait, delay)
+        return delay
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> CachedResponse:
+        """One rate-limited GET through the cache; kwargs go to requests"""
+        url = prepare_url(url, params)
+        cached = self.cache.fresh(url)
+        if cached:
+            return cached
+        time.sleep(self._reserve(urlsplit(url).hostname or ''))
+        return self.cache.get(url, **kwargs)
+
+    async def _fetch(self, session, semaphores: Dict[str, asyncio.Semaphore], url: str,
+                     timeout) -> CachedResponse:
+        cached = self.cache.fresh(url)
+        if cached:
+            return cached
+
+        host = urlsplit(url).hostname or ''
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(self.limits.get(host, self.default_limits)[2])
+        async with semaphores[host]:
+            await asyncio.sleep(self._reserve(host))
+            return await self.cache.aget(session, url, timeout=timeout)
+
+    async def _fetch_all(self, urls: List[str], timeout: float) -> List[Union[CachedResponse, Exception]]:
+        import aiohttp
+
+        if self._session is None:
+            headers = {'User-Agent': self.cache.session.headers.get('User-Agent', 'python-aiohttp')}
+            self._session = aiohttp.ClientSession(headers=headers)
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        return await asyncio.gather(*(self._fetch(self._session, semaphores, url, client_timeout) for url in urls),
+                                    return_exceptions=True)
+
+    def get_many(self, targets: List[Target], timeout: float = 10,
+                 proxies: Optional[Dict[str, str]] = None) -> List[Union[CachedResponse, Exception]]:
+        """GET every target (a URL or a (URL, params) pair) concurrently
+
+        Results come back in target order, with the exception in place of
+        any request that failed. With proxies (e.g. Tor, which aiohttp
+        cannot use) the requests run one after another through requests.
+        """
+        urls = [prepare_url(*target) if isinstance(target, tuple) else target for target in targets]
+        if proxies:
+            results: List[Union[CachedResponse, Exception]] = []
+            for url in urls:
+                try:
+                    results.append(self.get(url, proxies=proxies, timeout=timeout))
+                except Exception as e:
+                    results.append(e)
+            return results
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self._fetch_all(urls, timeout))
+
+    def log_summary(self):
+        """Log requests per host, how many waited for a token, and the longest wait"""
+        hosts = ', '.join(f"{host}: {count} ({self.delayed[host]} delayed)"
+                          for host, count in self.stats.most_common()) or 'none'
+        logger.info(f"Scheduled requests: {hosts}; longest rate-limit wait {self.longest_wait:.1f}s")
+
+    def close(self):
+        """Close the kept aiohttp session and its event loop"""
+        if self._loop is not None:
+            if self._session is not None:
+                self._loop.run_until_complete(self._session.close())
+            self._loop.close()
+        self._loop = self._session = None
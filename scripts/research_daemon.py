@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Research Daemon for Creepstate Investigation Platform
+Runs the auto-research.py and fact-checker.py jobs from one long-running
+process instead of separate cron invocations, so interpreter startup,
+imports, pooled HTTP sessions, the HTTP cache, the article store and the
+compiled keyword matchers are paid for once. Each job runs on its own
+interval with jitter; a small HTTP endpoint reports job timings.
+
+    python3 scripts/research_daemon.py --status-port 8790
+    curl http://127.0.0.1:8790/status
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+logger = logging.getLogger('research_daemon')
+
+def _load_module(name: str, path: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _timestamp(seconds: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat() if seconds else None
+
+class Job:
+    """A task run every interval seconds, give or take a jitter fraction"""
+
+    def __init__(self, name: str, interval: float, function: Callable[[], Any], jitter: float):
+        self.name = name
+        self.interval = interval
+        self.function = function
+        self.jitter = jitter
+        self.next_run = time.time()
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.total_duration = 0.0
+        self.last_started: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_result: Any = None
+        self.last_error: Optional[str] = None
+
+    def schedule_next(self, rng: random.Random):
+        self.next_run = time.time() + self.interval * (1 + rng.uniform(-self.jitter, self.jitter))
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'interval_seconds': self.interval,
+            'running': self.running,
+            'runs': self.runs,
+            'failures': self.failures,
+            'last_started': _timestamp(self.last_started),
+            'last_duration_seconds': round(self.last_duration, 3) if self.last_duration is not None else None,
+            'average_duration_seconds': round(self.total_duration / self.runs, 3) if self.runs else None,
+            'last_result': self.last_result,
+            'last_error': self.last_error,
+            'next_run': _timestamp(self.next_run)
+        }
+
+class ResearchDaemon:
+    """Keeps one researcher and one fact checker warm and runs their jobs"""
+
+    def __init__(self, intervals: Dict[str, float], jitter: float = 0.1):
+        self.auto_research = _load_module('auto_research', os.path.join(REPO_ROOT, 'auto-research.py'))
+        self.fact_checker_module = _load_module('fact_checker', os.path.join(REPO_ROOT, 'scripts', 'fact-checker.py'))
+        self.researcher = self.auto_research.AnonymousResearcher()
+        self.fact_checker = self.fact_checker_module.FactChecker()
+        self.tor_available = False
+
+        self.jobs: List[Job] = [
+            Job('tor-check', intervals['tor-check'], self.check_tor, jitter),
+            Job('fact-check', intervals['fact-check'], self.run_fact_check, jitter),
+            Job('research', intervals['research'], self.run_research, jitter)
+        ]
+        self.rng = random.Random()
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    def check_tor(self) -> Dict[str, Any]:
+        """Test the Tor proxy once per interval instead of on every run"""
+        self.tor_available = self.researcher.use_tor()
+        return {'tor_available': self.tor_available}
+
+    def run_fact_check(self) -> Dict[str, Any]:
+        """Verify the sample claims and publish the fact-check report"""
+        report = self.fact_checker.run_fact_check(self.fact_checker_module.SAMPLE_CLAIMS)
+        return {'verified_claims': report['verified_claims'], 'total_claims': report['total_claims'],
+                'sources_failed': report['sources_failed']}
+
+    def run_research(self) -> Dict[str, Any]:
+        """Daily research report, plus the distraction analysis for the web interface"""
+        # Reload known people, so passengers imported since the last run are matched
+        self.researcher.gazetteer = None
+        report = self.researcher.generate_daily_report()
+        self.researcher.export_distraction_data_for_web(report['distraction_analysis'])
+        self.researcher.save_report(report)
+        self.researcher.http_cache.log_summary()
+        self.researcher.scheduler.log_summary()
+        summary = report['research_summary']
+        return {'verifications': summary['total_verifications'], 'distraction_alerts': summary['distraction_alerts'],
+                'new_discoveries': summary['new_discoveries'], 'threat_level': summary['overall_threat_level']}
+
+    def run_job(self, job: Job):
+        """Run a job, recording its timing and outcome"""
+        with self.lock:
+            job.running = True
+            job.last_started = time.time()
+        logger.info(f"Starting job {job.name}")
+        started = time.perf_counter()
+        result, error = None, None
+        try:
+            result = job.function()
+        except Exception as e:
+            logger.error(f"Job {job.name} failed: {e}")
+            error = str(e)
+        duration = time.perf_counter() - started
+
+        with self.lock:
+            job.running = False
+            job.runs += 1
+            job.total_duration += duration
+            job.last_duration = duration
+            if error is None:
+                job.last_result, job.last_error = result, None
+            else:
+                job.failures += 1
+                job.last_error = error
+        logger.info(f"Job {job.name} finished in {duration:.1f}s")
+
+    def status(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'started': _timestamp(self.started),
+                'uptime_seconds': round(time.time() - self.started),
+                'tor_available': self.tor_available,
+                'jobs': {job.name: job.status() for job in self.jobs}
+            }
+
+    def start_status_server(self, host: str, port: int):
+        """Serve GET /status as JSON from a background thread"""
+        daemon = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') not in ('', '/status'):
+                    self.send_error(404)
+                    return
+                body = json.dumps(daemon.status(), indent=2).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        self.server = ThreadingHTTPServer((host, port), StatusHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        logger.info(f"Status endpoint on http://{host}:{self.server.server_port}/status")
+
+    def run(self, once: bool = False):
+        """Run jobs as they fall due until stopped; with once, run each job once"""
+        if once:
+            for job in self.jobs:
+                self.run_job(job)
+            return
+
+        while not self.stop_event.is_set():
+            job = min(self.jobs, key=lambda job: job.next_run)
+            wait = job.next_run - time.time()
+            if wait > 0:
+                self.stop_event.wait(wait)
+                continue
+            self.run_job(job)
+            job.schedule_next(self.rng)
+
+    def stop(self):
+        """Stop after the running job finishes"""
+        logger.info("Stopping research daemon")
+        self.stop_event.set()
+
+    def close(self):
+        """Shut down the status endpoint and close sessions and stores"""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+        self.researcher.scheduler.close()
+        for store in (self.researcher.article_store, self.researcher.verification_state,
+                      self.researcher.http_cache, self.fact_checker.article_store, self.fact_checker.http_cache):
+            store.close()
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Run research and fact-checking jobs from one long-running process')
+    parser.add_argument('--research-hours', type=float, default=24,
+                        help='Hours between research reports (default: 24)')
+    parser.add_argument('--fact-check-hours', type=float, default=4,
+                        help='Hours between fact checks (default: 4)')
+    parser.add_argument('--tor-check-hours', type=float, default=1,
+                        help='Hours between Tor connectivity checks (default: 1)')
+    parser.add_argument('--jitter', type=float, default=0.1,
+                        help='Random fraction of an interval added or taken off each run (default: 0.1)')
+    parser.add_argument('--status-host', default='127.0.0.1',
+                        help='Status endpoint address (default: 127.0.0.1)')
+    parser.add_argument('--status-port', type=int, default=8790,
+                        help='Status endpoint port, 0 to disable (default: 8790)')
+    parser.add_argument('--once', action='store_true',
+                        help='Run every job once and exit')
+    return parser.parse_args()
+
+def main():
+    """Main daemon function"""
+    args = parse_args()
+    intervals = {'research': args.research_hours * 3600, 'fact-check': args.fact_check_hours * 3600,
+                 'tor-check': args.tor_check_hours * 3600}
+
+    daemon = ResearchDaemon(intervals, jitter=args.jitter)
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    signal.signal(signal.SIGINT, lambda *_: daemon.stop())
+    try:
+        if args.status_port and not args.once:
+            daemon.start_status_server(args.status_host, args.status_port)
+        daemon.run(once=args.once)
+    except Exception as e:
+        logger.error(f"Research daemon failed: {e}")
+        raise
+    finally:
+        daemon.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Offline Validation for Creepstate Flight Log Dumps
+Streams a flight log CSV through the importer's parsers without touching the
+database and writes a machine-readable quality report: unparseable dates,
+unknown airport codes, new passenger names and duplicate flights
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from import_csv_data import FlightDataImporter, csv_file_fingerprint
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# Examples listed per problem in the report; counts always cover every row
+REPORT_SAMPLES = 20
+
+class FlightDumpValidator(FlightDataImporter):
+    """Profile a dump the way import_csv_file would see it, without writing
+
+    Passenger and location keys and stored flight hashes come from a snapshot
+    file (see save_snapshot) instead of a live connection. Without one the
+    report still covers parse failures and duplicates within the file, and
+    the comparisons against the database are reported as null.
+    """
+
+    def __init__(self, db_config: Optional[Dict[str, str]] = None):
+        super().__init__(db_config or {})
+        self.snapshot = None
+        self.date_cache = {}
+
+    def save_snapshot(self, snapshot_path: str):
+        """Write the passenger, location and flight keys of the connected database"""
+        self._load_flight_hashes()
+        snapshot = {
+            'version': SNAPSHOT_VERSION,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'database': self.db_config.get('database'),
+            'passengers': sorted(self.passenger_cache),
+            'locations': sorted(self.location_cache),
+            'flights': [
+                [flight_number, flight_date.isoformat(), departure_code, arrival_code, content_hash]
+                for (flight_number, flight_date, departure_code, arrival_code), content_hash
+                in self.flight_hashes.items()
+            ]
+        }
+        with gzip.open(snapshot_path, 'wt', encoding='utf-8') as handle:
+            json.dump(snapshot, handle)
+        logger.info(f"Saved snapshot of {len(self.passenger_cache)} passenger names, "
+                    f"{len(self.location_cache)} locations and {len(self.flight_hashes)} flights "
+                    f"to {snapshot_path}")
+
+    def load_snapshot(self, snapshot_path: str):
+        """Use a snapshot file in place of the database caches"""
+        with gzip.open(snapshot_path, 'rt', encoding='utf-8') as handle:
+            snapshot = json.load(handle)
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version in {snapshot_path}: {snapshot.get('version')}")
+
+        self.passenger_cache = dict.fromkeys(snapshot['passengers'])
+        self.location_cache = dict.fromkeys(snapshot['locations'])
+        self.flight_hashes = {
+            (flight_number, date.fromisoformat(flight_date), departure_code, arrival_code): content_hash
+            for flight_number, flight_date, departure_code, arrival_code, content_hash in snapshot['flights']
+        }
+        self.snapshot = {
+            'path': snapshot_path,
+            'created_at': snapshot['created_at'],
+            'database': snapshot['database']
+        }
+        logger.info(f"Loaded snapshot from {snapshot_path} ({snapshot['created_at']})")
+
+    def _parse_date_cached(self, date_str: str) -> Optional[date]:
+        """parse_date memoized per raw value; dumps repeat the same dates a lot"""
+        try:
+            return self.date_cache[date_str]
+        except KeyError:
+            parsed = self.date_cache[date_str] = self.parse_date(date_str)
+            return parsed
+
+    def validate_csv_file(self, csv_file_path: str) -> Dict:
+        """Stream a CSV through the import parsers and return the quality report
+
+        Rows are judged exactly as import_csv_file would: a row with an
+        unparseable date or a missing airport code is skipped, names go through
+        clean_passenger_name and flights are matched on natural key and
+        content hash.
+        """
+        if not os.path.exists(csv_file_path):
+            raise FileNotFoundError(f"CSV file not found: {csv_file_path}")
+
+        logger.info(f"Validating {csv_file_path}")
+        started = time.perf_counter()
+        compare = self.snapshot is not None
+
+        rows = skipped = empty_manifests = name_occurrences = 0
+        bad_dates, missing_codes = [], []
+        bad_date_count = missing_code_count = 0
+        first_date = last_date = None
+        airports = Counter()
+        names = Counter()
+        seen = {}
+        duplicate_rows = conflicting_rows = 0
+        unchanged = changed = new_flights = 0
+
+        # parse_date warns once per bad value; the report counts them instead
+        logging.disable(logging.WARNING)
+        try:
+            with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
+                reader = self._open_csv_reader(csvfile)
+
+                for row_no, row in enumerate(reader, start=1):
+                    rows += 1
+                    raw_date = row.get('Date', '') or ''
+                    flight_date = self._parse_date_cached(raw_date)
+                    if not flight_date:
+                        bad_date_count += 1
+                        skipped += 1
+                        if len(bad_dates) < REPORT_SAMPLES:
+                            bad_dates.append({'row': row_no, 'value': raw_date})
+                        continue
+
+                    departure_code = (row.get('Departure_Code') or '').upper().strip()
+                    arrival_code = (row.get('Arrival_Code') or '').upper().strip()
+                    if not departure_code or not arrival_code:
+                        missing_code_count += 1
+                        skipped += 1
+                        if len(missing_codes) < REPORT_SAMPLES:
+                            missing_codes.append({'row': row_no, 'departure': departure_code,
+                                                  'arrival': arrival_code})
+                        continue
+
+                    if first_date is None or flight_date < first_date:
+                        first_date = flight_date
+                    if last_date is None or flight_date > last_date:
+                        last_date = flight_date
+                    airports[departure_code] += 1
+                    airports[arrival_code] += 1
+
+                    flight_number = row.get('Flight_No', '') or ''
+                    passengers = self.parse_passengers(row.get('Passengers', ''))
+                    if not passengers:
+                        empty_manifests += 1
+                    name_occurrences += len(passengers)
+                    names.update(name.lower() for name in passengers)
+
+                    natural_key = (flight_number, flight_date, departure_code, arrival_code)
+                    content_hash = self.flight_content_hash(flight_number, flight_date, departure_code,
+                                                            arrival_code, passengers)
+                    previous = seen.get(natural_key)
+                    if previous is not None:
+                        duplicate_rows += 1
+                        if previous != content_hash:
+                            conflicting_rows += 1
+                        seen[natural_key] = content_hash
+                        continue
+                    seen[natural_key] = content_hash
+
+                    if compare:
+                        stored = self.flight_hashes.get(natural_key)
+                        if stored is None:
+                            new_flights += 1
+                        elif stored == content_hash:
+                            unchanged += 1
+                        else:
+                            changed += 1
+        finally:
+            logging.disable(logging.NOTSET)
+
+        elapsed = time.perf_counter() - started
+        fingerprint, size = csv_file_fingerprint(csv_file_path)
+
+        unknown_airports = new_names = None
+        if compare:
+            unknown_airports = Counter({code: n for code, n in airports.items()
+                                        if code not in self.location_cache})
+            new_names = Counter({name: n for name, n in names.items()
+                                 if name not in self.passenger_cache})
+
+        return {
+            'file': os.path.abspath(csv_file_path),
+            'fingerprint': fingerprint,
+            'size_bytes': size,
+            'snapshot': self.snapshot,
+            'rows': {
+                'total': rows,
+                'importable': rows - skipped,
+                'skipped': skipped,
+                'rows_per_second': round(rows / elapsed) if elapsed else None,
+                'elapsed_seconds': round(elapsed, 3)
+            },
+            'dates': {
+                'unparseable': bad_date_count,
+                'distinct_values': len(self.date_cache),
+                'first': first_date.isoformat() if first_date else None,
+                'last': last_date.isoformat() if last_date else None,
+                'samples': bad_dates
+            },
+            'airports': {
+                'missing_code_rows': missing_code_count,
+                'distinct': len(airports),
+                'unknown': len(unknown_airports) if compare else None,
+                'unknown_codes': dict(unknown_airports.most_common()) if compare else None,
+                'samples': missing_codes
+            },
+            'passengers': {
+                'name_occurrences': name_occurrences,
+                'distinct': len(names),
+                'empty_manifests': empty_manifests,
+                'new': len(new_names) if compare else None,
+                'new_name_occurrences': sum(new_names.values()) if compare else None,
+                'new_names': dict(new_names.most_common(REPORT_SAMPLES)) if compare else None
+            },
+            'flights': {
+                'distinct': len(seen),
+                'duplicate_rows': duplicate_rows,
+                'conflicting_duplicate_rows': conflicting_rows,
+                'new': new_flights if compare else None,
+                'unchanged': unchanged if compare else None,
+                'changed': changed if compare else None
+            }
+        }
+
+def print_report_summary(report: Dict):
+    """Log the headline numbers of a validation report"""
+    rows, flights = report['rows'], report['flights']
+    logger.info("="*50)
+    logger.info("FLIGHT DUMP VALIDATION SUMMARY")
+    logger.info("="*50)
+    logger.info(f"Rows: {rows['total']} (importable: {rows['importable']}, skipped: {rows['skipped']}) "
+                f"in {rows['elapsed_seconds']}s, {rows['rows_per_second']:,} rows/s")
+    logger.info(f"Unparseable Dates: {report['dates']['unparseable']}")
+    logger.info(f"Missing Airport Codes: {report['airports']['missing_code_rows']} rows")
+    logger.info(f"Duplicate Rows: {flights['duplicate_rows']} "
+                f"(conflicting: {flights['conflicting_duplicate_rows']})")
+    if report['snapshot']:
+        logger.info(f"Unknown Airports: {report['airports']['unknown']}")
+        logger.info(f"New Passenger Names: {report['passengers']['new']}")
+        logger.info(f"Flights: {flights['new']} new, {flights['changed']} changed, "
+                    f"{flights['unchanged']} already stored")
+    else:
+        logger.info("No snapshot given: unknown airports, new names and stored flights not compared")
+    logger.info("="*50)
+
+def write_report(report: Dict, report_path: str):
+    """Write the report as JSON"""
+    with open(report_path, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+        handle.write('\n')
+    logger.info(f"Validation report written to {report_path}")
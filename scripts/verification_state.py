@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Timeline Verification State for Creepstate Research Tools
+Remembers a content hash and the last verification of every event in
+timeline-comprehensive.xml, so auto-research.py checks new and edited
+events first and then rotates through the rest, oldest check first, within
+a fixed number of lookups per run. The timeline is read with iterparse, one
+event at a time. Run directly to see coverage and the next events due.
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterable, Iterator, List
+
+DEFAULT_STATE_PATH = os.getenv('CREEPSTATE_VERIFICATION_STATE',
+                               os.path.join(os.path.expanduser('~'), '.local', 'share', 'creepstate',
+                                            'verification.sqlite'))
+
+# Unchanged events are rechecked once their last verification is this old
+DEFAULT_RECHECK_DAYS = 30
+
+def iter_timeline_events(path: str) -> Iterator[Dict[str, str]]:
+    """Dated, titled events of a timeline file with their identity and content hash
+
+    An event is identified by its date and title; the hash covers all of its
+    attributes and text, so any edit to the event marks it as changed.
+    """
+    context = ET.iterparse(path, events=('start', 'end'))
+    _, root = next(context)
+    for kind, element in context:
+        if kind != 'end' or element.tag != 'event':
+            continue
+        title = element.get('title', '')
+        start = element.get('start', '')
+        if title and start:
+            content = '\x1f'.join([*(f"{name}={value}" for name, value in sorted(element.attrib.items())),
+                                   ' '.join(''.join(element.itertext()).split())])
+            yield {
+                'key': hashlib.sha256(f"{start}\x1f{title}".encode('utf-8')).hexdigest(),
+                'title': title,
+                'start': start,
+                'content_hash': hashlib.sha256(content.encode('utf-8')).hexdigest()
+            }
+        # Parsed events are dropped as we go
+        root.clear()
+
+class VerificationState:
+    """SQLite record of which timeline events were verified, and when"""
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS events (
+                key TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                start TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                verified_hash TEXT,
+                last_verified REAL,
+                status TEXT,
+                confidence TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_events_last_verified ON events(last_verified);
+        """)
+
+    def sync(self, events: Iterable[Dict[str, str]]) -> Dict[str, int]:
+        """Record the timeline's current events and forget removed ones"""
+        outcome = {'new': 0, 'changed': 0, 'unchanged': 0, 'removed': 0}
+        with self.connection:
+            self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY)")
+            self.connection.execute("DELETE FROM seen")
+            for position, event in enumerate(events):
+                row = self.connection.execute("SELECT content_hash FROM events WHERE key = ?",
+                                              (event['key'],)).fetchone()
+                if row is None:
+                    outcome['new'] += 1
+                elif row['content_hash'] != event['content_hash']:
+                    outcome['changed'] += 1
+                else:
+                    outcome['unchanged'] += 1
+                self.connection.execute("""
+                    INSERT INTO events (key, title, start, position, content_hash) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET position = excluded.position,
+                                                   content_hash = excluded.content_hash
+                """, (event['key'], event['title'], event['start'], position, event['content_hash']))
+                self.connection.execute("INSERT OR IGNORE INTO seen VALUES (?)", (event['key'],))
+            outcome['removed'] = self.connection.execute(
+                "DELETE FROM events WHERE key NOT IN (SELECT key FROM seen)").rowcount
+        return outcome
+
+    def due(self, budget: int, recheck_days: float = DEFAULT_RECHECK_DAYS) -> List[Dict[str, Any]]:
+        """Up to budget events to verify, most urgent first
+
+        Events never verified, or edited since they were, come first in
+        timeline order; then unchanged events whose last verification is
+        older than recheck_days, least recently verified first.
+        """
+        cutoff = time.time() - recheck_days * 86400
+        rows = self.connection.execute("""
+            SELECT key, title, start, content_hash,
+                   verified_hash IS NULL OR verified_hash != content_hash AS changed
+            FROM events
+            WHERE verified_hash IS NULL OR verified_hash != content_hash OR last_verified < ?
+            ORDER BY changed DESC, CASE WHEN changed THEN position ELSE last_verified END
+            LIMIT ?
+        """, (cutoff, budget)).fetchall()
+        return [dict(row) for row in rows]
+
+    def record(self, event: Dict[str, Any], status: str, confidence: str):
+        """Mark an event as verified in the form it was checked"""
+        with self.connection:
+            self.connection.execute("""
+                UPDATE events SET verified_hash = ?, last_verified = ?, status = ?, confidence = ?
+                WHERE key = ?
+            """, (event['content_hash'], time.time(), status, confidence, event['key']))
+
+    def coverage(self, recheck_days: float = DEFAULT_RECHECK_DAYS) -> Dict[str, int]:
+        """Events in the timeline, verified in their current form, and verified within recheck_days"""
+        row = self.connection.execute("""
+            SELECT COUNT(*) AS events,
+                   COALESCE(SUM(verified_hash = content_hash), 0) AS verified,
+                   COALESCE(SUM(verified_hash = content_hash AND last_verified >= ?), 0) AS current
+            FROM events
+        """, (time.time() - recheck_days * 86400,)).fetchone()
+        return dict(row)
+
+    def close(self):
+        self.connection.close()
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Show timeline verification coverage and the next events due')
+    parser.add_argument('--timeline', default='timeline-comprehensive.xml',
+                        help='Timeline XML file (default: timeline-comprehensive.xml)')
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH,
+                        help=f'Verification state database (default: {DEFAULT_STATE_PATH})')
+    parser.add_argument('--budget', type=int, default=25,
+                        help='Events verified per run (default: 25)')
+    parser.add_argument('--recheck-days', type=float, default=DEFAULT_RECHECK_DAYS,
+                        help=f'Days before an unchanged event is rechecked (default: {DEFAULT_RECHECK_DAYS})')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    state = VerificationState(args.state)
+    changes = state.sync(iter_timeline_events(args.timeline))
+    coverage = state.coverage(args.recheck_days)
+    print(f"Timeline: {coverage['events']} events ({changes['new']} new, {changes['changed']} changed, "
+          f"{changes['removed']} removed since the last sync)")
+    print(f"Verified in current form: {coverage['verified']}, "
+          f"within {args.recheck_days:g} days: {coverage['current']}")
+    print(f"Next {args.budget} due:")
+    for event in state.due(args.budget, args.recheck_days):
+        print(f"  {'*' if event['changed'] else ' '} {event['start']}  {event['title']}")
+    state.close()
+
+if __name__ == "__main__":
+    main()
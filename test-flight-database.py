@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Test script for the Flight Logs Database
+Imports and edits a few test flights in a scratch database and checks the
+results. The database must be built from database/schema.sql and
+seed_data.sql, and named explicitly in DATABASE_NAME; test flights are
+removed again afterwards.
+
+    DATABASE_NAME=creepstate_flights_scratch python3 test-flight-database.py
+"""
+
+import os
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'api'))
+
+# Test flights are dated far in the future so they never collide with real ones
+TEST_DATE = '20991231'
+TEST_FLIGHTS = ('9901', '9902')
+
+def database_config():
+    """Connection settings from the DATABASE_* environment variables"""
+    return {
+        'host': os.getenv('DATABASE_HOST', 'localhost'),
+        'port': os.getenv('DATABASE_PORT', 5432),
+        'database': os.getenv('DATABASE_NAME'),
+        'user': os.getenv('DATABASE_USER', 'flight_admin'),
+        'password': os.getenv('DATABASE_PASSWORD', 'secure_admin_pass_2024!')
+    }
+
+def write_manifest(directory, name, manifests):
+    """Write a flights CSV with one PBI-TEB flight per passenger list"""
+    path = os.path.join(directory, name)
+    with open(path, 'w') as f:
+        f.write("Date,Flight_No,Departure_Code,Arrival_Code,Passengers\n")
+        for flight_number, passengers in zip(TEST_FLIGHTS, manifests):
+            f.write(f'{TEST_DATE},{flight_number},PBI,TEB,"{passengers}"\n')
+    return path
+
+def run_import(csv_file):
+    """Import a file and apply its link changes the way an import run does"""
+    from import_csv_data import FlightDataImporter
+
+    importer = FlightDataImporter(database_config())
+    try:
+        importer.connect_database()
+        importer.import_csv_file(csv_file)
+        importer.update_connections()
+        return importer.stats['errors']
+    finally:
+        importer.close_connection()
+
+def verify_connections():
+    """Pairs whose stored connection differs from a full rebuild"""
+    from import_csv_data import FlightDataImporter
+
+    importer = FlightDataImporter(database_config())
+    try:
+        importer.connect_database()
+        return importer.verify_connections()
+    finally:
+        importer.close_connection()
+
+def remove_test_flights():
+    """Delete the test flights and apply the removed links to the connections"""
+    from import_csv_data import FlightDataImporter
+
+    importer = FlightDataImporter(database_config())
+    try:
+        importer.connect_database()
+        importer.cursor.execute("""
+            DELETE FROM flight_data.flights
+            WHERE flight_date = %s AND flight_number = ANY(%s)
+        """, (f"{TEST_DATE[:4]}-{TEST_DATE[4:6]}-{TEST_DATE[6:]}", list(TEST_FLIGHTS)))
+        importer.connection.commit()
+        importer.update_connections()
+    finally:
+        importer.close_connection()
+
+def test_repeated_passenger_reimport():
+    """Re-importing a manifest that lists a passenger twice keeps connections exact"""
+    print("🧪 Testing re-import of a manifest with a repeated passenger...")
+
+    import import_csv_data
+
+    # Apply every change incrementally, however small the database is
+    rebuild_fraction = import_csv_data.CONNECTION_REBUILD_FRACTION
+    import_csv_data.CONNECTION_REBUILD_FRACTION = float('inf')
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            original = write_manifest(directory, 'original.csv',
+                                      ["Jeff Epstein, A S", "Jeff Epstein, A S"])
+            repeated = write_manifest(directory, 'repeated.csv',
+                                      ["Jeff Epstein, A S, Jeffrey Epstein", "Jeff Epstein, A S"])
+
+            for step, csv_file in (("original manifest", original), ("repeated passenger", repeated),
+                                   ("original manifest again", original)):
+                if run_import(csv_file):
+                    print(f"❌ Import of the {step} reported errors")
+                    return False
+                differences = verify_connections()
+                if differences:
+                    print(f"❌ After the {step}, {differences} connections differ from a full rebuild")
+                    return False
+                print(f"✅ Connections match a full rebuild after the {step}")
+        return True
+    except Exception as e:
+        print(f"❌ Repeated passenger test error: {e}")
+        return False
+    finally:
+        import_csv_data.CONNECTION_REBUILD_FRACTION = rebuild_fraction
+        remove_test_flights()
+
+def search_test_flights(criteria):
+    """Flights the search endpoint returns for criteria, limited to the test date"""
+    from fastapi.testclient import TestClient
+    from flight_api import app
+
+    test_date = f"{TEST_DATE[:4]}-{TEST_DATE[4:6]}-{TEST_DATE[6:]}"
+    with TestClient(app) as client:
+        response = client.post("/api/flights/search",
+                               json={**criteria, "date_from": test_date, "date_to": test_date})
+    response.raise_for_status()
+    return response.json()['flights']
+
+def test_infix_search():
+    """Name and airport code searches match anywhere in the value, not only word prefixes"""
+    print("🧪 Testing infix flight searches...")
+
+    try:
+        import fastapi.testclient
+    except ImportError:
+        print("❌ fastapi test client missing - run: pip install -r requirements.txt httpx")
+        return False
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            if run_import(write_manifest(directory, 'search.csv', ["Jeff Epstein, A S", "A S"])):
+                print("❌ Import of the test flights reported errors")
+                return False
+
+        searches = [
+            ("passenger name 'stein'", {"passenger_name": "stein"},
+             lambda flight: "Jeffrey Epstein" in flight['passengers'], 1),
+            ("selected passenger 'pstei'", {"selected_passengers": ["pstei"]},
+             lambda flight: "Jeffrey Epstein" in flight['passengers'], 1),
+            ("airport code 'EB'", {"airport_code": "EB"},
+             lambda flight: 'TEB' in (flight['departure_code'], flight['arrival_code']), 2)
+        ]
+        for description, criteria, matches, expected in searches:
+            flights = search_test_flights(criteria)
+            if len(flights) != expected or not all(matches(flight) for flight in flights):
+                print(f"❌ Search by {description} returned {len(flights)} flights, expected {expected}")
+                return False
+            print(f"✅ Search by {description} returned {expected} flights")
+        return True
+    except Exception as e:
+        print(f"❌ Infix search test error: {e}")
+        return False
+    finally:
+        remove_test_flights()
+
+def test_multiline_manifest():
+    """A quoted passenger list spanning lines is one record; an unterminated one fails the import"""
+    print("🧪 Testing manifests with quoted newlines...")
+
+    from import_csv_data import FlightDataImporter
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            if run_import(write_manifest(directory, 'multiline.csv', ["Jeff Epstein,\nA S", "A S"])):
+                print("❌ Import of the multi-line manifest reported errors")
+                return False
+
+            importer = FlightDataImporter(database_config())
+            try:
+                importer.connect_database()
+                importer.cursor.execute("""
+                    SELECT f.flight_number, COUNT(fp.passenger_id)
+                    FROM flight_data.flights f
+                    JOIN flight_data.flight_passengers fp ON fp.flight_id = f.id
+                    WHERE f.flight_date = %s AND f.flight_number = ANY(%s)
+                    GROUP BY f.flight_number
+                """, (f"{TEST_DATE[:4]}-{TEST_DATE[4:6]}-{TEST_DATE[6:]}", list(TEST_FLIGHTS)))
+                passengers = {row['flight_number']: row['count'] for row in importer.cursor.fetchall()}
+            finally:
+                importer.close_connection()
+            if passengers != dict(zip(TEST_FLIGHTS, (2, 1))):
+                print(f"❌ Multi-line manifest imported passenger counts {passengers}")
+                return False
+            print("✅ Multi-line passenger list imported as one flight")
+
+            unterminated = os.path.join(directory, 'unterminated.csv')
+            with open(unterminated, 'w') as f:
+                f.write("Date,Flight_No,Departure_Code,Arrival_Code,Passengers\n")
+                f.write(f'{TEST_DATE},{TEST_FLIGHTS[0]},PBI,TEB,"Jeff Epstein\n')
+            try:
+                run_import(unterminated)
+            except ValueError:
+                print("✅ Unterminated quoted field failed the import")
+                return True
+            print("❌ Unterminated quoted field was imported")
+            return False
+    except Exception as e:
+        print(f"❌ Multi-line manifest test error: {e}")
+        return False
+    finally:
+        remove_test_flights()
+
+def test_bulk_audit_batches():
+    """Bulk-load audit needs an open batch, and the batch must be closed to commit"""
+    print("🧪 Testing bulk-load audit batches...")
+
+    import psycopg2
+
+    test_date = f"{TEST_DATE[:4]}-{TEST_DATE[4:6]}-{TEST_DATE[6:]}"
+    touch_flights = """
+        UPDATE flight_data.flights SET flight_number = flight_number
+        WHERE flight_date = %s AND flight_number = ANY(%s)
+        RETURNING id::text
+    """
+    connection = None
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            if run_import(write_manifest(directory, 'audit.csv', ["Jeff Epstein, A S", "A S"])):
+                print("❌ Import of the test flights reported errors")
+                return False
+
+        connection = psycopg2.connect(**database_config())
+        cursor = connection.cursor()
+
+        # The old session setting no longer switches auditing off
+        cursor.execute("SET LOCAL app.audit_mode = 'bulk'")
+        cursor.execute(touch_flights, (test_date, list(TEST_FLIGHTS)))
+        flight_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute("""
+            SELECT COUNT(*) FROM security_audit.audit_log
+            WHERE operation = 'UPDATE' AND record_id::text = ANY(%s)
+        """, (flight_ids,))
+        audited = cursor.fetchone()[0]
+        connection.commit()
+        if audited != len(flight_ids):
+            print(f"❌ app.audit_mode skipped auditing: {audited} of {len(flight_ids)} updates audited")
+            return False
+        print("✅ Setting app.audit_mode does not skip auditing")
+
+        # A batch left open fails the commit
+        cursor.execute("SELECT security_audit.begin_bulk_audit('unclosed test batch')")
+        cursor.execute(touch_flights, (test_date, list(TEST_FLIGHTS)))
+        try:
+            connection.commit()
+            print("❌ A transaction with an open bulk audit batch committed")
+            return False
+        except psycopg2.Error:
+            connection.rollback()
+        print("✅ A transaction with an open bulk audit batch cannot commit")
+
+        # A closed batch commits with its summary entry
+        cursor.execute("SELECT security_audit.begin_bulk_audit('closed test batch')")
+        cursor.execute(touch_flights, (test_date, list(TEST_FLIGHTS)))
+        cursor.execute("SELECT security_audit.end_bulk_audit()")
+        audit_id = cursor.fetchone()[0]
+        connection.commit()
+        if audit_id is None:
+            print("❌ Closing the bulk audit batch wrote no summary entry")
+            return False
+        print("✅ A closed bulk audit batch commits with its summary entry")
+        return True
+    except Exception as e:
+        print(f"❌ Bulk audit batch test error: {e}")
+        return False
+    finally:
+        if connection:
+            connection.close()
+        remove_test_flights()
+
+def test_search_doc_deferral():
+    """Search documents stay current however a transaction tries to defer them"""
+    print("🧪 Testing search document deferral...")
+
+    import psycopg2
+
+    test_date = f"{TEST_DATE[:4]}-{TEST_DATE[4:6]}-{TEST_DATE[6:]}"
+    renumber = """
+        UPDATE flight_data.flights SET flight_number = %s
+        WHERE flight_date = %s AND flight_number = %s
+    """
+    stale_docs = """
+        SELECT COUNT(*) FROM flight_data.flights f
+        JOIN flight_data.flight_search_doc d ON d.flight_id = f.id
+        WHERE f.flight_date = %s AND d.flight_number IS DISTINCT FROM f.flight_number
+    """
+    connection = None
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            if run_import(write_manifest(directory, 'deferral.csv', ["Jeff Epstein, A S", "A S"])):
+                print("❌ Import of the test flights reported errors")
+                return False
+
+        connection = psycopg2.connect(**database_config())
+        cursor = connection.cursor()
+
+        # The old session setting no longer skips the refresh
+        cursor.execute("SET LOCAL app.defer_search_docs = 'on'")
+        cursor.execute(renumber, ('9903', test_date, TEST_FLIGHTS[0]))
+        connection.commit()
+        cursor.execute(stale_docs, (test_date,))
+        if cursor.fetchone()[0]:
+            print("❌ Setting app.defer_search_docs left search documents stale")
+            return False
+        print("✅ Setting app.defer_search_docs does not skip the refresh")
+
+        # A deferral that is never refreshed explicitly is refreshed at commit
+        cursor.execute("SELECT flight_data.defer_search_docs()")
+        cursor.execute(renumber, (TEST_FLIGHTS[0], test_date, '9903'))
+        connection.commit()
+        cursor.execute(stale_docs, (test_date,))
+        if cursor.fetchone()[0]:
+            print("❌ Deferred search documents were not refreshed at commit")
+            return False
+        print("✅ Deferred search documents are refreshed at commit")
+        return True
+    except Exception as e:
+        print(f"❌ Search document deferral test error: {e}")
+        return False
+    finally:
+        if connection:
+            connection.close()
+        remove_test_flights()
+
+def run_all_tests():
+    """Run all test functions"""
+    print("🚀 Flight Logs Database - Test Suite")
+    print("=" * 65)
+
+    if not os.getenv('DATABASE_NAME'):
+        print("❌ Set DATABASE_NAME to a scratch database; these tests import and delete flights")
+        return False
+
+    tests = [
+        ("Repeated Passenger Re-import", test_repeated_passenger_reimport),
+        ("Infix Flight Search", test_infix_search),
+        ("Multi-line Manifest", test_multiline_manifest),
+        ("Bulk Audit Batches", test_bulk_audit_batches),
+        ("Search Document Deferral", test_search_doc_deferral)
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\n📋 Running {test_name} test...")
+        if test_func():
+            passed += 1
+            print(f"✅ {test_name} test PASSED")
+        else:
+            print(f"❌ {test_name} test FAILED")
+
+    print(f"\n📊 Test Results: {passed}/{total} tests passed")
+    return passed == total
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)